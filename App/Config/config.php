@@ -63,6 +63,8 @@ define('DB_HOST', env('DB_HOST', 'localhost'));
 define('DB_NAME', env('DB_DATABASE', 'nutrinexas')); // Make sure this matches your database name
 define('DB_USER', env('DB_USERNAME', 'root')); 
 define('DB_PASS', env('DB_PASSWORD', '123456'));
+// Tag each connection with the request path (visible in MySQL general/slow logs for query profiling)
+define('DB_QUERY_TAGS', filter_var(env('DB_QUERY_TAGS', 'false'), FILTER_VALIDATE_BOOLEAN));
 
 
 // App Root
@@ -97,6 +99,17 @@ define('NEWSLETTER_API_KEY', env('NEWSLETTER_API_KEY', 'your-newsletter-api-key-
 define('CACHE_ENABLED', filter_var(env('CACHE_ENABLED', 'true'), FILTER_VALIDATE_BOOLEAN));
 define('CACHE_LIFETIME', env('CACHE_LIFETIME', 3600)); // 1 hour
 
+// Product search index (test/python/search_index.py serve); empty = LIKE queries
+define('SEARCH_SERVICE_URL', env('SEARCH_SERVICE_URL', ''));
+define('SEARCH_SERVICE_TIMEOUT_MS', (int) env('SEARCH_SERVICE_TIMEOUT_MS', 150));
+
+// Ad reach / product view spool (test/python/ad_event_aggregator.py drains it); empty = write synchronously
+define('AD_EVENT_SPOOL_DIR', env('AD_EVENT_SPOOL_DIR', ''));
+
+// Click-fraud window counters (test/python/fraud_window.py serve); empty = COUNT queries on ads_click_logs
+define('AD_FRAUD_SERVICE_URL', env('AD_FRAUD_SERVICE_URL', ''));
+define('AD_FRAUD_SERVICE_TIMEOUT_MS', (int) env('AD_FRAUD_SERVICE_TIMEOUT_MS', 50));
+
 
 // Khalti API endpoints - get from environment
 define('KHALTI_INITIATE_URL', env('KHALTI_INITIATE_URL', 'https://khalti.com/api/v2/epayment/initiate/'));
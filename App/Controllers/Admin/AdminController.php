@@ -296,6 +296,9 @@ class AdminController extends Controller
                     // Generate sitemaps automatically
                     $this->generateSitemaps();
 
+                    // Let the search index pick up the product now
+                    (new \App\Services\SearchIndexService())->requestSync();
+
                     $this->setFlash('success', 'Product added successfully');
                     $this->redirect('admin/products');
                 } else {
@@ -520,6 +523,9 @@ class AdminController extends Controller
                         $this->handleProductImages($id, false);
                     }
 
+                    // Let the search index pick up the change now
+                    (new \App\Services\SearchIndexService())->requestSync();
+
                     $this->setFlash('success', 'Product updated successfully');
                     $this->redirect('admin/products');
                 } else {
@@ -660,6 +666,9 @@ class AdminController extends Controller
                     // Generate sitemaps automatically
                     $this->generateSitemaps();
 
+                    // Let the search index pick up the change now
+                    (new \App\Services\SearchIndexService())->requestSync();
+
                     $this->setFlash('success', 'Product updated successfully');
                     $this->redirect('admin/products');
                 } else {
@@ -717,6 +726,9 @@ class AdminController extends Controller
                 $result = $this->productModel->deleteProduct($id);
 
                 if ($result) {
+                    // Drop the product from the search index now
+                    (new \App\Services\SearchIndexService())->remove((int)$id);
+
                     $message = 'Product deleted successfully' . $warningMessage;
                     $this->jsonResponse(['success' => true, 'message' => $message]);
                 } else {
@@ -225,9 +225,13 @@ class ProductController extends Controller
             $brands = isset($_GET['brands']) ? (array)$_GET['brands'] : [];
             $sizes = isset($_GET['sizes']) ? (array)$_GET['sizes'] : [];
             $colors = isset($_GET['colors']) ? (array)$_GET['colors'] : [];
-            
+
+            // Keyset mode when a cursor is sent (empty for the first page)
+            $cursor = isset($_GET['cursor']) ? (string)$_GET['cursor'] : null;
+            $nextCursor = null;
+
             // Apply filters
-            $products = $this->getFilteredProductsAdvanced($limit, $offset, $sort, $minPrice, $maxPrice, $categories, $brands, $sizes, $colors);
+            $products = $this->getFilteredProductsAdvanced($limit, $offset, $sort, $minPrice, $maxPrice, $categories, $brands, $sizes, $colors, $cursor, $nextCursor);
             
             foreach ($products as &$product) {
                 $primaryImage = $this->productImageModel->getPrimaryImage($product['id']);
@@ -282,7 +286,8 @@ class ProductController extends Controller
             $this->jsonResponse([
                 'success' => true,
                 'html' => $html,
-                'count' => count($products)
+                'count' => count($products),
+                'nextCursor' => $nextCursor
             ]);
         }
 
@@ -359,7 +364,7 @@ class ProductController extends Controller
         /**
          * Advanced filtered products with categories, brands, sizes, colors
          */
-        private function getFilteredProductsAdvanced($limit, $offset, $sort = '', $minPrice = null, $maxPrice = null, $categories = [], $brands = [], $sizes = [], $colors = [])
+        private function getFilteredProductsAdvanced($limit, $offset, $sort = '', $minPrice = null, $maxPrice = null, $categories = [], $brands = [], $sizes = [], $colors = [], $cursor = null, &$nextCursor = null)
         {
             $db = \App\Core\Database::getInstance();
             $where = ["p.status = 'active'", "(p.approval_status = 'approved' OR p.approval_status IS NULL OR p.seller_id IS NULL OR p.seller_id = 0)"];
@@ -428,34 +433,7 @@ class ProductController extends Controller
 
             $whereClause = implode(' AND ', $where);
 
-            // Sorting
-            $orderBy = "p.created_at DESC";
-            switch ($sort) {
-                case 'price-low':
-                case 'price_low':
-                    $orderBy = "COALESCE(p.sale_price, p.price) ASC";
-                    break;
-                case 'price-high':
-                case 'price_high':
-                    $orderBy = "COALESCE(p.sale_price, p.price) DESC";
-                    break;
-                case 'name':
-                    $orderBy = "p.product_name ASC";
-                    break;
-                case 'popular':
-                    $orderBy = "p.is_featured DESC, p.total_sales DESC, p.sales_count DESC, p.created_at DESC";
-                    break;
-                case 'newest':
-                default:
-                    $orderBy = "p.created_at DESC";
-                    break;
-            }
-
-            $sql = "SELECT p.* FROM products p WHERE $whereClause ORDER BY $orderBy LIMIT ? OFFSET ?";
-            $params[] = $limit;
-            $params[] = $offset;
-
-            $products = $db->query($sql, $params)->all();
+            $products = $this->fetchListingPage($whereClause, $params, $sort, $limit, $offset, $cursor, $nextCursor);
 
             // Add images
             foreach ($products as &$product) {
@@ -469,9 +447,8 @@ class ProductController extends Controller
         /**
          * Get filtered products
          */
-        private function getFilteredProducts($limit, $offset, $sort = '', $minPrice = null, $maxPrice = null, $inStock = false, $lowStock = false)
+        private function getFilteredProducts($limit, $offset, $sort = '', $minPrice = null, $maxPrice = null, $inStock = false, $lowStock = false, $cursor = null, &$nextCursor = null)
         {
-            $db = \App\Core\Database::getInstance();
             $where = ["p.status = 'active'", "(p.approval_status = 'approved' OR p.approval_status IS NULL OR p.seller_id IS NULL OR p.seller_id = 0)"];
             $params = [];
 
@@ -495,44 +472,156 @@ class ProductController extends Controller
 
             $whereClause = implode(' AND ', $where);
 
-            // Sorting
-            $orderBy = "p.created_at DESC";
+            $products = $this->fetchListingPage($whereClause, $params, $sort, $limit, $offset, $cursor, $nextCursor);
+
+            // Add images
+            foreach ($products as &$product) {
+                $primaryImage = $this->productImageModel->getPrimaryImage($product['id']);
+                $product['image_url'] = $this->getProductImageUrl($product, $primaryImage);
+            }
+
+            return $products;
+        }
+
+        /**
+         * Sort keys for product listings, most significant first
+         *
+         * p.id is always the last key so the order is total: rows that tie on
+         * price or date keep a fixed order between pages. Nullable columns are
+         * wrapped in COALESCE, since a NULL never matches the cursor's = / < / >
+         * comparisons and those rows would drop out of cursor mode.
+         */
+        private function getListingSortKeys($sort)
+        {
             switch ($sort) {
                 case 'price-low':
                 case 'price_low':
-                    $orderBy = "COALESCE(p.sale_price, p.price) ASC";
-                    break;
+                    return [['COALESCE(p.sale_price, p.price, 0)', 'ASC'], ['p.id', 'ASC']];
                 case 'price-high':
                 case 'price_high':
-                    $orderBy = "COALESCE(p.sale_price, p.price) DESC";
-                    break;
+                    return [['COALESCE(p.sale_price, p.price, 0)', 'DESC'], ['p.id', 'DESC']];
                 case 'name':
-                    $orderBy = "p.product_name ASC";
-                    break;
+                    return [["COALESCE(p.product_name, '')", 'ASC'], ['p.id', 'ASC']];
                 case 'popular':
-                    $orderBy = "p.is_featured DESC, p.total_sales DESC, p.sales_count DESC, p.created_at DESC";
-                    break;
+                    return [
+                        ['COALESCE(p.is_featured, 0)', 'DESC'],
+                        ['COALESCE(p.total_sales, 0)', 'DESC'],
+                        ['COALESCE(p.sales_count, 0)', 'DESC'],
+                        ["COALESCE(p.created_at, '1970-01-01 00:00:00')", 'DESC'],
+                        ['p.id', 'DESC'],
+                    ];
                 case 'newest':
                 default:
-                    $orderBy = "p.created_at DESC";
-                    break;
+                    return [["COALESCE(p.created_at, '1970-01-01 00:00:00')", 'DESC'], ['p.id', 'DESC']];
+            }
+        }
+
+        /**
+         * Fetch one page of a product listing
+         *
+         * With $cursor null this pages with LIMIT/OFFSET. Otherwise (the `cursor`
+         * query parameter was sent, empty for the first page) it seeks past the
+         * row the cursor points at, so page 200 costs the same as page 1.
+         * $nextCursor is set to the cursor for the following page, or null on
+         * the last one.
+         */
+        private function fetchListingPage($whereClause, array $params, $sort, $limit, $offset, $cursor = null, &$nextCursor = null)
+        {
+            $db = \App\Core\Database::getInstance();
+            $keys = $this->getListingSortKeys($sort);
+            $orderBy = implode(', ', array_map(function ($key) {
+                return $key[0] . ' ' . $key[1];
+            }, $keys));
+            $nextCursor = null;
+
+            if ($cursor === null) {
+                $sql = "SELECT p.* FROM products p WHERE $whereClause ORDER BY $orderBy LIMIT ? OFFSET ?";
+                $params[] = $limit;
+                $params[] = $offset;
+                return $db->query($sql, $params)->all();
+            }
+
+            // (k1 > a) OR (k1 = a AND k2 > b) OR ... with < for descending keys
+            $after = $this->decodeListingCursor($cursor, $sort, count($keys));
+            if ($after !== null) {
+                $seek = [];
+                foreach ($keys as $i => $key) {
+                    $terms = [];
+                    for ($j = 0; $j < $i; $j++) {
+                        $terms[] = $keys[$j][0] . ' = ?';
+                        $params[] = $after[$j];
+                    }
+                    $terms[] = $key[0] . ($key[1] === 'ASC' ? ' > ?' : ' < ?');
+                    $params[] = $after[$i];
+                    $seek[] = '(' . implode(' AND ', $terms) . ')';
+                }
+                $whereClause .= ' AND (' . implode(' OR ', $seek) . ')';
             }
 
-            $sql = "SELECT p.* FROM products p WHERE $whereClause ORDER BY $orderBy LIMIT ? OFFSET ?";
-            $params[] = $limit;
-            $params[] = $offset;
+            $select = [];
+            foreach ($keys as $i => $key) {
+                $select[] = $key[0] . " AS cursor_key_$i";
+            }
 
+            // One extra row tells us whether there is a next page without a COUNT
+            $sql = "SELECT p.*, " . implode(', ', $select) . " FROM products p WHERE $whereClause ORDER BY $orderBy LIMIT ?";
+            $params[] = (int)$limit + 1;
             $products = $db->query($sql, $params)->all();
 
-            // Add images
+            if (count($products) > $limit) {
+                $products = array_slice($products, 0, $limit);
+                $last = end($products);
+                $values = [];
+                foreach ($keys as $i => $key) {
+                    $values[] = $last["cursor_key_$i"];
+                }
+                $nextCursor = $this->encodeListingCursor($sort, $values);
+            }
+
             foreach ($products as &$product) {
-                $primaryImage = $this->productImageModel->getPrimaryImage($product['id']);
-                $product['image_url'] = $this->getProductImageUrl($product, $primaryImage);
+                foreach ($keys as $i => $key) {
+                    unset($product["cursor_key_$i"]);
+                }
             }
+            unset($product);
 
             return $products;
         }
 
+        /**
+         * Encode sort key values as an opaque, URL-safe cursor
+         */
+        private function encodeListingCursor($sort, array $values)
+        {
+            $json = json_encode(['s' => (string)$sort, 'k' => $values]);
+            return rtrim(strtr(base64_encode($json), '+/', '-_'), '=');
+        }
+
+        /**
+         * Decode a cursor; null for the first page or a cursor from another sort
+         */
+        private function decodeListingCursor($cursor, $sort, $keyCount)
+        {
+            if ($cursor === '') {
+                return null;
+            }
+
+            $data = json_decode((string)base64_decode(strtr($cursor, '-_', '+/')), true);
+            if (!is_array($data) || ($data['s'] ?? null) !== (string)$sort
+                || !isset($data['k']) || !is_array($data['k']) || count($data['k']) !== $keyCount) {
+                return null;
+            }
+
+            // Only scalars are bound; anything else restarts at the first page
+            foreach ($data['k'] as $value) {
+                if (!is_scalar($value)) {
+                    return null;
+                }
+            }
+
+            return array_values($data['k']);
+        }
+
         /**
          * Get filtered products count
          */
@@ -561,9 +650,14 @@ class ProductController extends Controller
             }
 
             $whereClause = implode(' AND ', $where);
-            $sql = "SELECT COUNT(*) as count FROM products p WHERE $whereClause";
-            $result = $db->query($sql, $params)->single();
-            return (int)($result['count'] ?? 0);
+
+            // Cache the count for 5 minutes; it only feeds the pager
+            $countCacheKey = 'products_filtered_count_' . md5($whereClause . json_encode($params));
+            return (int)$this->cache->remember($countCacheKey, function () use ($db, $whereClause, $params) {
+                $sql = "SELECT COUNT(*) as count FROM products p WHERE $whereClause";
+                $result = $db->query($sql, $params)->single();
+                return (int)($result['count'] ?? 0);
+            }, 300);
         }
 
         /**
@@ -576,31 +670,46 @@ class ProductController extends Controller
             $page = isset($_GET['page']) ? max(1, (int)$_GET['page']) : 1;
             $limit = 12; // Load 12 products per page
             $offset = ($page - 1) * $limit;
-            
+            $cursor = isset($_GET['cursor']) ? (string)$_GET['cursor'] : null;
+            $nextCursor = null;
+            // sort=newest pages the same newest-first order as cursor mode, by OFFSET
+            $newest = ($_GET['sort'] ?? '') === 'newest';
+
             try {
-                // Try ranked products first, fallback to simple query if it fails
-                try {
-                    $products = $this->productModel->getRankedProducts($limit, $offset);
-                } catch (Exception $e) {
-                    error_log('Ranked products failed, using fallback: ' . $e->getMessage());
-                    $products = $this->productModel->getProductsWithImages($limit, $offset);
+                if ($cursor !== null) {
+                    // The ranking score is computed per request and can't be seeked
+                    // into, so cursor mode walks the newest-first order instead
+                    $products = $this->getFilteredProducts($limit, 0, 'newest', null, null, false, false, $cursor, $nextCursor);
+                } elseif ($newest) {
+                    $products = $this->getFilteredProducts($limit, $offset, 'newest', null, null, false, false);
+                } else {
+                    // Try ranked products first, fallback to simple query if it fails
+                    try {
+                        $products = $this->productModel->getRankedProducts($limit, $offset);
+                    } catch (Exception $e) {
+                        error_log('Ranked products failed, using fallback: ' . $e->getMessage());
+                        $products = $this->productModel->getProductsWithImages($limit, $offset);
+                    }
                 }
-                
+
                 if (empty($products)) {
                     echo json_encode([
                         'success' => true,
                         'products' => [],
                         'hasMore' => false,
                         'page' => $page,
-                        'total' => 0
+                        'total' => 0,
+                        'nextCursor' => null
                     ]);
                     exit;
                 }
-                
+
                 // Add image URLs and format products
                 foreach ($products as &$product) {
-                    $primaryImage = $this->productImageModel->getPrimaryImage($product['id']);
-                    $product['image_url'] = $this->getProductImageUrl($product, $primaryImage);
+                    if (!isset($product['image_url'])) {
+                        $primaryImage = $this->productImageModel->getPrimaryImage($product['id']);
+                        $product['image_url'] = $this->getProductImageUrl($product, $primaryImage);
+                    }
                     
                     // Calculate final price
                     $product['final_price'] = ($product['sale_price'] > 0 && $product['sale_price'] < $product['price']) 
@@ -630,16 +739,21 @@ class ProductController extends Controller
                 }
                 unset($product);
                 
-                // Check if there are more products
-                $totalProducts = $this->productModel->getProductCount();
-                $hasMore = ($offset + count($products)) < $totalProducts;
-                
+                // Check if there are more products (count cached for 5 minutes)
+                $totalProducts = $this->cache->remember('products_active_count', function () {
+                    return $this->productModel->getProductCount();
+                }, 300);
+                $hasMore = $cursor !== null
+                    ? $nextCursor !== null
+                    : ($offset + count($products)) < $totalProducts;
+
                 echo json_encode([
                     'success' => true,
                     'products' => $products,
                     'hasMore' => $hasMore,
                     'page' => $page,
-                    'total' => $totalProducts
+                    'total' => $totalProducts,
+                    'nextCursor' => $nextCursor
                 ]);
             } catch (Exception $e) {
                 error_log('Infinite scroll error: ' . $e->getMessage());
@@ -943,27 +1057,38 @@ class ProductController extends Controller
                 return;
             }
             
-            // Get total count for pagination
-            $totalCount = $this->productModel->getSearchCount($keyword);
-            $totalPages = ceil($totalCount / $limit);
-            
             // SERVER-SIDE CACHING FOR SEARCH RESULTS
             // Cache only the base product list with image URLs (exclude user-specific fields and ads)
             $cacheKey = 'search_' . md5($keyword . '|' . $sort . '|' . $page);
+            $countCacheKey = 'search_count_' . md5($keyword);
             $cached = $this->cache->get($cacheKey);
+            $totalCount = $this->cache->get($countCacheKey);
 
-            if ($cached !== false && is_array($cached)) {
+            if ($cached !== false && is_array($cached) && $totalCount !== false) {
                 $products = $cached;
             } else {
+                // Use the search index when configured; fall back to LIKE queries otherwise.
+                // Only asked on a cache miss, so cached pages skip the round trip.
+                $searchIndex = new \App\Services\SearchIndexService();
+                $indexed = $searchIndex->search($keyword, $limit, $offset, $sort);
+
+                // Get total count for pagination
+                $totalCount = $indexed !== null ? $indexed['total'] : $this->productModel->getSearchCount($keyword);
+
                 // Get products with sorting and pagination
-                $products = $this->productModel->searchProducts($keyword, $sort, $limit, $offset);
+                $products = $indexed !== null
+                    ? $this->productModel->findActiveByIdsInOrder($indexed['ids'])
+                    : $this->productModel->searchProducts($keyword, $sort, $limit, $offset);
                 foreach ($products as &$product) {
                     $primaryImage = $this->productImageModel->getPrimaryImage($product['id']);
                     $product['image_url'] = $this->getProductImageUrl($product, $primaryImage);
                 }
+                unset($product);
                 // Cache for 15 minutes (ads check happens after cache, so no need to cache ad status)
                 $this->cache->set($cacheKey, $products, 900);
+                $this->cache->set($countCacheKey, (int)$totalCount, 900);
             }
+            $totalPages = ceil($totalCount / $limit);
 
             if (Session::has('user_id')) {
                 foreach ($products as &$product) {
@@ -1365,7 +1490,11 @@ class ProductController extends Controller
             }
 
             try {
-                $products = $this->productModel->searchProducts($keyword, 8, 0); // Limit to 8 results for live search
+                // Limit to 8 results for live search; the index returns them without touching products
+                $indexed = (new \App\Services\SearchIndexService())->search($keyword, 8, 0, 'relevance');
+                $products = $indexed !== null
+                    ? $indexed['products']
+                    : $this->productModel->searchProducts($keyword, 'newest', 8, 0);
                 
                 // Debug logging
                 error_log('Found products: ' . count($products));
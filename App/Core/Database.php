@@ -39,7 +39,7 @@ class Database
                 error_log("Database: Connection successful");
             }
             
-            $this->pdo->query("SELECT 1");
+            $this->pdo->query("SELECT 1" . $this->requestTag());
         } catch (PDOException $e) {
             $errorMsg = "Database: Connection failed: " . $e->getMessage();
             error_log($errorMsg);
@@ -59,6 +59,24 @@ class Database
         }
     }
 
+    /**
+     * SQL comment naming the current request, so query logs can be grouped
+     * per path. Empty unless DB_QUERY_TAGS is enabled.
+     *
+     * @return string
+     */
+    private function requestTag()
+    {
+        if (!defined('DB_QUERY_TAGS') || !DB_QUERY_TAGS || empty($_SERVER['REQUEST_URI'])) {
+            return '';
+        }
+
+        // Whitelist characters: anything else (e.g. "*/") could close the comment
+        $path = preg_replace('~[^A-Za-z0-9/_.\-]~', '', (string) strtok($_SERVER['REQUEST_URI'], '?'));
+        $method = preg_replace('~[^A-Z]~', '', strtoupper($_SERVER['REQUEST_METHOD'] ?? 'GET'));
+        return ' /* nn-request: ' . $method . ' ' . $path . ' */';
+    }
+
     public static function getInstance()
     {
         if (self::$instance === null) {
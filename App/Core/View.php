@@ -103,6 +103,22 @@ class View
         return \App\Helpers\PerformanceCache::getOptimizedImagePath($path, $width, $height);
     }
     
+    /**
+     * Prebuilt variant of an image URL for templates (see PerformanceCache::getVariantUrl)
+     *
+     * @param string $url
+     * @param int|null $width Rendered width in CSS pixels times the device pixel ratio
+     * @return string
+     */
+    public static function imageVariant($url, $width = null)
+    {
+        if (!class_exists('App\Helpers\PerformanceCache')) {
+            require_once ROOT_DIR . '/App/Helpers/PerformanceCache.php';
+        }
+        
+        return \App\Helpers\PerformanceCache::getVariantUrl($url, $width);
+    }
+    
     /**
      * Generate correct image path for public/images/
      *
@@ -11,6 +11,7 @@ class PerformanceCache
     private static $cacheDir;
     private static $tempDir;
     private static $imageCacheDir;
+    private static $variantManifest = null;
     
     public static function init()
     {
@@ -396,7 +397,13 @@ class PerformanceCache
     {
         // Check if it's already a full URL
         if (filter_var($imagePath, FILTER_VALIDATE_URL)) {
-            return $imagePath;
+            return self::getVariantUrl($imagePath, $width, $height);
+        }
+        
+        // Prefer a variant prebuilt by test/python/image_pipeline.py
+        $variant = self::getPrebuiltVariant($imagePath, $width, $height);
+        if ($variant) {
+            return \App\Core\View::url($variant);
         }
         
         // Try to cache and optimize the image
@@ -409,4 +416,89 @@ class PerformanceCache
         // Fallback to original path
         return \App\Core\View::asset($imagePath);
     }
+    
+    /**
+     * Swap an image URL for its prebuilt variant. Remote URLs and images the
+     * pipeline has not seen come back unchanged; nothing is resized here.
+     */
+    public static function getVariantUrl($imageUrl, $width = null, $height = null)
+    {
+        if (!is_string($imageUrl) || $imageUrl === '') {
+            return $imageUrl;
+        }
+        
+        $path = $imageUrl;
+        $prefixes = [defined('ASSETS_URL') ? ASSETS_URL : null, BASE_URL . '/public', BASE_URL];
+        foreach ($prefixes as $prefix) {
+            if ($prefix && strpos($imageUrl, $prefix . '/') === 0) {
+                $path = substr($imageUrl, strlen($prefix) + 1);
+                break;
+            }
+        }
+        if (filter_var($path, FILTER_VALIDATE_URL)) {
+            return $imageUrl;
+        }
+        
+        $variant = self::getPrebuiltVariant(parse_url($path, PHP_URL_PATH), $width, $height);
+        return $variant ? \App\Core\View::url($variant) : $imageUrl;
+    }
+    
+    /**
+     * Get the prebuilt variant manifest entry for an image, or null if the
+     * image has no variants or changed since the manifest was written
+     */
+    public static function getImageVariants($imagePath)
+    {
+        if (self::$variantManifest === null) {
+            $manifestFile = ROOT_DIR . '/App/storage/cache/variants/manifest.json';
+            $manifest = is_file($manifestFile) ? json_decode(file_get_contents($manifestFile), true) : null;
+            self::$variantManifest = $manifest['images'] ?? [];
+        }
+        
+        $key = ltrim($imagePath, '/');
+        if (!isset(self::$variantManifest[$key])) {
+            return null;
+        }
+        
+        $entry = self::$variantManifest[$key];
+        $originalPath = ROOT_DIR . '/public/' . $key;
+        if (!file_exists($originalPath) || filemtime($originalPath) != $entry['mtime']) {
+            return null;
+        }
+        
+        return $entry;
+    }
+    
+    /**
+     * Pick the smallest prebuilt variant at least as wide as requested
+     */
+    private static function getPrebuiltVariant($imagePath, $width = null, $height = null, $formats = ['webp', 'jpeg'])
+    {
+        $entry = self::getImageVariants($imagePath);
+        if (!$entry) {
+            return null;
+        }
+        
+        if (!$width && $height) {
+            $width = (int)ceil($entry['width'] * $height / $entry['height']);
+        }
+        $width = $width ?: $entry['width'];
+        
+        foreach ($formats as $format) {
+            if (empty($entry['variants'][$format])) {
+                continue;
+            }
+            
+            $variants = $entry['variants'][$format];
+            ksort($variants, SORT_NUMERIC);
+            foreach ($variants as $variantWidth => $path) {
+                if ($variantWidth >= $width) {
+                    return $path;
+                }
+            }
+            return end($variants);
+        }
+        
+        return null;
+    }
 }
@@ -0,0 +1,50 @@
+<?php
+
+namespace App\Helpers;
+
+/**
+ * Service Client
+ * Small JSON-over-HTTP client for the local sidecar services
+ * (search index, click-fraud windows). A request that fails or exceeds
+ * its timeout is logged and returns null, so callers can fall back to SQL.
+ */
+class ServiceClient
+{
+    /**
+     * Perform a request and decode the JSON response
+     *
+     * @param string $baseUrl Service base URL without trailing slash
+     * @param string $method
+     * @param string $path Path including query string
+     * @param int $timeoutMs Connect and total timeout
+     * @param array|null $payload Sent as a JSON body when given
+     * @return array|null
+     */
+    public static function request(string $baseUrl, string $method, string $path, int $timeoutMs, ?array $payload = null): ?array
+    {
+        $ch = curl_init();
+        curl_setopt($ch, CURLOPT_URL, $baseUrl . $path);
+        curl_setopt($ch, CURLOPT_RETURNTRANSFER, 1);
+        curl_setopt($ch, CURLOPT_CUSTOMREQUEST, $method);
+        curl_setopt($ch, CURLOPT_TIMEOUT_MS, $timeoutMs);
+        curl_setopt($ch, CURLOPT_CONNECTTIMEOUT_MS, $timeoutMs);
+        curl_setopt($ch, CURLOPT_NOSIGNAL, 1);
+        if ($payload !== null) {
+            curl_setopt($ch, CURLOPT_POSTFIELDS, json_encode($payload));
+            curl_setopt($ch, CURLOPT_HTTPHEADER, ['Content-Type: application/json']);
+        }
+
+        $body = curl_exec($ch);
+        $httpCode = curl_getinfo($ch, CURLINFO_HTTP_CODE);
+        $curlError = curl_error($ch);
+        curl_close($ch);
+
+        if ($curlError || $httpCode !== 200) {
+            error_log('ServiceClient: ' . $method . ' ' . $baseUrl . $path . ' failed: ' . ($curlError ?: 'HTTP ' . $httpCode));
+            return null;
+        }
+
+        $data = json_decode($body, true);
+        return is_array($data) ? $data : null;
+    }
+}
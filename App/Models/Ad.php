@@ -310,6 +310,10 @@ class Ad extends Model
             [$adsId, $ipAddress]
         )->execute();
 
+        if ($fraudService) {
+            $fraudService->recordClick($adsId, $ipAddress, $this->getDb()->lastInsertId());
+        }
+
         // Update click count
         $this->getDb()->query(
             "UPDATE ads SET click = click + 1 WHERE id = ?",
@@ -341,6 +341,41 @@ class Product extends Model
         return $this->db->query($sql, [$searchPattern, $searchPattern, $searchPattern, $limit, $offset])->all();
     }
 
+    /**
+     * Get active products by ID, in the order given
+     *
+     * Used to hydrate result pages from the search index.
+     *
+     * @param array $ids
+     * @return array
+     */
+    public function findActiveByIdsInOrder(array $ids)
+    {
+        $ids = array_values(array_unique(array_map('intval', $ids)));
+        if (empty($ids)) {
+            return [];
+        }
+
+        $placeholders = implode(',', array_fill(0, count($ids), '?'));
+        $sql = "SELECT p.*
+                FROM {$this->table} p
+                WHERE p.id IN ($placeholders)
+                AND p.status = 'active'";
+
+        $rows = [];
+        foreach ($this->db->query($sql, $ids)->all() as $row) {
+            $rows[(int)$row['id']] = $row;
+        }
+
+        $ordered = [];
+        foreach ($ids as $id) {
+            if (isset($rows[$id])) {
+                $ordered[] = $rows[$id];
+            }
+        }
+        return $ordered;
+    }
+
     /**
      * Get total count of search results
      *
@@ -19,7 +19,7 @@ class ProductView extends Model
      * 
      * @param int $productId
      * @param string|null $ip IP address (defaults to current user's IP)
-     * @return int|false View record ID or false on failure
+     * @return int|bool View record ID, true when spooled, or false on failure
      */
     public function recordView($productId, $ip = null)
     {
@@ -31,6 +31,11 @@ class ProductView extends Model
             $ip = $this->getClientIp();
         }
 
+        // Spooled: the aggregator inserts views in bulk
+        if (\App\Services\AdEventSpool::isEnabled()) {
+            return \App\Services\AdEventSpool::append('view', $productId, $ip);
+        }
+
         try {
             $sql = "INSERT INTO {$this->table} (product_id, ip, created_at) VALUES (?, ?, NOW())";
             $result = $this->db->query($sql, [$productId, $ip])->execute();
@@ -0,0 +1,96 @@
+<?php
+
+namespace App\Services;
+
+/**
+ * Ad Event Spool
+ *
+ * Append-only local spool for ad reach and product view events. When
+ * AD_EVENT_SPOOL_DIR is set, SponsoredAdsService::logAdView() and
+ * ProductView::recordView() queue one line per event here instead of
+ * writing to MySQL, and the queue is flushed once per request into a
+ * per-minute segment file (events-YYYYmmddHHii.log, UTC so the aggregator
+ * can tell closed segments apart whatever its host time zone).
+ *
+ * test/python/ad_event_aggregator.py drains closed segments in batches:
+ * it dedupes reach by ad, IP and day, bills impressions, and writes the
+ * rolled-up rows and counters in bulk.
+ *
+ * Line format: unix_time \t type \t id \t ip
+ */
+class AdEventSpool
+{
+    /**
+     * @var string[] Lines queued during this request
+     */
+    private static $buffer = [];
+
+    /**
+     * @var bool
+     */
+    private static $flushRegistered = false;
+
+    /**
+     * Whether events should be spooled instead of written synchronously
+     *
+     * @return bool
+     */
+    public static function isEnabled()
+    {
+        return defined('AD_EVENT_SPOOL_DIR') && AD_EVENT_SPOOL_DIR !== '';
+    }
+
+    /**
+     * Queue an event; it is written when the request finishes
+     *
+     * @param string $type 'reach' or 'view'
+     * @param int $id Ad ID for reach, product ID for view
+     * @param string $ipAddress
+     * @return bool False when spooling is disabled
+     */
+    public static function append($type, $id, $ipAddress)
+    {
+        if (!self::isEnabled()) {
+            return false;
+        }
+
+        $ipAddress = str_replace(["\t", "\r", "\n"], '', (string)$ipAddress);
+        self::$buffer[] = time() . "\t" . $type . "\t" . (int)$id . "\t" . $ipAddress . "\n";
+
+        if (!self::$flushRegistered) {
+            register_shutdown_function([self::class, 'flush']);
+            self::$flushRegistered = true;
+        }
+
+        return true;
+    }
+
+    /**
+     * Write queued events to the current segment with a single locked append
+     *
+     * @return bool
+     */
+    public static function flush()
+    {
+        if (empty(self::$buffer)) {
+            return true;
+        }
+
+        $lines = implode('', self::$buffer);
+        self::$buffer = [];
+
+        $dir = rtrim(AD_EVENT_SPOOL_DIR, '/');
+        if (!is_dir($dir) && !@mkdir($dir, 0775, true) && !is_dir($dir)) {
+            error_log("AdEventSpool: Cannot create spool directory {$dir}");
+            return false;
+        }
+
+        $file = $dir . '/events-' . gmdate('YmdHi') . '.log';
+        if (file_put_contents($file, $lines, FILE_APPEND | LOCK_EX) === false) {
+            error_log("AdEventSpool: Failed to append to {$file}");
+            return false;
+        }
+
+        return true;
+    }
+}
@@ -3,6 +3,7 @@
 namespace App\Services;
 
 use App\Core\Database;
+use App\Helpers\ServiceClient;
 use App\Models\Ad;
 
 /**
@@ -22,10 +23,16 @@ class AdFraudDetectionService
     private $maxClicksPerHourPerIp = 3; // Maximum valid clicks per hour from same IP (like Google/Facebook)
     private $duplicateClickWindow = 60; // minutes - check for duplicates within this window
     
+    // Sliding-window counter service (test/python/fraud_window.py serve)
+    private $serviceUrl;
+    private $serviceTimeoutMs;
+    
     public function __construct()
     {
         $this->db = Database::getInstance();
         $this->adModel = new Ad();
+        $this->serviceUrl = defined('AD_FRAUD_SERVICE_URL') ? rtrim(AD_FRAUD_SERVICE_URL, '/') : '';
+        $this->serviceTimeoutMs = defined('AD_FRAUD_SERVICE_TIMEOUT_MS') ? (int) AD_FRAUD_SERVICE_TIMEOUT_MS : 50;
     }
     
     /**
@@ -57,7 +64,20 @@ class AdFraudDetectionService
             ];
         }
         
-        // IP limit is enabled - check for fraud/duplicates
+        // IP limit is enabled - ask the window service first, fall back to SQL if it does not answer.
+        // Its result also carries unique_ads_today / ad_clicks_today for RealTimeAdBillingService::chargeClick
+        if ($this->serviceUrl !== '') {
+            $response = ServiceClient::request($this->serviceUrl, 'GET', '/check?' . http_build_query([
+                'ad' => (int) $adId,
+                'ip' => $ipAddress,
+                'session' => $sessionId ? 1 : 0
+            ]), $this->serviceTimeoutMs);
+            if ($response && !empty($response['success'])) {
+                unset($response['success'], $response['took_us']);
+                return $response;
+            }
+        }
+        
         // Check clicks from same IP in last hour
         $clicksLastHour = $this->db->query(
             "SELECT COUNT(*) as click_count
@@ -201,6 +221,23 @@ class AdFraudDetectionService
         ];
     }
     
+    /**
+     * Tell the window service about a logged click
+     * 
+     * The service also tails ads_click_logs by id, so a failed call here is
+     * picked up on its next poll; the id lets it count the click only once.
+     * 
+     * @param int $adId Ad ID
+     * @param string $ipAddress IP address of the click
+     * @param int $clickId ads_click_logs row id
+     */
+    public function recordClick($adId, $ipAddress, $clickId)
+    {
+        if ($this->serviceUrl !== '') {
+            ServiceClient::request($this->serviceUrl, 'POST', '/click', $this->serviceTimeoutMs, ['ad' => (int) $adId, 'ip' => $ipAddress, 'id' => (int) $clickId]);
+        }
+    }
+    
     /**
      * Auto-suspend ad due to fraud detection
      * 
@@ -230,4 +267,3 @@ class AdFraudDetectionService
         return true;
     }
 }
-
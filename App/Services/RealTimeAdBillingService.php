@@ -227,12 +227,13 @@ class RealTimeAdBillingService
     {
         $today = date('Y-m-d');
         
+        // Range on clicked_at instead of DATE(clicked_at) = ? so an index can be used
         $result = $this->db->query(
             "SELECT COUNT(DISTINCT ads_id) as clicked_count
              FROM ads_click_logs
              WHERE ip_address = ?
-             AND DATE(clicked_at) = ?",
-            [$ipAddress, $today]
+             AND clicked_at >= ? AND clicked_at < ? + INTERVAL 1 DAY",
+            [$ipAddress, $today, $today]
         )->single();
         
         return (int)($result['clicked_count'] ?? 0);
@@ -258,8 +259,8 @@ class RealTimeAdBillingService
              FROM ads_click_logs
              WHERE ads_id = ?
              AND ip_address = ?
-             AND DATE(clicked_at) = ?",
-            [$adId, $ipAddress, $today]
+             AND clicked_at >= ? AND clicked_at < ? + INTERVAL 1 DAY",
+            [$adId, $ipAddress, $today, $today]
         )->single();
         
         $clickCount = (int)($result['count'] ?? 0);
@@ -308,7 +309,10 @@ class RealTimeAdBillingService
         if ($ipLimitEnabled) {
             // Count unique ads this IP has clicked today
             // Note: Current click is already logged, so it's included in the count
-            $uniqueAdsClicked = $this->getUniqueAdsClickedByIp($ipAddress);
+            // The fraud window service (AD_FRAUD_SERVICE_URL) already returned today's counts
+            $uniqueAdsClicked = isset($fraudCheck['unique_ads_today'])
+                ? (int)$fraudCheck['unique_ads_today']
+                : $this->getUniqueAdsClickedByIp($ipAddress);
             
             // If unique count > 10, limit exceeded (10 is the max, so > 10 means exceeded)
             if ($uniqueAdsClicked > 10) {
@@ -318,7 +322,10 @@ class RealTimeAdBillingService
             
             // Check if this specific ad was already clicked by this IP today (previous click, not current)
             // This prevents charging multiple times for the same ad from same IP
-            if ($this->hasIpClickedAdToday($adId, $ipAddress)) {
+            $clickedToday = isset($fraudCheck['ad_clicks_today'])
+                ? (int)$fraudCheck['ad_clicks_today'] > 1
+                : $this->hasIpClickedAdToday($adId, $ipAddress);
+            if ($clickedToday) {
                 error_log("RealTimeAdBillingService: Ad #{$adId} already clicked by IP: {$ipAddress} today - skipping charge");
                 return ['success' => false, 'charged' => 0, 'message' => 'This ad already clicked from your IP today'];
             }
@@ -0,0 +1,91 @@
+<?php
+
+namespace App\Services;
+
+use App\Helpers\ServiceClient;
+
+/**
+ * Product Search Index Client
+ *
+ * Queries the inverted-index search service (test/python/search_index.py)
+ * instead of running LIKE scans on products. Returns null when the
+ * service is not configured or does not answer within
+ * SEARCH_SERVICE_TIMEOUT_MS, so callers can fall back to SQL.
+ */
+class SearchIndexService
+{
+    private $baseUrl;
+    private $timeoutMs;
+
+    public function __construct()
+    {
+        $this->baseUrl = defined('SEARCH_SERVICE_URL') ? rtrim(SEARCH_SERVICE_URL, '/') : '';
+        $this->timeoutMs = defined('SEARCH_SERVICE_TIMEOUT_MS') ? (int) SEARCH_SERVICE_TIMEOUT_MS : 150;
+    }
+
+    /**
+     * Whether a search service is configured
+     */
+    public function isEnabled(): bool
+    {
+        return $this->baseUrl !== '';
+    }
+
+    /**
+     * Search products
+     *
+     * @param string $keyword
+     * @param int $limit
+     * @param int $offset
+     * @param string $sort relevance, newest, price-low, price-high or popular
+     * @param array $filters Facet filters (category, subtype, flavor, brand, size, color)
+     * @param bool $facets Include facet counts
+     * @return array|null ['total' => int, 'ids' => int[], 'products' => array[], 'facets' => array]
+     */
+    public function search(string $keyword, int $limit = 20, int $offset = 0, string $sort = 'relevance', array $filters = [], bool $facets = false): ?array
+    {
+        if (!$this->isEnabled()) {
+            return null;
+        }
+
+        $query = array_merge(array_filter($filters, 'strlen'), [
+            'q' => $keyword,
+            'limit' => $limit,
+            'offset' => $offset,
+            'sort' => $sort,
+            'facets' => $facets ? 1 : 0
+        ]);
+        $response = ServiceClient::request($this->baseUrl, 'GET', '/search?' . http_build_query($query), $this->timeoutMs);
+
+        if (!$response || empty($response['success'])) {
+            return null;
+        }
+
+        return [
+            'total' => (int) ($response['total'] ?? 0),
+            'ids' => array_map('intval', $response['ids'] ?? []),
+            'products' => $response['products'] ?? [],
+            'facets' => $response['facets'] ?? []
+        ];
+    }
+
+    /**
+     * Drop a deleted product from the index now (hard DELETEs never show up in its updated_at poll)
+     */
+    public function remove(int $productId): void
+    {
+        if ($this->isEnabled()) {
+            ServiceClient::request($this->baseUrl, 'POST', '/remove', $this->timeoutMs, ['id' => $productId]);
+        }
+    }
+
+    /**
+     * Ask the service to pick up product changes now instead of at its next poll
+     */
+    public function requestSync(): void
+    {
+        if ($this->isEnabled()) {
+            ServiceClient::request($this->baseUrl, 'POST', '/sync', $this->timeoutMs);
+        }
+    }
+}
@@ -359,13 +359,19 @@ class SponsoredAdsService
             return;
         }
 
+        $ipAddress = $ipAddress ?? ($_SERVER['REMOTE_ADDR'] ?? '0.0.0.0');
+
+        // Spooled: the aggregator logs reach and bills the impression in batches
+        if (AdEventSpool::isEnabled()) {
+            AdEventSpool::append('reach', $adId, $ipAddress);
+            return;
+        }
+
         $ad = $this->adModel->find($adId);
         if (!$ad) {
             return;
         }
 
-        $ipAddress = $ipAddress ?? ($_SERVER['REMOTE_ADDR'] ?? '0.0.0.0');
-
         // Banner ads: just log reach, no billing or auto pause
         if ($this->isBannerAdType($ad['ads_type_id'] ?? null)) {
             $this->adModel->logReach($adId, $ipAddress);
@@ -100,7 +100,7 @@ $adId = $isSponsored || $hasAdId ? ($product['ad_id'] ?? null) : null;
                    <?php endif; ?>>
             </video>
         <?php else: ?>
-            <img src="<?= htmlspecialchars($mainImageUrl) ?>"
+            <img src="<?= htmlspecialchars(\App\Core\View::imageVariant($mainImageUrl, 480)) ?>"
                  alt="<?= htmlspecialchars($product['product_name'] ?? 'Product') ?>"
                  class="w-full h-full object-cover rounded-2xl"
                  loading="lazy"
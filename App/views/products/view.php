@@ -275,7 +275,7 @@ include __DIR__ . '/../seo/product-seo.php';
                                             Your browser does not support the video tag.
                                         </video>
                                     <?php else: ?>
-                                        <img src="<?= htmlspecialchars($mediaUrl) ?>" 
+                                        <img src="<?= htmlspecialchars(\App\Core\View::imageVariant($mediaUrl, 960)) ?>" 
                                              alt="<?= $productName ?> - Image <?= $index + 1 ?>" 
                                              id="<?= $index === 0 ? 'main-product-media' : '' ?>"
                                              class="w-full h-full object-contain transition-all duration-300"
@@ -319,7 +319,7 @@ include __DIR__ . '/../seo/product-seo.php';
                                         <i class="fas fa-play"></i>
                                     </div>
                                 <?php else: ?>
-                                    <img src="<?= htmlspecialchars($thumbnailUrl) ?>" 
+                                    <img src="<?= htmlspecialchars(\App\Core\View::imageVariant($thumbnailUrl, 320)) ?>" 
                                          alt="<?= $productName ?> - Image <?= $index + 1 ?>" 
                                          class="w-full h-full object-cover transition-all duration-200 hover:scale-110"
                                          onerror="this.src='<?= ASSETS_URL ?>/images/products/default.jpg'">
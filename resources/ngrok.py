@@ -6,6 +6,13 @@ Monitor System - Optional Ngrok Tunnel
 This script provides optional online access via Ngrok tunnel.
 Run this in a separate terminal after starting the main server.
 
+While the tunnel is up, background probes time a set of storefront paths
+through both the local port and the public tunnel URL. Latency
+histograms (cumulative, plus rolling p50/p90/p99 over the last few
+minutes) are served in Prometheus text format on
+http://localhost:NGROK_METRICS_PORT/metrics and, if NGROK_METRICS_FILE is
+set, written to that file for a node_exporter textfile collector.
+
 Usage: python routes/ngrok.py
 """
 
@@ -15,6 +22,9 @@ import time
 import json
 import logging
 import subprocess
+import threading
+import bisect
+from collections import deque
 import requests
 from http.server import HTTPServer, BaseHTTPRequestHandler
 
@@ -23,6 +33,17 @@ NGROK_AUTHTOKEN = "2vrNVi3RK0lj1sW9EzyPi4KNuYd_4GB25NyF8wysugSiHLuzf"
 LOCAL_PORT = 8000
 NGROK_API_URL = "http://localhost:4040/api/tunnels"
 
+# Synthetic latency probes
+PROBE_PATHS = [p.strip() for p in os.environ.get('NGROK_PROBE_PATHS', '/,/products,/cart').split(',') if p.strip()]
+PROBE_INTERVAL = float(os.environ.get('NGROK_PROBE_INTERVAL', 15))
+PROBE_TIMEOUT = float(os.environ.get('NGROK_PROBE_TIMEOUT', 10))
+METRICS_PORT = int(os.environ.get('NGROK_METRICS_PORT', 9464))
+# Local only by default; set NGROK_METRICS_BIND=0.0.0.0 to let a remote Prometheus scrape it
+METRICS_BIND = os.environ.get('NGROK_METRICS_BIND', '127.0.0.1')
+METRICS_FILE = os.environ.get('NGROK_METRICS_FILE')
+ROLLING_WINDOW = 300  # seconds covered by the rolling quantiles
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -213,6 +234,180 @@ class NgrokTunnel:
             pass
         return None
 
+class ProbeMetrics:
+    """Thread-safe latency histograms and gauges, rendered as Prometheus text"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}   # (target, path) -> {'buckets', 'sum', 'count', 'recent'}
+        self.results = {}      # (target, path, status) -> count
+        self.gauges = {'ngrok_tunnel_up': 0}
+        self.counters = {'ngrok_tunnel_reconnects_total': 0}
+
+    def observe(self, target, path, seconds, status):
+        with self.lock:
+            h = self.histograms.get((target, path))
+            if h is None:
+                h = {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0, 'recent': deque()}
+                self.histograms[(target, path)] = h
+            key = (target, path, str(status))
+            self.results[key] = self.results.get(key, 0) + 1
+            if seconds is None:
+                return
+            idx = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+            if idx < len(h['buckets']):
+                h['buckets'][idx] += 1
+            h['sum'] += seconds
+            h['count'] += 1
+            now = time.time()
+            h['recent'].append((now, seconds))
+            while h['recent'] and h['recent'][0][0] < now - ROLLING_WINDOW:
+                h['recent'].popleft()
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def inc(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def render(self):
+        """Return the Prometheus text exposition of all metrics"""
+        lines = [
+            '# HELP ngrok_probe_latency_seconds Storefront probe latency by target and path',
+            '# TYPE ngrok_probe_latency_seconds histogram',
+        ]
+        with self.lock:
+            now = time.time()
+            rolling = []
+            for (target, path), h in sorted(self.histograms.items()):
+                labels = f'target="{target}",path="{path}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, h['buckets']):
+                    cumulative += count
+                    lines.append(f'ngrok_probe_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'ngrok_probe_latency_seconds_bucket{{{labels},le="+Inf"}} {h["count"]}')
+                lines.append(f'ngrok_probe_latency_seconds_sum{{{labels}}} {h["sum"]:.6f}')
+                lines.append(f'ngrok_probe_latency_seconds_count{{{labels}}} {h["count"]}')
+                values = sorted(v for ts, v in h['recent'] if ts >= now - ROLLING_WINDOW)
+                for q in (0.5, 0.9, 0.99):
+                    if values:
+                        value = values[min(len(values) - 1, int(q * len(values)))]
+                        rolling.append(f'ngrok_probe_latency_rolling_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f'# HELP ngrok_probe_latency_rolling_seconds Probe latency quantiles over the last {ROLLING_WINDOW}s')
+            lines.append('# TYPE ngrok_probe_latency_rolling_seconds gauge')
+            lines.extend(rolling)
+            lines.append('# HELP ngrok_probe_results_total Probe results by status code (ERR = no response)')
+            lines.append('# TYPE ngrok_probe_results_total counter')
+            for (target, path, status), count in sorted(self.results.items()):
+                lines.append(f'ngrok_probe_results_total{{target="{target}",path="{path}",status="{status}"}} {count}')
+            for name, value in self.gauges.items():
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {value}')
+            for name, value in self.counters.items():
+                lines.append(f'# TYPE {name} counter')
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Atomically write metrics for a node_exporter textfile collector"""
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+class LatencyProbe(threading.Thread):
+    """Background prober for one target so a slow tunnel never blocks the monitor loop"""
+
+    def __init__(self, target, base_url_getter, metrics, stop_event):
+        super().__init__(name=f'probe-{target}', daemon=True)
+        self.target = target
+        self.base_url_getter = base_url_getter
+        self.metrics = metrics
+        self.stop_event = stop_event
+        self.session = requests.Session()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            base_url = self.base_url_getter()
+            if base_url:
+                for path in PROBE_PATHS:
+                    self.probe(base_url.rstrip('/') + path, path)
+            self.stop_event.wait(PROBE_INTERVAL)
+
+    def probe(self, url, path):
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=PROBE_TIMEOUT, allow_redirects=False,
+                                        headers={'ngrok-skip-browser-warning': '1'})
+            self.metrics.observe(self.target, path, time.perf_counter() - start, response.status_code)
+        except requests.RequestException:
+            self.metrics.observe(self.target, path, None, 'ERR')
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the ProbeMetrics attached to the server"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ProbeMonitor:
+    """Owns the probe threads, metrics endpoint and textfile writer"""
+
+    def __init__(self, tunnel):
+        self.tunnel = tunnel
+        self.metrics = ProbeMetrics()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.server = None
+
+    def start(self):
+        self.threads = [
+            LatencyProbe('local', lambda: f'http://localhost:{LOCAL_PORT}', self.metrics, self.stop_event),
+            LatencyProbe('tunnel', lambda: self.tunnel.tunnel_url, self.metrics, self.stop_event),
+        ]
+        if METRICS_FILE:
+            self.threads.append(threading.Thread(target=self._write_loop, name='metrics-file', daemon=True))
+        for t in self.threads:
+            t.start()
+        try:
+            self.server = HTTPServer((METRICS_BIND, METRICS_PORT), MetricsHandler)
+            self.server.metrics = self.metrics
+            threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+            logger.info(f"📈 Probe metrics on http://{METRICS_BIND}:{METRICS_PORT}/metrics")
+        except OSError as e:
+            self.server = None
+            logger.warning(f"Metrics endpoint not started on port {METRICS_PORT}: {e}")
+
+    def _write_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.metrics.write_textfile(METRICS_FILE)
+            except OSError as e:
+                logger.warning(f"Failed to write metrics file: {e}")
+            self.stop_event.wait(PROBE_INTERVAL)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
 def main():
     """Main function"""
     print("🌍 Monitor System - Ngrok Tunnel")
@@ -258,6 +453,10 @@ def main():
         print("💡 Press Ctrl+C to stop tunnel")
         print()
         
+        monitor = ProbeMonitor(tunnel)
+        monitor.start()
+        monitor.metrics.set_gauge('ngrok_tunnel_up', 1)
+        
         try:
             # Keep tunnel running with improved monitoring
             check_interval = 5  # Check every 5 seconds
@@ -269,6 +468,7 @@ def main():
                 
                 # Check if process is alive
                 if not tunnel.is_process_alive():
+                    monitor.metrics.set_gauge('ngrok_tunnel_up', 0)
                     consecutive_failures += 1
                     logger.warning(f"Ngrok process died (failure {consecutive_failures}/{max_consecutive_failures})")
                     
@@ -284,6 +484,7 @@ def main():
                     time.sleep(backoff_time)
                     
                     tunnel.reconnect_attempts += 1
+                    monitor.metrics.inc('ngrok_tunnel_reconnects_total')
                     if tunnel.reconnect_attempts > tunnel.max_reconnect_attempts:
                         print("❌ Max reconnection attempts reached. Stopping...")
                         break
@@ -292,6 +493,7 @@ def main():
                         tunnel_url = tunnel.get_tunnel_url()
                         if tunnel_url:
                             print(f"✅ Reconnected! New URL: {tunnel_url}")
+                            monitor.metrics.set_gauge('ngrok_tunnel_up', 1)
                             consecutive_failures = 0
                             tunnel.reconnect_attempts = 0
                         else:
@@ -302,18 +504,21 @@ def main():
                 
                 # Check tunnel health via API
                 elif not tunnel.check_tunnel_health():
+                    monitor.metrics.set_gauge('ngrok_tunnel_up', 0)
                     consecutive_failures += 1
                     logger.warning(f"Tunnel health check failed (failure {consecutive_failures}/{max_consecutive_failures})")
                     
                     if consecutive_failures >= max_consecutive_failures:
                         print("⚠️  Tunnel health check failed multiple times, restarting...")
                         tunnel.stop_tunnel()
+                        monitor.metrics.inc('ngrok_tunnel_reconnects_total')
                         time.sleep(2)
                         
                         if tunnel.start_tunnel():
                             tunnel_url = tunnel.get_tunnel_url()
                             if tunnel_url:
                                 print(f"✅ Restarted! New URL: {tunnel_url}")
+                                monitor.metrics.set_gauge('ngrok_tunnel_up', 1)
                                 consecutive_failures = 0
                             else:
                                 print("⚠️  Tunnel restarted but URL not available")
@@ -322,6 +527,7 @@ def main():
                             break
                 else:
                     # Tunnel is healthy, reset failure counter
+                    monitor.metrics.set_gauge('ngrok_tunnel_up', 1)
                     if consecutive_failures > 0:
                         consecutive_failures = 0
                         tunnel.reconnect_attempts = 0
@@ -330,6 +536,8 @@ def main():
             print("\n🛑 Stopping tunnel...")
             tunnel.stop_tunnel()
             print("✅ Tunnel stopped")
+        finally:
+            monitor.stop()
             
     else:
         print("❌ Failed to get tunnel URL")
@@ -0,0 +1,356 @@
+"""Contention and lost-update test for real-time ad billing.
+
+POST /ads/reach and /ads/click go through SponsoredAdsService to
+RealTimeAdBillingService::chargeImpression / chargeClick. Each charge
+reads the ad and the seller wallet and computes the new balance,
+current_daily_spend, remaining_clicks and ads_daily_spend_log values in
+PHP. It then writes them back as absolute values. The transaction does not
+lock the rows it read (no SELECT ... FOR UPDATE), so two concurrent
+charges on one ad or one seller can both read the same balance and one
+write is lost.
+
+This fires `--impressions` reaches and `--clicks` clicks at a few hot ads
+(`--ads`) from `--concurrency` parallel workers. It then reconciles the
+database against the charges that were actually recorded, which are the
+debit rows in seller_wallet_transactions:
+
+- wallet: recorded charges vs. the drop in seller_wallet.balance
+- spend: impression charges vs. growth of ads.current_daily_spend, and
+  charges beyond daily_budget (overspend)
+- clicks: click charges vs. the drop in ads.remaining_clicks, clicks
+  charged past the remaining count, and ads_daily_spend_log drift
+- balance_after collisions: debits that computed their balance from the
+  same stale read
+
+It also reports latency per endpoint and InnoDB row lock waits during the
+run (Innodb_row_lock_*, sampled current waits, deadlocks).
+
+The endpoints always answer {"success": true}, so MySQL access is
+required. `--prepare` puts the ads into a known state first: active, not
+paused, today's spend and click logs cleared, `--remaining-clicks` clicks
+left, and the seller wallet set to `--balance`. Only use it on a test
+database.
+
+Usage:
+    python test/python/ad_billing_stress.py --ads 3,7 --prepare --impressions 20000 --clicks 2000
+    python test/python/ad_billing_stress.py --ads 3 --clicks 5000 --ips 50 --concurrency 400
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import loadgen
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
+LOCK_KEYS = ("Innodb_row_lock_waits", "Innodb_row_lock_time", "Innodb_row_lock_time_max")
+TOLERANCE = 0.005
+
+
+def money(value: Any) -> float:
+    return round(float(value or 0), 2)
+
+
+def synthetic_ip(n: int) -> str:
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+class Ledger:
+    """Reads (and with --prepare, resets) the billing rows for the hot ads."""
+
+    def __init__(self, args, ad_ids: List[int]):
+        if mysql is None:
+            raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+        self.args = args
+        self.ad_ids = ad_ids
+        self.conn = self.connect()
+        self.cur = self.conn.cursor(dictionary=True)
+
+    def connect(self):
+        return mysql.connect(host=self.args.host, user=self.args.user, password=self.args.password,
+                             database=self.args.database, autocommit=True)
+
+    def rows(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        self.cur.execute(sql, params)
+        return self.cur.fetchall()
+
+    def marks(self, ids: List[int]) -> str:
+        return ",".join(["%s"] * len(ids))
+
+    def prepare(self) -> None:
+        ids = self.ad_ids
+        self.cur.execute(
+            f"UPDATE ads SET status = 'active', auto_paused = 0, current_daily_spend = 0, current_day_spent = 0, "
+            f"last_spend_reset_date = CURDATE(), remaining_clicks = %s WHERE id IN ({self.marks(ids)})",
+            [self.args.remaining_clicks] + ids)
+        self.cur.execute(f"DELETE FROM ads_click_logs WHERE ads_id IN ({self.marks(ids)}) "
+                         f"AND DATE(clicked_at) = CURDATE()", ids)
+        sellers = sorted({a["seller_id"] for a in self.ads().values()})
+        if sellers:
+            self.cur.execute(f"UPDATE seller_wallet SET balance = %s WHERE seller_id IN ({self.marks(sellers)})",
+                             [self.args.balance] + sellers)
+
+    def ads(self) -> Dict[int, Dict[str, Any]]:
+        rows = self.rows(
+            f"SELECT id, seller_id, status, auto_paused, billing_type, daily_budget, current_daily_spend, "
+            f"last_spend_reset_date, per_click_rate, per_impression_rate, remaining_clicks "
+            f"FROM ads WHERE id IN ({self.marks(self.ad_ids)})", self.ad_ids)
+        return {int(r["id"]): r for r in rows}
+
+    def snapshot(self) -> Dict[str, Any]:
+        ads = self.ads()
+        sellers = sorted({a["seller_id"] for a in ads.values()})
+        wallets = {r["seller_id"]: money(r["balance"]) for r in self.rows(
+            f"SELECT seller_id, balance FROM seller_wallet WHERE seller_id IN ({self.marks(sellers)})",
+            sellers)} if sellers else {}
+        spend_log = {int(r["ads_id"]): r for r in self.rows(
+            f"SELECT ads_id, COUNT(*) AS log_rows, COALESCE(SUM(amount), 0) AS amount, "
+            f"COALESCE(SUM(clicks_count), 0) AS clicks FROM ads_daily_spend_log "
+            f"WHERE ads_id IN ({self.marks(self.ad_ids)}) AND spend_date = CURDATE() GROUP BY ads_id",
+            self.ad_ids)}
+        last_txn = self.rows("SELECT COALESCE(MAX(id), 0) AS id FROM seller_wallet_transactions")[0]["id"]
+        return {"ads": ads, "wallets": wallets, "spend_log": spend_log, "last_txn": int(last_txn),
+                "locks": self.lock_status(), "deadlocks": self.deadlocks()}
+
+    def debits_since(self, txn_id: int, sellers: List[int]) -> List[Dict[str, Any]]:
+        if not sellers:
+            return []
+        return self.rows(
+            f"SELECT id, seller_id, amount, description, balance_after FROM seller_wallet_transactions "
+            f"WHERE id > %s AND type = 'debit' AND description LIKE 'Ad #%%' "
+            f"AND seller_id IN ({self.marks(sellers)})", [txn_id] + sellers)
+
+    def lock_status(self) -> Dict[str, int]:
+        rows = self.rows(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({self.marks(list(LOCK_KEYS))})",
+                         LOCK_KEYS)
+        return {r["Variable_name"]: int(r["Value"]) for r in rows}
+
+    def deadlocks(self) -> Optional[int]:
+        try:
+            rows = self.rows("SELECT count FROM information_schema.INNODB_METRICS WHERE name = 'lock_deadlocks'")
+            return int(rows[0]["count"]) if rows else None
+        except mysql.Error:
+            return None
+
+    def close(self) -> None:
+        self.cur.close()
+        self.conn.close()
+
+
+class LockSampler(threading.Thread):
+    """Samples Innodb_row_lock_current_waits on its own connection."""
+
+    def __init__(self, ledger: Ledger, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.conn = ledger.connect()
+        self.interval = interval
+        self.samples: List[int] = []
+        self.stop = threading.Event()
+
+    def run(self) -> None:
+        cur = self.conn.cursor()
+        while not self.stop.is_set():
+            cur.execute("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock_current_waits'")
+            row = cur.fetchone()
+            self.samples.append(int(row[1]) if row else 0)
+            self.stop.wait(self.interval)
+        cur.close()
+        self.conn.close()
+
+
+def build_jobs(args, ad_ids: List[int]) -> List[Dict[str, Any]]:
+    """Shuffled reach/click events; clicks get a fresh IP unless --ips caps them."""
+    jobs = []
+    for i in range(args.impressions):
+        jobs.append({"kind": "reach", "ad": random.choice(ad_ids), "ip": synthetic_ip(i % args.ips if args.ips else i)})
+    for i in range(args.clicks):
+        jobs.append({"kind": "click", "ad": random.choice(ad_ids),
+                     "ip": synthetic_ip((1 << 20) + (i % args.ips if args.ips else i))})
+    random.shuffle(jobs)
+    return jobs
+
+
+async def fire(args, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    base = args.base_url.rstrip("/")
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    results: List[Dict[str, Any]] = []
+
+    async def worker(session) -> None:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            res = await loadgen.fetch(session, f"{base}/ads/{job['kind']}", "POST", label=f"{job['kind']} ad {job['ad']}",
+                                      json={"ads_id": job["ad"], "ip_address": job["ip"]})
+            res["kind"] = job["kind"]
+            results.append(res)
+
+    async with loadgen.make_session(args.concurrency, timeout=args.timeout) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    return {"results": results, "elapsed": elapsed}
+
+
+def reconcile(before: Dict[str, Any], after: Dict[str, Any], debits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    charges = defaultdict(lambda: {"impression": [], "click": []})
+    by_seller = defaultdict(list)
+    for d in debits:
+        desc = d["description"] or ""
+        try:
+            ad_id = int(desc.split("#", 1)[1].split(" ", 1)[0])
+        except (IndexError, ValueError):
+            continue
+        kind = "click" if "Click charge" in desc else "impression"
+        charges[ad_id][kind].append(money(d["amount"]))
+        by_seller[d["seller_id"]].append(d)
+
+    wallets = []
+    for seller, start in before["wallets"].items():
+        rows = by_seller.get(seller, [])
+        recorded = round(sum(money(d["amount"]) for d in rows), 2)
+        dropped = round(start - after["wallets"].get(seller, start), 2)
+        collisions = sum(n - 1 for n in Counter(money(d["balance_after"]) for d in rows).values() if n > 1)
+        wallets.append({"seller": seller, "debits": len(rows), "recorded": recorded, "dropped": dropped,
+                        "lost": round(recorded - dropped, 2), "collisions": collisions,
+                        "negative": after["wallets"].get(seller, 0) < 0})
+
+    ads = []
+    for ad_id, start in before["ads"].items():
+        end = after["ads"].get(ad_id, start)
+        imp, clk = charges[ad_id]["impression"], charges[ad_id]["click"]
+        same_day = str(start["last_spend_reset_date"]) == str(end["last_spend_reset_date"])
+        spend_start = money(start["current_daily_spend"]) if same_day else 0.0
+        spend_growth = round(money(end["current_daily_spend"]) - spend_start, 2)
+        budget = money(start["daily_budget"])
+        room = max(0.0, budget - spend_start)
+        clicks_start = int(start["remaining_clicks"] or 0)
+        clicks_drop = clicks_start - int(end["remaining_clicks"] or 0)
+        log_start = before["spend_log"].get(ad_id, {})
+        log_end = after["spend_log"].get(ad_id, {})
+        ads.append({
+            "ad": ad_id,
+            "billing": start["billing_type"],
+            "imp_charges": len(imp),
+            "imp_amount": round(sum(imp), 2),
+            "spend_growth": spend_growth,
+            "lost_spend": round(sum(imp) - spend_growth, 2) if start["billing_type"] == "daily_budget" else 0.0,
+            "overspend": round(max(0.0, sum(imp) - room), 2) if start["billing_type"] == "daily_budget" else 0.0,
+            "click_charges": len(clk),
+            "clicks_drop": clicks_drop,
+            "lost_click_updates": len(clk) - clicks_drop,
+            "over_clicks": max(0, len(clk) - clicks_start),
+            "log_clicks_drift": len(clk) - (int(log_end.get("clicks", 0)) - int(log_start.get("clicks", 0))),
+            "log_amount_drift": round(sum(clk) - (money(log_end.get("amount")) - money(log_start.get("amount"))), 2),
+            "log_rows": int(log_end.get("log_rows", 0)),
+            "status": f"{end['status']}{' (paused)' if end['auto_paused'] else ''}",
+        })
+    return {"wallets": wallets, "ads": ads}
+
+
+def report(out: Dict[str, Any], rec: Dict[str, Any], before: Dict[str, Any], after: Dict[str, Any],
+           sampler: LockSampler) -> None:
+    results = out["results"]
+    print()
+    loadgen.print_summary(loadgen.summarize(results, out["elapsed"], key="kind"), "Charge request latency (ms)")
+    loadgen.print_summary(loadgen.summarize(results, out["elapsed"]), "By ad")
+
+    locks = {k: after["locks"].get(k, 0) - before["locks"].get(k, 0) for k in LOCK_KEYS}
+    print(f"\nRow lock waits: {locks['Innodb_row_lock_waits']:,}, total wait {locks['Innodb_row_lock_time']:,} ms, "
+          f"max single wait {after['locks'].get('Innodb_row_lock_time_max', 0):,} ms (since server start)")
+    if sampler.samples:
+        print(f"  current waits sampled: peak {max(sampler.samples)}, "
+              f"mean {sum(sampler.samples) / len(sampler.samples):.1f} over {len(sampler.samples)} samples")
+    if before["deadlocks"] is not None and after["deadlocks"] is not None:
+        print(f"  deadlocks: {after['deadlocks'] - before['deadlocks']}")
+
+    print(f"\n{'seller':>7} {'debits':>7} {'recorded':>10} {'wallet drop':>12} {'lost':>9} {'collisions':>11}")
+    for w in rec["wallets"]:
+        print(f"{w['seller']:7d} {w['debits']:7d} {w['recorded']:10.2f} {w['dropped']:12.2f} {w['lost']:9.2f} "
+              f"{w['collisions']:11d}{'  NEGATIVE BALANCE' if w['negative'] else ''}")
+
+    print(f"\n{'ad':>5} {'billing':>13} {'imp chg':>8} {'imp amt':>9} {'spend +':>9} {'lost':>7} {'over':>7} "
+          f"{'clk chg':>8} {'clk drop':>9} {'lost':>5} {'over':>5} {'log drift':>10} {'log rows':>9}  status")
+    for a in rec["ads"]:
+        print(f"{a['ad']:5d} {a['billing'] or '':>13} {a['imp_charges']:8d} {a['imp_amount']:9.2f} "
+              f"{a['spend_growth']:9.2f} {a['lost_spend']:7.2f} {a['overspend']:7.2f} {a['click_charges']:8d} "
+              f"{a['clicks_drop']:9d} {a['lost_click_updates']:5d} {a['over_clicks']:5d} "
+              f"{a['log_clicks_drift']:4d}/{a['log_amount_drift']:<5.2f} {a['log_rows']:9d}  {a['status']}")
+
+    problems = []
+    if any(abs(w["lost"]) > TOLERANCE for w in rec["wallets"]):
+        problems.append("wallet balance does not match recorded charges")
+    if any(w["collisions"] or w["negative"] for w in rec["wallets"]):
+        problems.append("debits computed from stale balances")
+    if any(abs(a["lost_spend"]) > TOLERANCE or a["lost_click_updates"] for a in rec["ads"]):
+        problems.append("lost ad spend / click updates")
+    if any(a["overspend"] > TOLERANCE or a["over_clicks"] for a in rec["ads"]):
+        problems.append("charged past the daily budget or remaining clicks")
+    if any(a["log_clicks_drift"] or abs(a["log_amount_drift"]) > TOLERANCE or a["log_rows"] > 1 for a in rec["ads"]):
+        problems.append("ads_daily_spend_log drift")
+    print("\nResult: " + ("; ".join(problems) if problems else "spend reconciles with recorded charges"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ad billing contention / lost-update test")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--ads", required=True, help="comma-separated hot ad ids")
+    parser.add_argument("--impressions", type=int, default=20000)
+    parser.add_argument("--clicks", type=int, default=2000)
+    parser.add_argument("--ips", type=int, default=0, help="distinct client IPs to cycle through (0 = one per event)")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--prepare", action="store_true", help="reset the ads and wallets first (test DB only)")
+    parser.add_argument("--balance", type=float, default=100000.0, help="wallet balance for --prepare")
+    parser.add_argument("--remaining-clicks", type=int, default=1000, help="remaining_clicks for --prepare")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    args = parser.parse_args()
+
+    ad_ids = [int(a) for a in args.ads.split(",") if a.strip()]
+    ledger = Ledger(args, ad_ids)
+    try:
+        if args.prepare:
+            ledger.prepare()
+        before = ledger.snapshot()
+        missing = set(ad_ids) - set(before["ads"])
+        if missing:
+            raise SystemExit(f"ads not found: {sorted(missing)}")
+
+        jobs = build_jobs(args, ad_ids)
+        print(f"Firing {args.impressions:,} reaches and {args.clicks:,} clicks at ads {ad_ids} "
+              f"with {args.concurrency} workers...")
+        sampler = LockSampler(ledger)
+        sampler.start()
+        try:
+            out = asyncio.run(fire(args, jobs))
+        finally:
+            sampler.stop.set()
+            sampler.join()
+
+        after = ledger.snapshot()
+        sellers = sorted(before["wallets"])
+        rec = reconcile(before, after, ledger.debits_since(before["last_txn"], sellers))
+        report(out, rec, before, after, sampler)
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Batch aggregator for the ad reach / product view spool.
+
+With AD_EVENT_SPOOL_DIR set, App\\Services\\AdEventSpool turns every
+SponsoredAdsService::logAdView() and ProductView::recordView() call into
+one appended line (unix_time, type, id, ip) in a per-minute segment file,
+one locked append per request. Without the spool, a listing showing 20
+sponsored products costs 20+ synchronous reads and writes per pageview.
+
+This drains closed segments (past minutes, untouched for `--grace`
+seconds) and applies each batch in one transaction:
+
+- reach: impressions on product ads are billed per ad in bulk, with the
+  ad and wallet rows locked (SELECT ... FOR UPDATE), using the same rates
+  and auto-pause rules as RealTimeAdBillingService::chargeImpression.
+  Impressions past the budget or balance are dropped, as the synchronous
+  path drops them. Billed impressions and all banner impressions are then
+  deduped by ad, IP and day against ads_reach_logs, bulk-inserted, and
+  rolled up into one `reach = reach + n` per ad.
+- view: bulk-inserted into products_views, optionally deduped per
+  product and IP within `--view-window` seconds.
+
+A segment is renamed to *.working while it is processed and deleted after
+commit. Its name is recorded in ad_event_batches inside the same
+transaction, so a leftover *.working file from a crash between commit and
+delete is recognised on the next pass and removed without being applied
+(or billed) again. Segment names are UTC minutes, as AdEventSpool writes
+them.
+
+Usage:
+    python test/python/ad_event_aggregator.py drain --spool App/storage/spool/ad_events
+    python test/python/ad_event_aggregator.py run --interval 10 --view-window 1800
+    python test/python/ad_event_aggregator.py run --no-charge     # reach/view rollups only
+"""
+
+import argparse
+import datetime
+import glob
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_SPOOL = os.environ.get("AD_EVENT_SPOOL_DIR") or os.path.join(REPO_ROOT, "App", "storage", "spool", "ad_events")
+SEGMENT_GLOB = "events-*.log"
+LEDGER_TABLE = "ad_event_batches"
+CHUNK = 500
+
+Event = Tuple[int, str, int, str]
+
+
+# ------------------------------------------------------------------ spool
+
+def claim_segments(spool: str, grace: float, now: Optional[float] = None) -> List[str]:
+    """Rename closed segments to *.working and return every file to process."""
+    now = time.time() if now is None else now
+    current = "events-" + time.strftime("%Y%m%d%H%M", time.gmtime(now)) + ".log"
+    claimed = sorted(glob.glob(os.path.join(spool, SEGMENT_GLOB + ".working")))
+    for path in sorted(glob.glob(os.path.join(spool, SEGMENT_GLOB))):
+        if os.path.basename(path) >= current or now - os.path.getmtime(path) < grace:
+            continue
+        os.replace(path, path + ".working")
+        claimed.append(path + ".working")
+    return claimed
+
+
+def segment_name(path: str) -> str:
+    name = os.path.basename(path)
+    return name[:-len(".working")] if name.endswith(".working") else name
+
+
+def read_events(paths: List[str]) -> Tuple[List[Event], int]:
+    events: List[Event] = []
+    bad = 0
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            for line in fh:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 4 or parts[1] not in ("reach", "view"):
+                    bad += 1
+                    continue
+                try:
+                    events.append((int(parts[0]), parts[1], int(parts[2]), parts[3]))
+                except ValueError:
+                    bad += 1
+    events.sort()
+    return events, bad
+
+
+def day_of(ts: int) -> datetime.date:
+    return datetime.datetime.fromtimestamp(ts).date()
+
+
+# ------------------------------------------------------------------ database
+
+class Aggregator:
+    def __init__(self, args):
+        if mysql is None:
+            raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+        self.args = args
+        self.conn = mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database,
+                                  autocommit=False)
+        self.cur = self.conn.cursor(dictionary=True)
+        self.stats: Counter = Counter()
+        self.cur.execute(f"CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (segment VARCHAR(64) NOT NULL PRIMARY KEY, "
+                         f"processed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)")
+        self.conn.commit()
+
+    def execute(self, sql: str, params=()) -> None:
+        self.cur.execute(sql, params)
+        self.stats["statements"] += 1
+
+    def executemany(self, sql: str, rows: List[tuple]) -> None:
+        for i in range(0, len(rows), CHUNK):
+            self.cur.executemany(sql, rows[i:i + CHUNK])
+            self.stats["statements"] += 1
+
+    def fetch(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        self.execute(sql, params)
+        return self.cur.fetchall()
+
+    def ad_types(self, ad_ids: List[int]) -> Dict[int, Optional[str]]:
+        marks = ",".join(["%s"] * len(ad_ids))
+        rows = self.fetch(f"SELECT a.id, t.name FROM ads a LEFT JOIN ads_types t ON t.id = a.ads_type_id "
+                          f"WHERE a.id IN ({marks})", ad_ids)
+        return {int(r["id"]): r["name"] for r in rows}
+
+    def pause(self, ad_id: int, reason: str) -> None:
+        self.execute("UPDATE ads SET auto_paused = 1, status = 'inactive', "
+                     "notes = CONCAT(COALESCE(notes, ''), ' | Auto-paused: ', %s) WHERE id = %s", (reason, ad_id))
+        self.stats["paused"] += 1
+
+    def charge(self, ad_id: int, count: int) -> int:
+        """Bill up to `count` impressions of one ad; returns how many may be shown."""
+        rows = self.fetch("SELECT id, seller_id, status, auto_paused, billing_type, daily_budget, current_daily_spend, "
+                          "last_spend_reset_date, per_impression_rate FROM ads WHERE id = %s FOR UPDATE", (ad_id,))
+        if not rows or rows[0]["status"] != "active" or int(rows[0]["auto_paused"] or 0) == 1:
+            return 0
+        ad = rows[0]
+        billing = ad["billing_type"] or "daily_budget"
+        if billing not in ("daily_budget", "per_impression"):
+            return count
+
+        budget = float(ad["daily_budget"] or 0)
+        spend = float(ad["current_daily_spend"] or 0)
+        today = datetime.date.today()
+        if str(ad["last_spend_reset_date"]) != str(today):
+            self.execute("UPDATE ads SET current_daily_spend = 0, current_day_spent = 0, last_spend_reset_date = %s "
+                         "WHERE id = %s", (today, ad_id))
+            spend = 0.0
+
+        if billing == "daily_budget":
+            amount = min(0.01, max(0.01, budget * 0.001))
+            limit_by_budget = math.floor((budget - spend) / amount + 1e-9) if amount > 0 else count
+        else:
+            amount = float(ad["per_impression_rate"] or 0)
+            limit_by_budget = count
+        if amount <= 0:
+            return count
+
+        wallet = self.fetch("SELECT balance FROM seller_wallet WHERE seller_id = %s FOR UPDATE", (ad["seller_id"],))
+        balance = float(wallet[0]["balance"] or 0) if wallet else 0.0
+        billed = max(0, min(count, limit_by_budget, math.floor(balance / amount + 1e-9)))
+
+        if billed:
+            total = round(billed * amount, 2)
+            self.execute("UPDATE seller_wallet SET balance = balance - %s, updated_at = NOW() WHERE seller_id = %s",
+                         (total, ad["seller_id"]))
+            self.execute("INSERT INTO seller_wallet_transactions (seller_id, type, amount, description, balance_after, "
+                         "status) VALUES (%s, 'debit', %s, %s, %s, 'completed')",
+                         (ad["seller_id"], total, f"Ad #{ad_id} - Impression charge x{billed}",
+                          round(balance - total, 2)))
+            if billing == "daily_budget":
+                self.execute("UPDATE ads SET current_daily_spend = current_daily_spend + %s WHERE id = %s",
+                             (total, ad_id))
+                spend += total
+            self.stats["charged"] += billed
+            self.stats["charged_amount_cents"] += int(round(total * 100))
+
+        if billing == "daily_budget" and spend + amount > budget + 1e-9:
+            self.pause(ad_id, "Daily budget exhausted")
+        elif billed < count:
+            self.pause(ad_id, "Insufficient wallet balance")
+        self.stats["dropped"] += count - billed
+        return billed
+
+    def apply_reach(self, events: List[Event]) -> None:
+        by_ad: Dict[int, List[Event]] = defaultdict(list)
+        for e in events:
+            by_ad[e[2]].append(e)
+        if not by_ad:
+            return
+        types = self.ad_types(sorted(by_ad))
+
+        shown: List[Event] = []
+        for ad_id, evs in sorted(by_ad.items()):
+            if ad_id not in types:
+                self.stats["unknown_ad"] += len(evs)
+            elif types[ad_id] == "banner_external" or self.args.no_charge:
+                shown.extend(evs)
+            else:
+                shown.extend(evs[:self.charge(ad_id, len(evs))])
+
+        first: Dict[Tuple[int, str, datetime.date], int] = {}
+        for ts, _, ad_id, ip in shown:
+            first.setdefault((ad_id, ip, day_of(ts)), ts)
+
+        groups: Dict[Tuple[int, datetime.date], List[str]] = defaultdict(list)
+        for ad_id, ip, day in first:
+            groups[(ad_id, day)].append(ip)
+        fresh: List[tuple] = []
+        for (ad_id, day), ips in groups.items():
+            seen = set()
+            for i in range(0, len(ips), CHUNK):
+                part = ips[i:i + CHUNK]
+                rows = self.fetch(
+                    f"SELECT DISTINCT ip_address FROM ads_reach_logs WHERE ads_id = %s AND viewed_at >= %s "
+                    f"AND viewed_at < %s AND ip_address IN ({','.join(['%s'] * len(part))})",
+                    [ad_id, day, day + datetime.timedelta(days=1)] + part)
+                seen.update(r["ip_address"] for r in rows)
+            fresh.extend((ad_id, ip, datetime.datetime.fromtimestamp(first[(ad_id, ip, day)]))
+                         for ip in ips if ip not in seen)
+
+        if fresh:
+            self.executemany("INSERT INTO ads_reach_logs (ads_id, ip_address, viewed_at) VALUES (%s, %s, %s)", fresh)
+            for ad_id, n in sorted(Counter(r[0] for r in fresh).items()):
+                self.execute("UPDATE ads SET reach = reach + %s WHERE id = %s", (n, ad_id))
+        self.stats["reach_logged"] += len(fresh)
+        self.stats["reach_deduped"] += len(shown) - len(fresh)
+
+    def apply_views(self, events: List[Event]) -> None:
+        window = self.args.view_window
+        rows: List[tuple] = []
+        seen = set()
+        for ts, _, product_id, ip in events:
+            if window > 0:
+                key = (product_id, ip, ts // window)
+                if key in seen:
+                    continue
+                seen.add(key)
+            rows.append((product_id, ip, datetime.datetime.fromtimestamp(ts)))
+        if rows:
+            self.executemany("INSERT INTO products_views (product_id, ip, created_at) VALUES (%s, %s, %s)", rows)
+        self.stats["views_logged"] += len(rows)
+        self.stats["views_deduped"] += len(events) - len(rows)
+
+    def drain(self) -> Optional[Dict[str, Any]]:
+        paths = claim_segments(self.args.spool, self.args.grace)
+        if not paths:
+            return None
+        self.stats = Counter()
+        start = time.perf_counter()
+        try:
+            self.conn.start_transaction()
+            names = [segment_name(p) for p in paths]
+            done = {r["segment"] for r in self.fetch(
+                f"SELECT segment FROM {LEDGER_TABLE} WHERE segment IN ({','.join(['%s'] * len(names))}) FOR UPDATE",
+                names)}
+            todo = [p for p in paths if segment_name(p) not in done]
+            events, bad = read_events(todo)
+            self.stats.update(events=len(events), malformed=bad, segments=len(todo), replayed=len(paths) - len(todo))
+            self.apply_reach([e for e in events if e[1] == "reach"])
+            self.apply_views([e for e in events if e[1] == "view"])
+            # Recorded in the same transaction as the writes: a batch is applied exactly once
+            self.executemany(f"INSERT INTO {LEDGER_TABLE} (segment) VALUES (%s)",
+                             [(segment_name(p),) for p in todo])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        for path in paths:
+            os.remove(path)
+        self.stats["ms"] = int((time.perf_counter() - start) * 1000)
+        return dict(self.stats)
+
+    def close(self) -> None:
+        self.cur.close()
+        self.conn.close()
+
+
+def print_batch(stats: Dict[str, Any]) -> None:
+    events = stats.get("events", 0)
+    print(f"{time.strftime('%H:%M:%S')} {stats.get('segments', 0)} segment(s) "
+          f"({stats.get('replayed', 0)} already applied, skipped), {events:,} events "
+          f"({stats.get('malformed', 0)} malformed) -> {stats.get('statements', 0)} statements "
+          f"({stats.get('statements', 0) / max(events, 1):.3f}/event) in {stats.get('ms', 0)} ms | "
+          f"reach {stats.get('reach_logged', 0):,} logged, {stats.get('reach_deduped', 0):,} deduped | "
+          f"charged {stats.get('charged', 0):,} (Rs {stats.get('charged_amount_cents', 0) / 100:.2f}), "
+          f"{stats.get('dropped', 0):,} over budget, {stats.get('paused', 0)} paused | "
+          f"views {stats.get('views_logged', 0):,} logged, {stats.get('views_deduped', 0):,} deduped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ad reach / product view spool aggregator")
+    parser.add_argument("--spool", default=DEFAULT_SPOOL)
+    parser.add_argument("--grace", type=float, default=5.0, help="skip segments modified this recently (s)")
+    parser.add_argument("--view-window", type=int, default=0,
+                        help="count one view per product and IP per window (s); 0 keeps every view")
+    parser.add_argument("--no-charge", action="store_true", help="log reach without billing impressions")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("drain", help="process closed segments once and exit")
+    rn = sub.add_parser("run", help="drain in a loop")
+    rn.add_argument("--interval", type=float, default=10.0)
+    args = parser.parse_args()
+
+    agg = Aggregator(args)
+    try:
+        while True:
+            try:
+                stats = agg.drain()
+            except mysql.Error as exc:
+                if args.command == "drain":
+                    raise
+                print(f"{time.strftime('%H:%M:%S')} batch rolled back, will retry: {exc}")
+                stats = None
+            if stats:
+                print_batch(stats)
+            elif args.command == "drain":
+                print("Nothing to drain.")
+            if args.command == "drain":
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        agg.close()
+
+
+if __name__ == "__main__":
+    main()
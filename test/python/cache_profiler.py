@@ -0,0 +1,328 @@
+"""File-cache profiler for App/Core/Cache.php and PerformanceCache.
+
+`scan` walks App/storage/cache/ and reports, per cache tree:
+
+- Cache.php entries (`<key>.cache`, JSON with expires/data/created)
+- PerformanceCache entries (`static/`, `database/`, `views/`; md5 names,
+  gzcompress(serialize()) payloads with timestamp/ttl)
+- PerformanceCache images (`images/*.webp`)
+
+with entry counts, logical vs on-disk size distribution, entries that
+are expired but still on disk, key-prefix hotspots (query shapes for the
+database tree) and inode usage of the filesystem holding the cache.
+
+`workload` replays a synthetic Zipf-distributed get/set mix against a
+scratch directory using the exact Cache.php file layout (file_exists +
+read + json decode per get, whole-file rewrite per set, glob + regex for
+deletePattern) and reports hit ratio and per-op latency. Point `--dir`
+at /dev/shm to compare the same workload on shared memory.
+
+Usage:
+    python test/python/cache_profiler.py scan
+    python test/python/cache_profiler.py workload --ops 200000 --keys 50000
+    python test/python/cache_profiler.py workload --dir /dev/shm/nn-cache
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import tempfile
+import time
+import zlib
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CACHE_DIR = os.path.join(REPO_ROOT, "App", "storage", "cache")
+PERF_TREES = ("static", "database", "views")
+
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+TIMESTAMP_RE = re.compile(rb's:9:"timestamp";i:(\d+);')
+TTL_RE = re.compile(rb's:3:"ttl";i:(\d+);')
+QUERY_RE = re.compile(rb's:5:"query";s:\d+:"(.*?)";s:6:"params"', re.S)
+PREFIX_RE = re.compile(r"^([A-Za-z]+(?:_[A-Za-z]+)*)")
+SAFE_KEY_RE = re.compile(r"[^a-zA-Z0-9_-]")
+
+
+def pct(values: List[float], p: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return float(values[0])
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def size_bucket(size: int) -> str:
+    for b in SIZE_BUCKETS:
+        if size <= b:
+            return f"<= {b // 1024} KB"
+    return f"> {SIZE_BUCKETS[-1] // 1024} KB"
+
+
+def query_shape(sql: str) -> str:
+    """Collapse literals so queries differing only by value group together."""
+    sql = re.sub(r"'[^']*'|\b\d+\b", "?", sql)
+    return re.sub(r"\s+", " ", sql).strip()[:80]
+
+
+class TreeStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.sizes: List[int] = []
+        self.disk = 0
+        self.expired = 0
+        self.expired_bytes = 0
+        self.unreadable = 0
+        self.prefixes: Counter = Counter()
+        self.ages: List[float] = []
+
+    def add(self, path: str, st: os.stat_result) -> None:
+        self.sizes.append(st.st_size)
+        self.disk += getattr(st, "st_blocks", 0) * 512 or st.st_size
+
+    def mark_expired(self, size: int) -> None:
+        self.expired += 1
+        self.expired_bytes += size
+
+    def report(self) -> Dict[str, Any]:
+        by_bucket = Counter(size_bucket(s) for s in self.sizes)
+        return {
+            "entries": len(self.sizes),
+            "bytes": sum(self.sizes),
+            "disk_bytes": self.disk,
+            "p50_bytes": pct(self.sizes, 50),
+            "p99_bytes": pct(self.sizes, 99),
+            "max_bytes": max(self.sizes) if self.sizes else 0,
+            "size_buckets": dict(by_bucket),
+            "expired": self.expired,
+            "expired_bytes": self.expired_bytes,
+            "unreadable": self.unreadable,
+            "median_age_s": statistics.median(self.ages) if self.ages else None,
+            "hot_prefixes": self.prefixes.most_common(10),
+        }
+
+
+def scan(cache_dir: str = CACHE_DIR, now: Optional[float] = None) -> Dict[str, Any]:
+    """Walk the cache directories and return per-tree statistics."""
+    now = now or time.time()
+    trees: Dict[str, TreeStats] = {}
+
+    core = trees["Cache.php"] = TreeStats("Cache.php")
+    for path in glob.glob(os.path.join(cache_dir, "*.cache")):
+        st = os.stat(path)
+        core.add(path, st)
+        key = os.path.basename(path)[: -len(".cache")]
+        match = PREFIX_RE.match(key)
+        core.prefixes[match.group(1) if match else "(other)"] += 1
+        try:
+            with open(path, encoding="utf-8") as fh:
+                entry = json.load(fh)
+            if now > entry["expires"]:
+                core.mark_expired(st.st_size)
+            core.ages.append(now - entry.get("created", st.st_mtime))
+        except (ValueError, KeyError, TypeError):
+            core.unreadable += 1
+
+    for sub in PERF_TREES:
+        tree = trees[f"PerformanceCache/{sub}"] = TreeStats(sub)
+        for path in glob.glob(os.path.join(cache_dir, sub, "*.cache")):
+            st = os.stat(path)
+            tree.add(path, st)
+            try:
+                with open(path, "rb") as fh:
+                    raw = zlib.decompress(fh.read())
+            except (OSError, zlib.error):
+                tree.unreadable += 1
+                continue
+            ts, ttl = TIMESTAMP_RE.search(raw), TTL_RE.search(raw)
+            if ts and ttl:
+                tree.ages.append(now - int(ts.group(1)))
+                if now - int(ts.group(1)) > int(ttl.group(1)):
+                    tree.mark_expired(st.st_size)
+            if sub == "database":
+                q = QUERY_RE.search(raw)
+                tree.prefixes[query_shape(q.group(1).decode("utf-8", "replace")) if q else "(unknown)"] += 1
+
+    images = trees["PerformanceCache/images"] = TreeStats("images")
+    for path in glob.glob(os.path.join(cache_dir, "images", "*")):
+        st = os.stat(path)
+        images.add(path, st)
+        images.ages.append(now - st.st_mtime)
+        # cacheImage() regenerates after 24h but never deletes the old file.
+        if now - st.st_mtime > 86400:
+            images.mark_expired(st.st_size)
+
+    report: Dict[str, Any] = {"cache_dir": cache_dir, "trees": {k: v.report() for k, v in trees.items()}}
+    if os.path.isdir(cache_dir):
+        vfs = os.statvfs(cache_dir)
+        used = vfs.f_files - vfs.f_ffree
+        report["inodes"] = {
+            "total": vfs.f_files,
+            "free": vfs.f_ffree,
+            "used_pct": round(100.0 * used / vfs.f_files, 2) if vfs.f_files else None,
+            "cache_entries": sum(len(t.sizes) for t in trees.values()),
+        }
+    return report
+
+
+def print_scan(report: Dict[str, Any]) -> None:
+    print(f"Cache directory: {report['cache_dir']}")
+    for name, t in report["trees"].items():
+        if not t["entries"]:
+            print(f"\n{name}: empty")
+            continue
+        print(f"\n{name}: {t['entries']} entries, {t['bytes'] / 1024:.1f} KB logical, "
+              f"{t['disk_bytes'] / 1024:.1f} KB on disk")
+        print(f"  size p50 {t['p50_bytes']:.0f} B, p99 {t['p99_bytes']:.0f} B, max {t['max_bytes']} B")
+        print("  " + ", ".join(f"{k}: {v}" for k, v in sorted(t["size_buckets"].items())))
+        print(f"  expired but not cleaned: {t['expired']} ({t['expired_bytes'] / 1024:.1f} KB)"
+              + (f", unreadable: {t['unreadable']}" if t["unreadable"] else ""))
+        for prefix, count in t["hot_prefixes"]:
+            print(f"  {count:7d}  {prefix}")
+    inodes = report.get("inodes")
+    if inodes:
+        print(f"\nFilesystem inodes: {inodes['used_pct']}% used ({inodes['free']} free); "
+              f"cache holds {inodes['cache_entries']}")
+
+
+class FileCacheModel:
+    """Python re-implementation of App\\Core\\Cache's on-disk behaviour."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def filename(self, key: str) -> str:
+        return os.path.join(self.cache_dir, SAFE_KEY_RE.sub("_", key) + ".cache")
+
+    def get(self, key: str) -> Any:
+        path = self.filename(key)
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding="utf-8") as fh:
+            data = fh.read()
+        try:
+            cached = json.loads(data)
+        except ValueError:
+            return False
+        if time.time() > cached["expires"]:
+            self.delete(key)
+            return False
+        return cached["data"]
+
+    def set(self, key: str, value: Any, ttl: int = 3600) -> None:
+        now = int(time.time())
+        with open(self.filename(key), "w", encoding="utf-8") as fh:
+            fh.write(json.dumps({"expires": now + ttl, "data": value, "created": now}))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self.filename(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_pattern(self, pattern: str) -> int:
+        regex = re.compile("^" + pattern.replace("*", ".*") + "$")
+        deleted = 0
+        for path in glob.glob(os.path.join(self.cache_dir, "*")):
+            if regex.match(os.path.basename(path)[: -len(".cache")]):
+                os.unlink(path)
+                deleted += 1
+        return deleted
+
+
+def run_workload(cache_dir: str, ops: int, keys: int, read_ratio: float, zipf: float,
+                 value_bytes: int, ttl: int, pattern_every: int, seed: int = 7) -> Dict[str, Any]:
+    """Read-through workload: a miss is followed by a set, like Cache::remember()."""
+    rng = random.Random(seed)
+    weights = [1.0 / (i + 1) ** zipf for i in range(keys)]
+    prefixes = ["product", "products_list", "category", "search", "settings", "user_prefs"]
+    key_names = [f"{prefixes[i % len(prefixes)]}_{i}" for i in range(keys)]
+    value = {"payload": "x" * value_bytes}
+    cache = FileCacheModel(cache_dir)
+
+    lat: Dict[str, List[float]] = defaultdict(list)
+    hits = misses = 0
+    sample = rng.choices(range(keys), weights=weights, k=ops)
+    for n, idx in enumerate(sample, 1):
+        key = key_names[idx]
+        if pattern_every and n % pattern_every == 0:
+            t = time.perf_counter()
+            cache.delete_pattern(f"{prefixes[n % len(prefixes)]}_1*")
+            lat["deletePattern"].append((time.perf_counter() - t) * 1e6)
+        if rng.random() < read_ratio:
+            t = time.perf_counter()
+            found = cache.get(key)
+            lat["get"].append((time.perf_counter() - t) * 1e6)
+            if found is not False:
+                hits += 1
+                continue
+            misses += 1
+        t = time.perf_counter()
+        cache.set(key, value, ttl)
+        lat["set"].append((time.perf_counter() - t) * 1e6)
+
+    return {
+        "dir": cache_dir,
+        "ops": ops,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "files": len(os.listdir(cache_dir)),
+        "latency_us": {
+            op: {"n": len(v), "p50": pct(v, 50), "p90": pct(v, 90), "p99": pct(v, 99), "max": max(v)}
+            for op, v in lat.items() if v
+        },
+    }
+
+
+def print_workload(res: Dict[str, Any]) -> None:
+    print(f"Workload on {res['dir']}: {res['ops']} ops, hit ratio {res['hit_ratio'] * 100:.1f}%, "
+          f"{res['files']} files left")
+    print(f"{'op':>14} {'n':>8} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'max us':>10}")
+    for op, s in res["latency_us"].items():
+        print(f"{op:>14} {s['n']:8d} {s['p50']:9.1f} {s['p90']:9.1f} {s['p99']:9.1f} {s['max']:10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="File-cache profiler")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sc = sub.add_parser("scan", help="analyze an existing cache directory")
+    sc.add_argument("--dir", default=CACHE_DIR)
+    sc.add_argument("--json", default=None)
+
+    wl = sub.add_parser("workload", help="replay a synthetic get/set workload")
+    wl.add_argument("--dir", default=None, help="scratch directory (default: a temp dir; removed afterwards)")
+    wl.add_argument("--ops", type=int, default=100000)
+    wl.add_argument("--keys", type=int, default=20000)
+    wl.add_argument("--read-ratio", type=float, default=0.9)
+    wl.add_argument("--zipf", type=float, default=1.1, help="key popularity skew")
+    wl.add_argument("--value-bytes", type=int, default=2048)
+    wl.add_argument("--ttl", type=int, default=3600)
+    wl.add_argument("--pattern-every", type=int, default=5000, help="run deletePattern every N ops (0 = never)")
+    args = parser.parse_args()
+
+    if args.command == "scan":
+        report = scan(args.dir)
+        print_scan(report)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+        return
+
+    scratch = args.dir or tempfile.mkdtemp(prefix="nn-cache-")
+    try:
+        print_workload(run_workload(scratch, args.ops, args.keys, args.read_ratio, args.zipf,
+                                    args.value_bytes, args.ttl, args.pattern_every))
+    finally:
+        if args.dir is None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
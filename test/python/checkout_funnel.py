@@ -0,0 +1,232 @@
+"""Checkout funnel load scenario with authenticated virtual customers.
+
+Each virtual customer holds its own cookie jar (and therefore its own PHP
+session) and walks the storefront funnel:
+
+    home -> product -> login_page -> login -> add_to_cart -> checkout -> place_order
+
+Login is skipped for guests (no credentials file), which exercises the
+guest checkout path instead. Every step is timed separately so the
+per-step latency histograms show where time goes under load; in
+particular `place_order` covers the batched seller-ID lookup and
+multi-row order item INSERT in Order::createOrder.
+
+Customers file (`--users`): CSV with `phone,password` per line, with or
+without a header row (dataset_gen.py --customers writes one). Products
+default to every product in `product-sitemap.xml`, requested through the
+routed `/products/view/<slug>` path.
+
+Usage:
+    python test/python/checkout_funnel.py --customers 1000 --ramp 60
+    python test/python/checkout_funnel.py --users customers.csv --customers 200 --gateway-id 1
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import re
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import loadgen
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+PRODUCT_SITEMAP = os.path.join(REPO_ROOT, "product-sitemap.xml")
+
+STEPS = ["home", "product", "login_page", "login", "add_to_cart", "checkout", "place_order"]
+
+CSRF_RE = re.compile(r'name="_csrf_token"\s+value="([^"]+)"')
+PRODUCT_ID_RE = re.compile(r'name="product_id"\s+value="(\d+)"')
+AJAX_HEADERS = {"X-Requested-With": "XMLHttpRequest"}
+
+
+def load_customers(path: Optional[str]) -> List[Tuple[str, str]]:
+    """Read (phone, password) pairs; an empty list means guest checkout."""
+    if not path:
+        return []
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = [(row[0].strip(), row[1].strip()) for row in csv.reader(fh) if len(row) >= 2 and row[0].strip()]
+    # Drop a header row such as "phone,password"
+    if rows and not rows[0][0].lstrip("+").isdigit():
+        rows = rows[1:]
+    return rows
+
+
+def load_product_paths(sitemap: str = PRODUCT_SITEMAP) -> List[str]:
+    """Return `/products/view/<slug>` paths for the products in the sitemap.
+
+    The sitemap lists `/products/<slug>`, which App.php does not route; the
+    product page lives at `products/view/{slug}`.
+    """
+    tree = ET.parse(sitemap)
+    paths = []
+    for loc in tree.iter("{http://www.sitemaps.org/schemas/sitemap/0.9}loc"):
+        path = urlsplit((loc.text or "").strip()).path.rstrip("/")
+        parts = path.split("/")
+        if len(parts) == 3 and parts[1] == "products" and parts[2]:
+            paths.append("/products/view/" + parts[2])
+        elif len(parts) == 4 and parts[1:3] == ["products", "view"] and parts[3]:
+            paths.append(path)
+    return paths
+
+
+def extract(pattern: re.Pattern, body: Optional[str]) -> Optional[str]:
+    match = pattern.search(body or "")
+    return match.group(1) if match else None
+
+
+class VirtualCustomer:
+    """One shopper with a private cookie jar on a shared connection pool."""
+
+    def __init__(self, n: int, connector: aiohttp.BaseConnector, args, credentials: Optional[Tuple[str, str]]):
+        self.n = n
+        self.args = args
+        self.credentials = credentials
+        self.results: List[Dict[str, Any]] = []
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            connector_owner=False,
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            timeout=aiohttp.ClientTimeout(total=args.timeout),
+            headers={"User-Agent": f"NutriNexusFunnel/1.0 (vu {n})"},
+        )
+
+    async def step(self, name: str, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        res = await loadgen.fetch(self.session, BASE_URL + path, method, label=name, want_body=True, **kwargs)
+        res["vu"] = self.n
+        self.results.append(res)
+        return res
+
+    async def run(self, product_paths: List[str]) -> bool:
+        """Walk the funnel; returns True when an order was placed."""
+        try:
+            await self.step("home", "GET", "/")
+
+            product = await self.step("product", "GET", random.choice(product_paths))
+            product_id = extract(PRODUCT_ID_RE, product.get("body")) or self.args.product_id
+            if not product_id:
+                return False
+
+            if self.credentials:
+                page = await self.step("login_page", "GET", "/auth/login")
+                phone, password = self.credentials
+                await self.step(
+                    "login", "POST", "/auth/processLogin",
+                    data={"phone": phone, "password": password, "_csrf_token": extract(CSRF_RE, page.get("body")) or ""},
+                )
+
+            await self.step(
+                "add_to_cart", "POST", "/cart/add",
+                data={"product_id": product_id, "quantity": 1}, headers=AJAX_HEADERS,
+            )
+
+            checkout = await self.step("checkout", "GET", "/checkout")
+            token = extract(CSRF_RE, checkout.get("body"))
+            if not token:
+                return False
+
+            suffix = f"{self.n:06d}"
+            order = await self.step(
+                "place_order", "POST", "/checkout/process",
+                data={
+                    "_csrf_token": token,
+                    "recipient_name": f"Load Test {suffix}",
+                    "phone": self.credentials[0] if self.credentials else f"98{suffix}00",
+                    "email": f"loadtest_{suffix}@example.com",
+                    "address_line1": "Load Test Street",
+                    "city": self.args.city,
+                    "state": "Bagmati",
+                    "gateway_id": self.args.gateway_id,
+                },
+                headers=AJAX_HEADERS,
+            )
+            try:
+                return bool(json.loads(order.get("body") or "{}").get("success"))
+            except ValueError:
+                return False
+        finally:
+            await self.session.close()
+            for r in self.results:
+                r.pop("body", None)
+
+
+async def run_funnel(args) -> Tuple[List[Dict[str, Any]], int, float]:
+    customers = load_customers(args.users)
+    product_paths = load_product_paths(args.sitemap)
+    if not product_paths:
+        raise SystemExit(f"No product URLs found in {args.sitemap}")
+
+    connector = aiohttp.TCPConnector(limit=args.connections, keepalive_timeout=30)
+    gate = asyncio.Semaphore(args.active)
+    results: List[Dict[str, Any]] = []
+    orders = 0
+
+    async def launch(n: int) -> None:
+        nonlocal orders
+        if args.ramp:
+            await asyncio.sleep(args.ramp * n / args.customers)
+        async with gate:
+            creds = customers[n % len(customers)] if customers else None
+            vu = VirtualCustomer(n, connector, args, creds)
+            if await vu.run(product_paths):
+                orders += 1
+            results.extend(vu.results)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(launch(n) for n in range(args.customers)))
+    finally:
+        await connector.close()
+    return results, orders, time.perf_counter() - start
+
+
+def print_histograms(results: List[Dict[str, Any]]) -> None:
+    by_step: Dict[str, List[float]] = {}
+    for r in results:
+        if not loadgen.is_error(r):
+            by_step.setdefault(r["url"], []).append(r["ms"])
+    for name in [s for s in STEPS if s in by_step]:
+        print(f"\n{name} latency histogram (ms):")
+        hist = loadgen.histogram(by_step[name])
+        peak = max(c for _, c in hist) or 1
+        for bound, count in hist:
+            label = f"<= {bound}" if bound != "+Inf" else f"> {loadgen.LATENCY_BUCKETS_MS[-1]}"
+            print(f"  {label:>9} {count:7d} {'#' * int(40 * count / peak)}")
+
+
+def main() -> None:
+    global BASE_URL
+    parser = argparse.ArgumentParser(description="Checkout funnel load scenario")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--customers", type=int, default=100, help="virtual customers to run through the funnel")
+    parser.add_argument("--active", type=int, default=1000, help="max customers in the funnel at once")
+    parser.add_argument("--connections", type=int, default=500, help="shared connection pool size")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which customers arrive")
+    parser.add_argument("--users", default=None, help="CSV of phone,password; omit for guest checkout")
+    parser.add_argument("--sitemap", default=PRODUCT_SITEMAP)
+    parser.add_argument("--product-id", default=None, help="fallback product_id when a page has none")
+    parser.add_argument("--gateway-id", default="1", help="payment gateway id (COD on a default install)")
+    parser.add_argument("--city", default="Kathmandu")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    BASE_URL = args.base_url.rstrip("/")
+
+    print(f"Running {args.customers} customers through the checkout funnel at {BASE_URL}...")
+    results, orders, elapsed = asyncio.run(run_funnel(args))
+
+    loadgen.print_summary(loadgen.summarize(results, elapsed), "Per-step latency (ms)")
+    print_histograms(results)
+    print(f"\n{orders}/{args.customers} orders placed in {elapsed:.1f}s ({orders / elapsed:.2f} orders/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Courier fleet polling benchmark with response contract checks.
+
+The courier app talks to the session-authenticated /curior/* routes: it
+logs in once through /curior/login, then polls the dashboard stats,
+latest location and the pickup/delivery/settlement screens, and posts GPS
+fixes. This logs in `--fleet` virtual couriers (cycling through the
+accounts in `--couriers`, an email,password CSV) and runs each one on its
+own polling schedule. Every JSON response is checked against the shape
+the controller returns. The report gives per-endpoint p50/p99 latency,
+mean payload size and contract failures, plus the request rate the fleet
+generated.
+
+`--time-scale N` divides every polling period by N, so 100 couriers at
+`--time-scale 10` put roughly the same load on the server as a
+1,000-courier fleet.
+
+`--lifecycle` also marks scraped orders picked up (pickup/mark-picked)
+and out for delivery (delivery/out-for-delivery). These POSTs change
+order status, so only use it against a disposable dataset.
+
+`--v1` also checks the App/Controllers/Api/V1 endpoints (curiors and
+staff) against their {success, version, data, timestamp} envelope. Those
+controllers are not registered in App/Core/App.php yet, so they are
+reported as "not routed" until they are.
+
+Usage:
+    python test/python/courier_api.py --couriers couriers.csv --fleet 50 --duration 120
+    python test/python/courier_api.py --couriers couriers.csv --fleet 100 --time-scale 10 --v1
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+import loadgen
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
+AJAX_HEADERS = {"X-Requested-With": "XMLHttpRequest"}
+PICKUP_RE = re.compile(r"markPicked\((\d+)\)")
+OUT_FOR_DELIVERY_RE = re.compile(r"markOutForDelivery\((\d+)\)")
+ORDER_VIEW_RE = re.compile(r"curior/order/view/(\d+)")
+
+# Response shapes: key -> type (or tuple of types); nested dicts describe objects.
+ACTION = {"success": bool, "message": str}
+V1_ENVELOPE = {"success": bool, "version": str, "timestamp": str}
+
+# name: (method, path, polling period in seconds, schema or None for HTML)
+POLLS: Dict[str, Tuple[str, str, float, Optional[Dict[str, Any]]]] = {
+    "dashboard_stats": ("GET", "/curior/dashboard/stats", 30.0, {"success": bool, "stats": (dict, list)}),
+    "location_latest": ("GET", "/curior/location/latest", 30.0, {"success": bool, "location": (dict, type(None), bool)}),
+    "pickup_list": ("GET", "/curior/pickup", 60.0, None),
+    "delivery_list": ("GET", "/curior/delivery", 60.0, None),
+    "settlement": ("GET", "/curior/settlement", 300.0, None),
+    "performance": ("GET", "/curior/performance/data", 300.0, {"success": bool, "stats": (dict, list)}),
+    "location_update": ("POST", "/curior/location/update", 15.0, ACTION),
+}
+
+V1_ENDPOINTS = (
+    ("v1_curior_health", "/api/v1/curiors/health", dict(V1_ENVELOPE, status=str)),
+    ("v1_curior_show", "/api/v1/curiors/{curior}", dict(V1_ENVELOPE, data=dict)),
+    ("v1_curior_orders", "/api/v1/curiors/{curior}/orders", dict(V1_ENVELOPE, data=list, count=int)),
+    ("v1_curior_stats", "/api/v1/curiors/{curior}/stats", dict(V1_ENVELOPE, data=(dict, list))),
+    ("v1_curior_performance", "/api/v1/curiors/{curior}/performance",
+     dict(V1_ENVELOPE, data={"total_orders": (int, str), "delivery_rate": (int, float), "performance_score": (int, float)})),
+    ("v1_ready_for_delivery", "/api/v1/curiors/ready-for-delivery", dict(V1_ENVELOPE, data=list, count=int)),
+    ("v1_staff_health", "/api/v1/staff/health", dict(V1_ENVELOPE, status=str)),
+    ("v1_staff_unassigned", "/api/v1/staff/unassigned-orders", dict(V1_ENVELOPE, data=list, count=int)),
+    ("v1_staff_stats", "/api/v1/staff/{staff}/stats", dict(V1_ENVELOPE, data=(dict, list))),
+)
+
+
+def check_schema(value: Any, schema: Any, path: str = "$") -> List[str]:
+    """Return a list of mismatches between `value` and `schema` (empty when it conforms)."""
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            return [f"{path}: expected object, got {type(value).__name__}"]
+        problems = []
+        for key, sub in schema.items():
+            if key not in value:
+                problems.append(f"{path}.{key}: missing")
+            else:
+                problems.extend(check_schema(value[key], sub, f"{path}.{key}"))
+        return problems
+    types = schema if isinstance(schema, tuple) else (schema,)
+    if bool not in types and isinstance(value, bool):
+        return [f"{path}: expected {'/'.join(t.__name__ for t in types)}, got bool"]
+    if not isinstance(value, types):
+        return [f"{path}: expected {'/'.join(t.__name__ for t in types)}, got {type(value).__name__}"]
+    return []
+
+
+def load_accounts(path: str) -> List[Tuple[str, str]]:
+    with open(path, newline="", encoding="utf-8") as fh:
+        return [(row[0].strip(), row[1].strip()) for row in csv.reader(fh) if len(row) >= 2 and "@" in row[0]]
+
+
+class Courier:
+    """One logged-in courier session and the orders visible to it."""
+
+    def __init__(self, harness: "Harness", index: int, email: str, password: str):
+        self.h = harness
+        self.index = index
+        self.email = email
+        self.password = password
+        self.session = aiohttp.ClientSession(connector=harness.connector, connector_owner=False,
+                                             cookie_jar=aiohttp.CookieJar(unsafe=True),
+                                             timeout=aiohttp.ClientTimeout(total=harness.args.timeout))
+        self.orders: List[int] = []
+        self.to_pick: List[int] = []
+        self.to_dispatch: List[int] = []
+
+    async def login(self) -> bool:
+        res = await loadgen.fetch(self.session, self.h.base + "/curior/login", "POST", label="login", want_body=True,
+                                  data={"email": self.email, "password": self.password})
+        body = res.pop("body", None) or ""
+        self.h.record(res, None, body)
+        return not loadgen.is_error(res) and "Invalid email or password" not in body and any(
+            c.key == "PHPSESSID" for c in self.session.cookie_jar)
+
+    def scrape(self, name: str, html: str) -> None:
+        if name == "pickup_list":
+            self.to_pick = sorted(set(int(i) for i in PICKUP_RE.findall(html)))
+        elif name == "delivery_list":
+            self.to_dispatch = sorted(set(int(i) for i in OUT_FOR_DELIVERY_RE.findall(html)))
+        ids = set(int(i) for i in ORDER_VIEW_RE.findall(html))
+        if ids:
+            self.orders = sorted(ids | set(self.orders))
+
+    async def call(self, name: str) -> None:
+        method, path, _, schema = POLLS[name]
+        kw: Dict[str, Any] = {"headers": AJAX_HEADERS} if schema else {}
+        if name == "location_update":
+            # Kathmandu valley, drifting a little between fixes.
+            kw["data"] = {"order_id": random.choice(self.orders) if self.orders else 0,
+                          "latitude": round(27.7 + random.uniform(-0.05, 0.05), 6),
+                          "longitude": round(85.3 + random.uniform(-0.05, 0.05), 6),
+                          "address": "load test"}
+        res = await loadgen.fetch(self.session, self.h.base + path, method, label=name, want_body=True, **kw)
+        body = res.pop("body", None) or ""
+        self.h.record(res, schema, body)
+        if schema is None:
+            self.scrape(name, body)
+
+    async def lifecycle(self) -> None:
+        if self.to_pick:
+            order_id = self.to_pick.pop(0)
+            res = await loadgen.fetch(self.session, self.h.base + "/curior/pickup/mark-picked", "POST",
+                                      label="mark_picked", want_body=True, headers=AJAX_HEADERS,
+                                      data={"order_id": order_id, "notes": "load test"})
+            self.h.record(res, ACTION, res.pop("body", None) or "")
+        elif self.to_dispatch:
+            order_id = self.to_dispatch.pop(0)
+            res = await loadgen.fetch(self.session, self.h.base + "/curior/delivery/out-for-delivery", "POST",
+                                      label="out_for_delivery", want_body=True, headers=AJAX_HEADERS,
+                                      data={"order_id": order_id, "location": "hub", "notes": "load test"})
+            self.h.record(res, ACTION, res.pop("body", None) or "")
+
+    async def run(self, deadline: float) -> None:
+        scale = self.h.args.time_scale
+        now = time.perf_counter()
+        # Stagger first polls so the fleet doesn't fire in lockstep.
+        due = {name: now + random.uniform(0, spec[2] / scale) for name, spec in POLLS.items()}
+        if self.h.args.lifecycle:
+            due["lifecycle"] = now + random.uniform(0, 120.0 / scale)
+        while True:
+            name = min(due, key=due.get)
+            wait = due[name] - time.perf_counter()
+            if due[name] >= deadline:
+                return
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if name == "lifecycle":
+                await self.lifecycle()
+                due[name] += 120.0 / scale
+            else:
+                await self.call(name)
+                due[name] += POLLS[name][2] / scale
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.base = args.base_url.rstrip("/")
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self.results: List[Dict[str, Any]] = []
+        self.violations: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, res: Dict[str, Any], schema: Optional[Dict[str, Any]], body: str) -> None:
+        if schema is not None and not loadgen.is_error(res):
+            try:
+                problems = check_schema(json.loads(body), schema)
+            except ValueError:
+                problems = ["$: not JSON"]
+            if problems:
+                res["contract"] = False
+                for p in problems:
+                    self.violations[res["url"]][p] += 1
+        self.results.append(res)
+
+    async def check_v1(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
+        rows = []
+        for name, path, schema in V1_ENDPOINTS:
+            url = self.base + path.format(curior=self.args.curior_id, staff=self.args.staff_id)
+            res = await loadgen.fetch(session, url, label=name, want_body=True)
+            body = res.pop("body", None) or ""
+            if res["status"] == 404:
+                res["verdict"] = "not routed"
+            elif loadgen.is_error(res):
+                res["verdict"] = f"HTTP {res['status']}"
+            else:
+                try:
+                    problems = check_schema(json.loads(body), schema)
+                except ValueError:
+                    problems = ["$: not JSON"]
+                res["verdict"] = "; ".join(problems) or "ok"
+            rows.append(res)
+        return rows
+
+    async def run(self) -> Dict[str, Any]:
+        accounts = load_accounts(self.args.couriers)
+        if not accounts:
+            raise SystemExit(f"No email,password rows in {self.args.couriers}")
+        self.connector = aiohttp.TCPConnector(limit=self.args.connections, keepalive_timeout=30)
+        fleet = [Courier(self, i, *accounts[i % len(accounts)]) for i in range(self.args.fleet)]
+        out: Dict[str, Any] = {}
+        try:
+            sem = asyncio.Semaphore(self.args.login_concurrency)
+
+            async def login(c: Courier) -> bool:
+                async with sem:
+                    return await c.login()
+
+            start = time.perf_counter()
+            ok = await asyncio.gather(*(login(c) for c in fleet))
+            out["login_s"] = time.perf_counter() - start
+            active = [c for c, good in zip(fleet, ok) if good]
+            out["logged_in"] = len(active)
+            if not active:
+                raise SystemExit("No courier could log in; check --couriers and --base-url")
+            print(f"{len(active)}/{len(fleet)} couriers logged in in {out['login_s']:.1f}s; "
+                  f"polling for {self.args.duration:.0f}s at x{self.args.time_scale:g} speed...")
+
+            start = time.perf_counter()
+            await asyncio.gather(*(c.run(start + self.args.duration) for c in active))
+            out["elapsed"] = time.perf_counter() - start
+            if self.args.v1:
+                out["v1"] = await self.check_v1(active[0].session)
+        finally:
+            for c in fleet:
+                await c.close()
+            await self.connector.close()
+        return out
+
+
+def report(h: Harness, out: Dict[str, Any]) -> None:
+    polls = [r for r in h.results if r["url"] != "login"]
+    elapsed = out["elapsed"]
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for r in polls:
+        groups[r["url"]].append(r)
+
+    print(f"\n{'endpoint':18} {'n':>7} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'avg KB':>8} {'err':>6} {'contract':>9}")
+    for name, items in sorted(groups.items()):
+        ok = [r["ms"] for r in items if not loadgen.is_error(r)]
+        errors = sum(1 for r in items if loadgen.is_error(r))
+        broken = sum(1 for r in items if r.get("contract") is False)
+        size = sum(int(r.get("bytes") or 0) for r in items) / len(items) / 1024.0
+        print(f"{name:18} {len(items):7d} {len(items) / elapsed:8.1f} {loadgen.percentile(ok, 50):9.1f} "
+              f"{loadgen.percentile(ok, 99):9.1f} {size:8.1f} {errors:6d} {broken:9d}")
+
+    total_rps = len(polls) / elapsed if elapsed else 0.0
+    fleet = out["logged_in"] * h.args.time_scale
+    print(f"\n{len(polls)} requests in {elapsed:.1f}s = {total_rps:.1f} req/s "
+          f"for an equivalent fleet of {fleet:,.0f} couriers ({total_rps / max(fleet, 1) * 1000:.1f} req/s per 1,000)")
+
+    if h.violations:
+        print("\nContract violations:")
+        for name, problems in sorted(h.violations.items()):
+            for problem, count in sorted(problems.items(), key=lambda kv: -kv[1])[:5]:
+                print(f"  {name:18} {count:6d}x  {problem}")
+
+    if "v1" in out:
+        print(f"\n{'v1 endpoint':24} {'status':>6} {'ms':>8} {'bytes':>8}  contract")
+        for r in out["v1"]:
+            print(f"{r['url']:24} {str(r['status']):>6} {r['ms']:8.1f} {r['bytes']:8d}  {r['verdict']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Courier API fleet benchmark")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--couriers", required=True, help="email,password CSV of courier accounts")
+    parser.add_argument("--fleet", type=int, default=50, help="virtual couriers (accounts are reused)")
+    parser.add_argument("--duration", type=float, default=120.0)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="divide polling periods by this")
+    parser.add_argument("--lifecycle", action="store_true", help="also mark scraped orders picked / out for delivery")
+    parser.add_argument("--v1", action="store_true", help="check the Api/V1 curior and staff endpoints")
+    parser.add_argument("--curior-id", type=int, default=1, help="id used in --v1 paths")
+    parser.add_argument("--staff-id", type=int, default=1, help="id used in --v1 paths")
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    harness = Harness(args)
+    out = asyncio.run(harness.run())
+    report(harness, out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Profile the cron/*.php jobs against a local MySQL dataset.
+
+`run` executes each job through PHP CLI and records, per job:
+
+- wall time and exit status
+- peak PHP memory (memory_get_peak_usage, via an auto_prepend_file hook)
+- statements issued and rows read/written, from SHOW GLOBAL STATUS deltas
+  (so run it against a database nothing else is using)
+- the dataset size at the time (row counts of the main tables)
+
+Each run is appended to a JSONL history. `report` groups the history by
+job, shows how each job grows with the order count, fits a power law
+between the smallest and largest dataset and estimates the order count
+at which a job would outlast its own schedule (hourly jobs overlapping
+the next run). `--png` also charts wall time against orders when
+matplotlib is installed.
+
+run_migration.php is one-shot DDL and only runs when named in --jobs.
+
+Usage:
+    python test/python/cron_profiler.py run --label 50k
+    # grow the dataset 10x, then
+    python test/python/cron_profiler.py run --label 500k
+    python test/python/cron_profiler.py report --png cron_scaling.png
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except Exception:
+    plt = None
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CRON_DIR = os.path.join(REPO_ROOT, "cron")
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cron_profiles.jsonl")
+
+# Schedule in seconds, from cron/README.md and the job headers.
+SCHEDULES = {
+    "process_abandoned_carts": 3600,
+    "process_seller_balance_releases": 3600,
+    "update_ad_statuses": 3600,
+    "send_winback_emails": 86400,
+    "update_sale_statuses": 86400,
+    "reset_ad_daily_spend": 86400,
+}
+ONE_SHOT = {"run_migration"}
+DATASET_TABLES = ("orders", "order_items", "users", "products", "cart", "ads", "seller_wallet_transactions")
+STATUS_KEYS = (
+    "Questions", "Com_select", "Com_insert", "Com_update", "Com_delete",
+    "Innodb_rows_read", "Innodb_rows_inserted", "Innodb_rows_updated", "Innodb_rows_deleted",
+    "Handler_read_rnd_next",
+)
+
+PREPEND = r"""<?php
+register_shutdown_function(function () {
+    $out = getenv('CRON_PROFILE_OUT');
+    if ($out) {
+        file_put_contents($out, json_encode([
+            'peak_bytes' => memory_get_peak_usage(true),
+            'php_ms' => (hrtime(true) - $GLOBALS['__cron_profile_start']) / 1e6,
+        ]));
+    }
+});
+$GLOBALS['__cron_profile_start'] = hrtime(true);
+"""
+
+
+def connect(args):
+    if mysql is None:
+        raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+    return mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database,
+                         autocommit=True)
+
+
+def global_status(cur) -> Dict[str, int]:
+    cur.execute("SHOW GLOBAL STATUS WHERE Variable_name IN (%s)" % ",".join(["%s"] * len(STATUS_KEYS)), STATUS_KEYS)
+    return {name: int(value) for name, value in cur.fetchall()}
+
+
+def dataset_size(cur) -> Dict[str, int]:
+    sizes = {}
+    for table in DATASET_TABLES:
+        try:
+            cur.execute(f"SELECT COUNT(*) FROM `{table}`")
+            sizes[table] = int(cur.fetchone()[0])
+        except Exception:
+            continue
+    return sizes
+
+
+def discover_jobs(names: Optional[List[str]]) -> List[str]:
+    found = sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(CRON_DIR, "*.php")))
+    if names:
+        missing = set(names) - set(found)
+        if missing:
+            raise SystemExit(f"Unknown job(s): {', '.join(sorted(missing))}")
+        return names
+    return [j for j in found if j not in ONE_SHOT]
+
+
+def run_job(php: str, job: str, prepend: str, cur, timeout: float) -> Dict[str, Any]:
+    out_file = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+    out_file.close()
+    env = dict(os.environ, CRON_PROFILE_OUT=out_file.name)
+    before = global_status(cur)
+    start = time.perf_counter()
+    proc = subprocess.Popen([php, "-d", f"auto_prepend_file={prepend}", os.path.join(CRON_DIR, f"{job}.php")],
+                            cwd=REPO_ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        output, _ = proc.communicate(timeout=timeout)
+        timed_out = False
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        output, _ = proc.communicate()
+        timed_out = True
+    wall = (time.perf_counter() - start) * 1000.0
+    after = global_status(cur)
+
+    result: Dict[str, Any] = {
+        "job": job,
+        "wall_ms": round(wall, 1),
+        "exit": proc.returncode,
+        "timed_out": timed_out,
+        "tail": output.decode("utf-8", "replace").strip().splitlines()[-5:],
+    }
+    # The SHOW GLOBAL STATUS call itself counts as one statement.
+    delta = {k: after.get(k, 0) - before.get(k, 0) for k in STATUS_KEYS}
+    delta["Questions"] -= 1
+    result["queries"] = delta["Questions"]
+    result["rows_read"] = delta["Innodb_rows_read"]
+    result["rows_written"] = delta["Innodb_rows_inserted"] + delta["Innodb_rows_updated"] + delta["Innodb_rows_deleted"]
+    result["full_scan_rows"] = delta["Handler_read_rnd_next"]
+    result["status"] = delta
+    try:
+        with open(out_file.name, encoding="utf-8") as fh:
+            result.update(json.load(fh))
+    except (OSError, ValueError):
+        pass
+    finally:
+        os.unlink(out_file.name)
+    return result
+
+
+def run(args) -> None:
+    php = shutil.which(args.php)
+    if not php:
+        raise SystemExit(f"{args.php} not found on PATH")
+    jobs = discover_jobs(args.jobs.split(",") if args.jobs else None)
+    conn = connect(args)
+    cur = conn.cursor()
+    dataset = dataset_size(cur)
+    print("Dataset: " + ", ".join(f"{t}={n:,}" for t, n in dataset.items()))
+
+    with tempfile.NamedTemporaryFile("w", suffix=".php", delete=False) as fh:
+        fh.write(PREPEND)
+        prepend = fh.name
+    runs = []
+    try:
+        print(f"\n{'job':34} {'wall ms':>10} {'peak MB':>8} {'queries':>8} {'rows read':>11} {'written':>9}  exit")
+        for job in jobs:
+            res = run_job(php, job, prepend, cur, args.timeout)
+            runs.append(res)
+            peak = res.get("peak_bytes", 0) / 1e6
+            print(f"{job:34} {res['wall_ms']:10.1f} {peak:8.1f} {res['queries']:8d} {res['rows_read']:11,d} "
+                  f"{res['rows_written']:9,d}  {'timeout' if res['timed_out'] else res['exit']}")
+    finally:
+        os.unlink(prepend)
+        cur.close()
+        conn.close()
+
+    with open(args.history, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps({"ts": time.time(), "label": args.label, "dataset": dataset, "runs": runs}) + "\n")
+    print(f"\nAppended to {args.history}")
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        raise SystemExit(f"No history at {path}; run `cron_profiler.py run` first")
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def report(args) -> None:
+    series: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for entry in load_history(args.history):
+        orders = entry["dataset"].get(args.scale_table, 0)
+        for r in entry["runs"]:
+            series[r["job"]].append(dict(r, orders=orders, label=entry.get("label")))
+
+    for job, points in sorted(series.items()):
+        points.sort(key=lambda p: p["orders"])
+        print(f"\n{job} (runs every {SCHEDULES.get(job, 0) // 60 or '-'} min)")
+        print(f"  {args.scale_table:>10} {'wall ms':>10} {'peak MB':>8} {'queries':>8} {'rows read':>11}  label")
+        for p in points:
+            print(f"  {p['orders']:10,d} {p['wall_ms']:10.1f} {p.get('peak_bytes', 0) / 1e6:8.1f} "
+                  f"{p['queries']:8d} {p['rows_read']:11,d}  {p.get('label') or ''}")
+        lo, hi = points[0], points[-1]
+        if lo["orders"] > 0 and hi["orders"] > lo["orders"] and lo["wall_ms"] > 0 and hi["wall_ms"] > 0:
+            k = math.log(hi["wall_ms"] / lo["wall_ms"]) / math.log(hi["orders"] / lo["orders"])
+            line = f"  wall time grows ~{args.scale_table}^{k:.2f}"
+            interval = SCHEDULES.get(job)
+            if interval and k > 0:
+                limit = hi["orders"] * (interval * 1000.0 / hi["wall_ms"]) ** (1.0 / k)
+                line += f"; outlasts its {interval // 60}-minute schedule at ~{limit:,.0f} {args.scale_table}"
+            print(line)
+
+    if args.png:
+        if plt is None:
+            print("\nmatplotlib not installed; skipping chart.")
+            return
+        fig, ax = plt.subplots(figsize=(9, 6))
+        for job, points in sorted(series.items()):
+            ax.plot([p["orders"] for p in points], [p["wall_ms"] / 1000.0 for p in points], marker="o", label=job)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel(args.scale_table)
+        ax.set_ylabel("wall time (s)")
+        ax.axhline(3600, color="red", linestyle="--", linewidth=1, label="hourly schedule")
+        ax.legend(fontsize="small")
+        fig.tight_layout()
+        fig.savefig(args.png, dpi=120)
+        print(f"\nChart written to {args.png}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="cron job profiler")
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rn = sub.add_parser("run", help="run each cron job once and record it")
+    rn.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    rn.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    rn.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    rn.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    rn.add_argument("--php", default="php")
+    rn.add_argument("--jobs", default=None, help="comma-separated job names (default: all recurring jobs)")
+    rn.add_argument("--timeout", type=float, default=3600.0)
+    rn.add_argument("--label", default=None)
+
+    rp = sub.add_parser("report", help="show scaling across recorded runs")
+    rp.add_argument("--scale-table", default="orders", help="dataset table to scale against")
+    rp.add_argument("--png", default=None, help="write a log-log chart here (needs matplotlib)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args)
+    else:
+        report(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,520 @@
+"""Streaming synthetic dataset generator for local benchmarks.
+
+Builds a referentially consistent shop: sellers, users, products,
+product_variants, ads, then orders with their order_items and the
+seller_wallet_transactions credited for delivered orders, cart rows,
+reviews and ads_click_logs. Product and user popularity follow a Zipf
+distribution (`--skew`, 0 = uniform) and order dates spread over
+`--days` with a linear growth trend, so hot products and recent orders
+look like production rather than a flat table.
+
+IDs are assigned here, starting after the current MAX(id) of each table,
+so children reference parents without round trips and a run can be
+repeated on top of existing data. Rows are generated lazily and flushed
+per table every `--chunk` rows, keeping memory flat regardless of size:
+
+    --method insert     multi-row INSERT, one transaction per chunk
+    --method load-data  LOAD DATA LOCAL INFILE from a per-chunk temp file
+    --out DIR           write tab-separated files instead of loading
+
+Both the --out files and the load-data temp files start with one header
+row of column names, followed by rows in LOAD DATA's default escaping
+(tab-separated, backslash escapes, \\N for NULL). Load an --out file
+with `LOAD DATA LOCAL INFILE 't.tsv' INTO TABLE t IGNORE 1 LINES (<header
+columns>)`, as the load-data method does.
+
+When loading, each table's columns are read from information_schema.
+Generated columns missing from the live table are dropped. NOT NULL
+columns without a default that the generator doesn't know get a
+type-appropriate filler.
+
+All users and sellers get the password `password123`; --customers writes
+phone,password rows for checkout_funnel.py.
+
+Usage:
+    python test/python/dataset_gen.py --orders 100000
+    python test/python/dataset_gen.py --orders 10000000 --method load-data --chunk 20000
+    python test/python/dataset_gen.py --orders 1000 --out /tmp/dataset
+"""
+
+import argparse
+import bisect
+import csv
+import os
+import random
+import tempfile
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+
+# password_hash('password123', PASSWORD_DEFAULT)
+PASSWORD_HASH = "$2y$10$Zm7f8EwB746BkzFCPe/YAOJw1jZonCU9j.l96JYkkoGoSnNiPeEOS"
+PASSWORD = "password123"
+
+CATEGORIES = {
+    "Supplements": ["Protein", "Creatine", "Pre-Workout", "Vitamins"],
+    "Nutrition": ["Snacks", "Oats", "Peanut Butter"],
+    "Accessories": ["Shakers", "Gym Bags", "Straps"],
+    "Wellness": ["Ayurveda", "Skin Care"],
+}
+FLAVORS = ["Chocolate", "Vanilla", "Strawberry", "Unflavored", "Mango", "Cookies & Cream"]
+SIZES = ["250g", "500g", "1kg", "2kg", "5lb"]
+CITIES = ["Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Biratnagar", "Inaruwa", "Dharan", "Butwal"]
+FIRST = ["Aarav", "Sita", "Ram", "Gita", "Bikash", "Anita", "Suman", "Puja", "Rohan", "Nisha", "Kiran", "Asha"]
+LAST = ["Shrestha", "Karki", "Thapa", "Gurung", "Rai", "Tamang", "Adhikari", "Poudel", "Magar", "Sharma"]
+# Rough lifecycle mix for historical orders.
+ORDER_STATUSES = [("delivered", 0.72), ("cancelled", 0.08), ("shipped", 0.06), ("processing", 0.06),
+                  ("pending", 0.06), ("returned", 0.02)]
+
+FILLERS = {
+    "int": 0, "bigint": 0, "smallint": 0, "tinyint": 0, "mediumint": 0, "decimal": 0, "float": 0, "double": 0,
+    "date": "1970-01-01", "datetime": "1970-01-01 00:00:00", "timestamp": "1970-01-01 00:00:01",
+    "json": "{}",
+}
+
+
+class Zipf:
+    """Sample 1..n with P(k) proportional to 1 / k**s (s = 0 is uniform)."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.n = n
+        self.rng = rng
+        self.cum: Optional[array] = None
+        if s > 0 and n > 1:
+            total = 0.0
+            self.cum = array("d")
+            for k in range(1, n + 1):
+                total += 1.0 / k ** s
+                self.cum.append(total)
+
+    def __call__(self) -> int:
+        if self.cum is None:
+            return self.rng.randint(1, self.n)
+        return bisect.bisect_left(self.cum, self.rng.random() * self.cum[-1]) + 1
+
+
+def fmt(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ------------------------------------------------------------------- sinks
+
+
+class Sink:
+    """Receives chunks of rows for one table at a time."""
+
+    def columns(self, table: str, wanted: Sequence[str]) -> Tuple[List[str], Dict[str, Any]]:
+        """Columns to write for `table` plus fillers for unknown required ones."""
+        return list(wanted), {}
+
+    def max_id(self, table: str) -> int:
+        return 0
+
+    def lookup(self, sql: str) -> Optional[Any]:
+        return None
+
+    def write(self, table: str, columns: List[str], rows: List[Tuple[Any, ...]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink(Sink):
+    """Tab-separated files, one per table: a header row, then LOAD DATA's default format."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.files: Dict[str, Any] = {}
+
+    def write(self, table, columns, rows) -> None:
+        if table not in self.files:
+            fh = open(os.path.join(self.directory, f"{table}.tsv"), "w", encoding="utf-8", newline="")
+            fh.write(tsv_header(columns))
+            self.files[table] = fh
+        self.files[table].writelines(tsv_line(r) for r in rows)
+
+    def close(self) -> None:
+        for fh in self.files.values():
+            fh.close()
+
+
+def tsv_header(columns: Sequence[str]) -> str:
+    """Column-name row; LOAD DATA skips it with IGNORE 1 LINES."""
+    return "\t".join(columns) + "\n"
+
+
+def tsv_line(row: Tuple[Any, ...]) -> str:
+    out = []
+    for v in row:
+        if v is None:
+            out.append("\\N")
+        else:
+            out.append(str(v).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n"))
+    return "\t".join(out) + "\n"
+
+
+class MySQLSink(Sink):
+    def __init__(self, args, load_data: bool):
+        if mysql is None:
+            raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+        self.load_data = load_data
+        self.conn = mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database,
+                                  allow_local_infile=load_data)
+        self.cur = self.conn.cursor()
+        self.cur.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        self.schema: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def describe(self, table: str) -> Dict[str, Dict[str, Any]]:
+        if table not in self.schema:
+            self.cur.execute(
+                "SELECT COLUMN_NAME, IS_NULLABLE, COLUMN_DEFAULT, DATA_TYPE, COLUMN_TYPE, EXTRA "
+                "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+                "ORDER BY ORDINAL_POSITION", (table,))
+            self.schema[table] = {
+                name: {"nullable": nullable == "YES", "default": default, "type": dtype, "column_type": ctype,
+                       "extra": extra or ""}
+                for name, nullable, default, dtype, ctype, extra in self.cur.fetchall()
+            }
+            if not self.schema[table]:
+                raise SystemExit(f"Table {table} does not exist in this database")
+        return self.schema[table]
+
+    def columns(self, table, wanted):
+        live = self.describe(table)
+        columns = [c for c in wanted if c in live]
+        fillers = {}
+        for name, col in live.items():
+            if name in columns or col["nullable"] or col["default"] is not None or "auto_increment" in col["extra"] \
+                    or "GENERATED" in col["extra"].upper():
+                continue
+            if col["type"] == "enum":
+                fillers[name] = col["column_type"][len("enum('"):].split("'", 1)[0]
+            else:
+                fillers[name] = FILLERS.get(col["type"], "")
+        return columns + list(fillers), fillers
+
+    def max_id(self, table):
+        self.cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM `{table}`")
+        return int(self.cur.fetchone()[0])
+
+    def lookup(self, sql):
+        try:
+            self.cur.execute(sql)
+            row = self.cur.fetchone()
+            return row[0] if row else None
+        except Exception:
+            return None
+
+    def write(self, table, columns, rows) -> None:
+        cols = ", ".join(f"`{c}`" for c in columns)
+        if self.load_data:
+            with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8", newline="") as fh:
+                fh.write(tsv_header(columns))
+                fh.writelines(tsv_line(r) for r in rows)
+            try:
+                self.cur.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` CHARACTER SET utf8mb4 "
+                                 f"IGNORE 1 LINES ({cols})", (fh.name,))
+            finally:
+                os.unlink(fh.name)
+        else:
+            values = "(" + ", ".join(["%s"] * len(columns)) + ")"
+            self.cur.execute(f"INSERT INTO `{table}` ({cols}) VALUES " + ", ".join([values] * len(rows)),
+                             [v for r in rows for v in r])
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.cur.close()
+        self.conn.close()
+
+
+class TableWriter:
+    """Buffers dict rows for one table and flushes them in chunks."""
+
+    def __init__(self, sink: Sink, table: str, columns: Sequence[str], chunk: int):
+        self.sink = sink
+        self.table = table
+        self.columns, self.fillers = sink.columns(table, columns)
+        self.chunk = chunk
+        self.rows: List[Tuple[Any, ...]] = []
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.rows.append(tuple(row[c] if c in row else self.fillers[c] for c in self.columns))
+        if len(self.rows) >= self.chunk:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.rows:
+            start = time.perf_counter()
+            self.sink.write(self.table, self.columns, self.rows)
+            self.seconds += time.perf_counter() - start
+            self.count += len(self.rows)
+            self.rows = []
+
+
+# --------------------------------------------------------------- generator
+
+
+class Generator:
+    def __init__(self, args, sink: Sink):
+        self.args = args
+        self.sink = sink
+        self.rng = random.Random(args.seed)
+        self.now = datetime.now().replace(microsecond=0)
+        self.writers: Dict[str, TableWriter] = {}
+        self.base: Dict[str, int] = {}
+        self.products: List[Tuple[int, int, float, Optional[float]]] = []  # (id, seller_id, price, sale_price)
+
+    def writer(self, table: str, columns: Sequence[str]) -> TableWriter:
+        if table not in self.writers:
+            self.writers[table] = TableWriter(self.sink, table, columns, self.args.chunk)
+            self.base[table] = self.sink.max_id(table)
+        return self.writers[table]
+
+    def when(self, days_back: float) -> datetime:
+        return self.now - timedelta(seconds=int(days_back * 86400))
+
+    def recent_day(self, u: Optional[float] = None) -> float:
+        """Days back for quantile `u` (random if omitted) under linearly growing volume."""
+        return self.args.days * (1.0 - (self.rng.random() if u is None else u) ** 0.5)
+
+    def person(self, i: int) -> Tuple[str, str]:
+        return self.rng.choice(FIRST), f"{self.rng.choice(LAST)} {i}"
+
+    def sellers(self) -> None:
+        w = self.writer("sellers", ["id", "name", "email", "password", "phone", "company_name", "status",
+                                    "commission_rate", "city", "created_at"])
+        for i in range(1, self.args.sellers + 1):
+            sid = self.base["sellers"] + i
+            first, last = self.person(sid)
+            w.add({"id": sid, "name": f"{first} {last}", "email": f"seller{sid}@bench.local", "password": PASSWORD_HASH,
+                   "phone": f"97{sid:08d}", "company_name": f"{last} Traders", "status": "active",
+                   "commission_rate": self.rng.choice([5, 8, 10, 12]), "city": self.rng.choice(CITIES),
+                   "created_at": fmt(self.when(self.args.days + 30))})
+        w.flush()
+
+    def users(self) -> None:
+        w = self.writer("users", ["id", "name", "first_name", "last_name", "email", "phone", "password", "role",
+                                  "status", "referral_code", "created_at", "updated_at"])
+        out = None
+        if self.args.customers:
+            out = open(self.args.customers, "w", newline="", encoding="utf-8")
+            csv_out = csv.writer(out)
+            csv_out.writerow(["phone", "password"])
+        for i in range(1, self.args.users + 1):
+            uid = self.base["users"] + i
+            first, last = self.person(uid)
+            created = fmt(self.when(self.rng.uniform(0, self.args.days)))
+            phone = f"98{uid:08d}"
+            w.add({"id": uid, "name": f"{first} {last}", "first_name": first, "last_name": last,
+                   "email": f"user{uid}@bench.local", "phone": phone, "password": PASSWORD_HASH, "role": "customer",
+                   "status": "active", "referral_code": f"B{uid:09d}", "created_at": created, "updated_at": created})
+            if out:
+                csv_out.writerow([phone, PASSWORD])
+        w.flush()
+        if out:
+            out.close()
+
+    def catalog(self) -> None:
+        pw = self.writer("products", ["id", "product_name", "slug", "description", "short_description", "price",
+                                      "sale_price", "stock_quantity", "category", "subcategory", "flavor", "weight",
+                                      "seller_id", "status", "approval_status", "is_featured", "product_type_main",
+                                      "is_digital", "created_at", "updated_at"])
+        vw = self.writer("product_variants", ["id", "product_id", "variant_name", "sku", "price", "sale_price",
+                                              "stock_quantity", "is_active", "created_at"])
+        seller_pick = Zipf(self.args.sellers, self.args.skew, self.rng)
+        vid = self.base["product_variants"]
+        for i in range(1, self.args.products + 1):
+            pid = self.base["products"] + i
+            category = self.rng.choice(list(CATEGORIES))
+            sub = self.rng.choice(CATEGORIES[category])
+            flavor = self.rng.choice(FLAVORS)
+            price = round(self.rng.lognormvariate(7.6, 0.7), -1)
+            sale = round(price * self.rng.uniform(0.7, 0.95), -1) if self.rng.random() < 0.3 else None
+            seller = self.base["sellers"] + seller_pick()
+            created = fmt(self.when(self.rng.uniform(0, self.args.days)))
+            name = f"{sub} {flavor} {i}"
+            pw.add({"id": pid, "product_name": name, "slug": name.lower().replace(" ", "-").replace("&", "and"),
+                    "description": f"{name} for benchmark runs.", "short_description": name, "price": price,
+                    "sale_price": sale, "stock_quantity": self.rng.randint(0, 500), "category": category,
+                    "subcategory": sub, "flavor": flavor, "weight": self.rng.choice(SIZES), "seller_id": seller,
+                    "status": "active", "approval_status": "approved", "is_featured": int(self.rng.random() < 0.05),
+                    "product_type_main": category, "is_digital": 0, "created_at": created, "updated_at": created})
+            self.products.append((pid, seller, price, sale))
+            for size in self.rng.sample(SIZES, self.rng.randint(0, min(self.args.variants, len(SIZES)))):
+                vid += 1
+                factor = SIZES.index(size) + 1
+                vw.add({"id": vid, "product_id": pid, "variant_name": size, "sku": f"SKU-{pid}-{size}",
+                        "price": price * factor, "sale_price": sale * factor if sale else None,
+                        "stock_quantity": self.rng.randint(0, 200), "is_active": 1, "created_at": created})
+        pw.flush()
+        vw.flush()
+
+    def orders(self) -> None:
+        ow = self.writer("orders", ["id", "invoice", "user_id", "customer_name", "contact_no", "payment_method_id",
+                                    "status", "address", "order_notes", "transaction_id", "total_amount",
+                                    "tax_amount", "discount_amount", "delivery_fee", "coupon_code",
+                                    "payment_screenshot", "delivered_at", "balance_released_at", "created_at",
+                                    "updated_at"])
+        iw = self.writer("order_items", ["id", "order_id", "product_id", "seller_id", "selected_color", "selected_size",
+                                         "quantity", "price", "total", "invoice"])
+        tw = self.writer("seller_wallet_transactions", ["id", "seller_id", "type", "amount", "description", "order_id",
+                                                        "balance_after", "status", "created_at"])
+        user_pick = Zipf(self.args.users, self.args.skew * 0.5, self.rng)
+        product_pick = Zipf(len(self.products), self.args.skew, self.rng)
+        statuses, weights = zip(*ORDER_STATUSES)
+        balances: Dict[int, float] = {}
+        item_id = self.base["order_items"]
+        txn_id = self.base["seller_wallet_transactions"]
+        for i in range(1, self.args.orders + 1):
+            oid = self.base["orders"] + i
+            uid = self.base["users"] + user_pick()
+            # Orders come out oldest first so ids and created_at rise together, as in production.
+            created = self.when(self.recent_day(i / self.args.orders))
+            invoice = f"NTX{created:%Y%m%d}{oid}"
+            status = self.rng.choices(statuses, weights)[0]
+            n_items = max(1, int(self.rng.expovariate(1.0 / self.args.items)))
+            total = 0.0
+            per_seller: Dict[int, float] = {}
+            for _ in range(n_items):
+                pid, seller, price, sale = self.products[product_pick() - 1]
+                qty = self.rng.choice((1, 1, 1, 2, 2, 3))
+                unit = sale or price
+                item_id += 1
+                iw.add({"id": item_id, "order_id": oid, "product_id": pid, "seller_id": seller,
+                        "selected_color": None, "selected_size": None, "quantity": qty, "price": unit,
+                        "total": unit * qty, "invoice": invoice})
+                total += unit * qty
+                per_seller[seller] = per_seller.get(seller, 0.0) + unit * qty
+            delivery_fee = 0 if total >= 5000 else 150
+            delivered = fmt(created + timedelta(days=self.rng.randint(1, 5))) if status == "delivered" else None
+            ow.add({"id": oid, "invoice": invoice, "user_id": uid, "customer_name": f"Customer {uid}",
+                    "contact_no": f"98{uid:08d}", "payment_method_id": self.rng.choice((1, 1, 2, 3)),
+                    "status": status, "address": f"Ward {self.rng.randint(1, 30)}, {self.rng.choice(CITIES)}, Nepal",
+                    "order_notes": "", "transaction_id": "", "total_amount": total + delivery_fee, "tax_amount": 0,
+                    "discount_amount": 0, "delivery_fee": delivery_fee, "coupon_code": None,
+                    "payment_screenshot": "", "delivered_at": delivered,
+                    "balance_released_at": delivered if delivered and self.rng.random() < 0.9 else None,
+                    "created_at": fmt(created), "updated_at": delivered or fmt(created)})
+            if delivered:
+                for seller, amount in per_seller.items():
+                    txn_id += 1
+                    balances[seller] = balances.get(seller, 0.0) + amount
+                    tw.add({"id": txn_id, "seller_id": seller, "type": "credit", "amount": amount,
+                            "description": f"Order #{invoice}", "order_id": oid, "balance_after": balances[seller],
+                            "status": "completed", "created_at": delivered})
+        for w in (ow, iw, tw):
+            w.flush()
+
+    def carts_and_reviews(self) -> None:
+        cw = self.writer("cart", ["id", "user_id", "product_id", "quantity", "price", "sale_price", "created_at",
+                                  "updated_at"])
+        rw = self.writer("reviews", ["id", "user_id", "product_id", "rating", "review", "created_at"])
+        user_pick = Zipf(self.args.users, 0.0, self.rng)
+        product_pick = Zipf(len(self.products), self.args.skew, self.rng)
+        for i in range(1, self.args.carts + 1):
+            pid, _, price, sale = self.products[product_pick() - 1]
+            created = fmt(self.when(self.rng.uniform(0, 30)))
+            cw.add({"id": self.base["cart"] + i, "user_id": self.base["users"] + user_pick(), "product_id": pid,
+                    "quantity": self.rng.randint(1, 3), "price": price, "sale_price": sale, "created_at": created,
+                    "updated_at": created})
+        for i in range(1, self.args.reviews + 1):
+            pid = self.products[product_pick() - 1][0]
+            rw.add({"id": self.base["reviews"] + i, "user_id": self.base["users"] + user_pick(), "product_id": pid,
+                    "rating": self.rng.choices((1, 2, 3, 4, 5), (2, 3, 10, 35, 50))[0],
+                    "review": "Benchmark review.", "created_at": fmt(self.when(self.recent_day()))})
+        cw.flush()
+        rw.flush()
+
+    def ads(self) -> None:
+        if not self.args.ads:
+            return
+        ad_type = self.sink.lookup("SELECT id FROM ads_types WHERE name = 'product_internal' LIMIT 1") or 1
+        aw = self.writer("ads", ["id", "seller_id", "ads_type_id", "product_id", "start_date", "end_date",
+                                 "duration_days", "billing_type", "daily_budget", "per_click_rate",
+                                 "per_impression_rate", "total_clicks", "remaining_clicks", "current_daily_spend",
+                                 "current_day_spent", "last_spend_reset_date", "auto_paused", "status",
+                                 "approval_status", "created_at"])
+        lw = self.writer("ads_click_logs", ["id", "ads_id", "ip_address", "clicked_at"])
+        ad_products = self.rng.sample(self.products, min(self.args.ads, len(self.products)))
+        for i, (pid, seller, _, _) in enumerate(ad_products, 1):
+            aw.add({"id": self.base["ads"] + i, "seller_id": seller, "ads_type_id": ad_type, "product_id": pid,
+                    "start_date": (self.now - timedelta(days=30)).strftime("%Y-%m-%d"),
+                    "end_date": (self.now + timedelta(days=30)).strftime("%Y-%m-%d"), "duration_days": 60,
+                    "billing_type": "per_click", "daily_budget": 500, "per_click_rate": 2, "per_impression_rate": 0,
+                    "total_clicks": 100000, "remaining_clicks": 100000, "current_daily_spend": 0,
+                    "current_day_spent": 0, "last_spend_reset_date": self.now.strftime("%Y-%m-%d"), "auto_paused": 0,
+                    "status": "active", "approval_status": "approved", "created_at": fmt(self.now - timedelta(days=30))})
+        aw.flush()
+        ad_pick = Zipf(len(ad_products), self.args.skew, self.rng)
+        for i in range(1, self.args.clicks + 1):
+            lw.add({"id": self.base["ads_click_logs"] + i, "ads_id": self.base["ads"] + ad_pick(),
+                    "ip_address": f"10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}",
+                    "clicked_at": fmt(self.when(self.rng.uniform(0, 30)))})
+        lw.flush()
+
+    def run(self) -> Iterator[str]:
+        for step in (self.sellers, self.users, self.catalog, self.orders, self.carts_and_reviews, self.ads):
+            start = time.perf_counter()
+            step()
+            yield f"{step.__name__} done in {time.perf_counter() - start:.1f}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic dataset generator")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    parser.add_argument("--method", choices=("insert", "load-data"), default="insert")
+    parser.add_argument("--out", default=None, help="write TSV files here instead of loading MySQL")
+    parser.add_argument("--chunk", type=int, default=5000, help="rows per INSERT / LOAD DATA")
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=None, help="default: orders / 5")
+    parser.add_argument("--sellers", type=int, default=50)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--variants", type=int, default=3, help="max variants per product (at most len(SIZES))")
+    parser.add_argument("--items", type=float, default=2.2, help="mean items per order")
+    parser.add_argument("--carts", type=int, default=None, help="default: users / 4")
+    parser.add_argument("--reviews", type=int, default=None, help="default: orders / 10")
+    parser.add_argument("--ads", type=int, default=100)
+    parser.add_argument("--clicks", type=int, default=None, help="default: orders")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for popularity (0 = uniform)")
+    parser.add_argument("--days", type=int, default=365, help="order history length")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--customers", default=None, help="write phone,password CSV for checkout_funnel.py")
+    args = parser.parse_args()
+    args.users = args.users or max(1, args.orders // 5)
+    args.carts = args.carts if args.carts is not None else args.users // 4
+    args.reviews = args.reviews if args.reviews is not None else args.orders // 10
+    args.clicks = args.clicks if args.clicks is not None else args.orders
+
+    sink: Sink = FileSink(args.out) if args.out else MySQLSink(args, args.method == "load-data")
+    gen = Generator(args, sink)
+    start = time.perf_counter()
+    try:
+        for line in gen.run():
+            print(line)
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - start
+
+    total = sum(w.count for w in gen.writers.values())
+    print(f"\n{'table':28} {'rows':>12} {'write s':>8} {'rows/s':>10}")
+    for table, w in gen.writers.items():
+        print(f"{table:28} {w.count:12,d} {w.seconds:8.1f} {w.count / max(w.seconds, 1e-9):10,.0f}")
+    print(f"{'total':28} {total:12,d} {elapsed:8.1f} {total / max(elapsed, 1e-9):10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
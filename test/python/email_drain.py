@@ -0,0 +1,287 @@
+"""Email-queue drain benchmark against a local SMTP sink.
+
+`seed` bulk-inserts pending rows into `email_queue` the way
+EmailQueueService::addToQueue() writes them (empty body, template name
+and data in `metadata`), using multi-row INSERTs.
+
+`drain` starts an aiosmtpd sink and runs N worker threads, each with its
+own MySQL connection, that repeat EmailProcessorService::processEmails():
+fetch a batch of pending rows, then for each row mark it `processing`,
+render its assets/templates/<template>.html with the {{key}} substitution
+EmailHelper::sendTemplate() does, send it over SMTP and mark it `sent`.
+Every message carries an X-Queue-Id header so the sink can count rows
+delivered more than once.
+
+`--claim select` is the current code path (SELECT, then mark -> send ->
+update one row at a time, so concurrent workers can pick up the same
+rows); `--claim skip-locked` claims each batch with SELECT ... FOR
+UPDATE SKIP LOCKED inside a transaction for comparison. The real drain
+goes through PHPMailer with TLS and SMTP auth, so this driver issues the
+same statements from Python rather than shelling out to
+process_email_queue.php.
+
+Reports emails/s, per-stage latency (fetch, claim, render, send, update),
+double-send rate and the final status counts.
+
+Usage:
+    python test/python/email_drain.py seed --count 50000
+    python test/python/email_drain.py drain --workers 8 --batch 10
+    python test/python/email_drain.py drain --workers 8 --batch 50 --claim skip-locked --smtp-delay 0.02
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import os
+import random
+import smtplib
+import threading
+import time
+from collections import Counter, defaultdict
+from email.message import EmailMessage
+from typing import Any, Dict, List
+
+import loadgen
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+try:
+    from aiosmtpd.controller import Controller
+except Exception:
+    Controller = None
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+TEMPLATE_DIR = os.path.join(REPO_ROOT, "assets", "templates")
+TEMPLATES = {
+    "order": {"name": "Customer", "order_id": "NN-100234", "total": "Rs 4,560.00"},
+    "email": {"name": "Customer", "message": "Items are still waiting in your cart."},
+    "register": {"name": "Customer", "email": "customer@example.com"},
+}
+STAGES = ("fetch", "claim", "render", "send", "update")
+
+FETCH_SQL = ("SELECT * FROM email_queue WHERE status = 'pending' AND scheduled_at <= NOW() "
+             "ORDER BY created_at ASC LIMIT %s")
+PROCESSING_SQL = ("UPDATE email_queue SET status = %s, error_message = %s, attempts = attempts + 1, "
+                  "sent_at = CASE WHEN %s = 'sent' THEN NOW() ELSE sent_at END, last_attempt = NOW() WHERE id = %s")
+
+
+def connect(args):
+    if mysql is None:
+        raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+    return mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database,
+                         autocommit=True)
+
+
+# ------------------------------------------------------------------- seed
+
+
+def seed(args) -> None:
+    conn = connect(args)
+    cur = conn.cursor()
+    names = list(TEMPLATES)
+    start = time.perf_counter()
+    for offset in range(0, args.count, args.chunk):
+        rows = []
+        for i in range(offset, min(offset + args.chunk, args.count)):
+            template = random.choice(names)
+            rows.append((f"bench{i}@example.com", f"Bench {i}", f"[bench] {template} #{i}", "",
+                         json.dumps({"template": template, "template_data": TEMPLATES[template]})))
+        placeholders = ",".join(["(%s, %s, %s, %s, %s, NOW())"] * len(rows))
+        cur.execute("INSERT INTO email_queue (to_email, to_name, subject, body, metadata, scheduled_at) VALUES "
+                    + placeholders, [v for row in rows for v in row])
+    elapsed = time.perf_counter() - start
+    cur.close()
+    conn.close()
+    print(f"Seeded {args.count} pending emails in {elapsed:.1f}s ({args.count / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+# ------------------------------------------------------------------ drain
+
+
+class Sink:
+    """aiosmtpd handler counting deliveries per X-Queue-Id."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received: Counter = Counter()
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        for line in envelope.content.splitlines():
+            if line.lower().startswith(b"x-queue-id:"):
+                self.received[line.split(b":", 1)[1].strip().decode()] += 1
+                break
+        return "250 OK"
+
+
+def render(template: str, data: Dict[str, Any], cache: Dict[str, str]) -> str:
+    """EmailHelper::sendTemplate() substitution over assets/templates/<template>.html."""
+    if template not in cache:
+        path = os.path.join(TEMPLATE_DIR, f"{template}.html")
+        try:
+            with open(path, encoding="utf-8") as fh:
+                cache[template] = fh.read()
+        except OSError:
+            cache[template] = "<p>{{name}}</p>"
+    body = cache[template]
+    for key, value in data.items():
+        body = body.replace("{{" + key + "}}", html.escape(str(value), quote=True))
+    return body
+
+
+def drain_worker(args, stats: Dict[str, List[float]], totals: Counter, lock: threading.Lock) -> None:
+    conn = connect(args)
+    cur = conn.cursor(dictionary=True)
+    smtp = smtplib.SMTP(args.smtp_host, args.smtp_port)
+    cache: Dict[str, str] = {}
+    local: Dict[str, List[float]] = defaultdict(list)
+    sent = failed = 0
+    try:
+        while True:
+            t = time.perf_counter()
+            if args.claim == "skip-locked":
+                conn.start_transaction()
+                cur.execute(FETCH_SQL + " FOR UPDATE SKIP LOCKED", (args.batch,))
+            else:
+                cur.execute(FETCH_SQL, (args.batch,))
+            rows = cur.fetchall()
+            local["fetch"].append((time.perf_counter() - t) * 1000.0)
+            if not rows:
+                if conn.in_transaction:
+                    conn.rollback()
+                break
+
+            if args.claim == "skip-locked":
+                # Claim the whole batch while its row locks are held, then send
+                t = time.perf_counter()
+                for row in rows:
+                    cur.execute(PROCESSING_SQL, ("processing", None, "processing", row["id"]))
+                conn.commit()
+                local["claim"].append((time.perf_counter() - t) * 1000.0 / len(rows))
+
+            for row in rows:
+                if args.claim == "select":
+                    # processEmails() marks each row just before sending it, so a
+                    # concurrent worker can still fetch rows later in this batch
+                    t = time.perf_counter()
+                    cur.execute(PROCESSING_SQL, ("processing", None, "processing", row["id"]))
+                    local["claim"].append((time.perf_counter() - t) * 1000.0)
+
+                t = time.perf_counter()
+                meta = json.loads(row.get("metadata") or "{}")
+                msg = EmailMessage()
+                msg["From"] = "Nutri Nexus <support@nutrinexas.com>"
+                msg["To"] = row["to_email"]
+                msg["Subject"] = row["subject"]
+                msg["X-Queue-Id"] = str(row["id"])
+                msg.set_content(render(meta.get("template", ""), meta.get("template_data", {}), cache), subtype="html")
+                local["render"].append((time.perf_counter() - t) * 1000.0)
+
+                t = time.perf_counter()
+                try:
+                    smtp.send_message(msg)
+                    status, error = "sent", None
+                except smtplib.SMTPException as exc:
+                    status, error = "failed", str(exc)
+                local["send"].append((time.perf_counter() - t) * 1000.0)
+
+                t = time.perf_counter()
+                cur.execute(PROCESSING_SQL, (status, error, status, row["id"]))
+                local["update"].append((time.perf_counter() - t) * 1000.0)
+                if status == "sent":
+                    sent += 1
+                else:
+                    failed += 1
+    finally:
+        smtp.quit()
+        cur.close()
+        conn.close()
+        with lock:
+            for stage, values in local.items():
+                stats[stage].extend(values)
+            totals["sent"] += sent
+            totals["failed"] += failed
+
+
+def drain(args) -> None:
+    if Controller is None:
+        raise SystemExit("aiosmtpd not installed (pip install aiosmtpd).")
+    sink = Sink(args.smtp_delay)
+    controller = Controller(sink, hostname=args.smtp_host, port=args.smtp_port)
+    controller.start()
+
+    stats: Dict[str, List[float]] = defaultdict(list)
+    totals: Counter = Counter()
+    lock = threading.Lock()
+    workers = [threading.Thread(target=drain_worker, args=(args, stats, totals, lock)) for _ in range(args.workers)]
+    start = time.perf_counter()
+    try:
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    finally:
+        elapsed = time.perf_counter() - start
+        controller.stop()
+
+    delivered = sum(sink.received.values())
+    duplicates = sum(n - 1 for n in sink.received.values() if n > 1)
+    print(f"\nDrained with {args.workers} workers, batch {args.batch}, claim={args.claim} in {elapsed:.1f}s")
+    print(f"  marked sent      {totals['sent']}")
+    print(f"  send failures    {totals['failed']}")
+    print(f"  delivered        {delivered} ({delivered / max(elapsed, 1e-9):,.1f} emails/s)")
+    print(f"  double sends     {duplicates} ({100.0 * duplicates / max(delivered, 1):.2f}%) "
+          f"across {sum(1 for n in sink.received.values() if n > 1)} rows")
+
+    print(f"\n{'stage':8} {'count':>8} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)")
+    for stage in STAGES:
+        values = stats.get(stage, [])
+        if not values:
+            continue
+        print(f"{stage:8} {len(values):8d} {sum(values) / len(values):8.2f} "
+              f"{loadgen.percentile(values, 50):8.2f} {loadgen.percentile(values, 90):8.2f} "
+              f"{loadgen.percentile(values, 99):8.2f} {max(values):8.2f}")
+
+    conn = connect(args)
+    cur = conn.cursor()
+    cur.execute("SELECT status, COUNT(*) FROM email_queue GROUP BY status")
+    print("\nQueue status: " + ", ".join(f"{s}={n}" for s, n in cur.fetchall()))
+    cur.close()
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Email queue drain benchmark")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sd = sub.add_parser("seed", help="insert pending emails")
+    sd.add_argument("--count", type=int, default=10000)
+    sd.add_argument("--chunk", type=int, default=1000, help="rows per INSERT")
+
+    dr = sub.add_parser("drain", help="drain the queue into a local SMTP sink")
+    dr.add_argument("--workers", type=int, default=4)
+    dr.add_argument("--batch", type=int, default=10, help="getPendingEmails() limit")
+    dr.add_argument("--claim", choices=("select", "skip-locked"), default="select")
+    dr.add_argument("--smtp-host", default="127.0.0.1")
+    dr.add_argument("--smtp-port", type=int, default=8025)
+    dr.add_argument("--smtp-delay", type=float, default=0.0, help="seconds the sink waits per message")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        seed(args)
+    else:
+        drain(args)
+
+
+if __name__ == "__main__":
+    main()
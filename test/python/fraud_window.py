@@ -0,0 +1,759 @@
+"""Click-fraud query scaling benchmark, index advisor and sliding-window service.
+
+With ADS_IP_LIMIT enabled, every ad click runs
+AdFraudDetectionService::checkRapidClickFraud twice: once in
+Ad::logClick before the click is logged, once in
+RealTimeAdBillingService::chargeClick after. It also runs chargeClick's
+getUniqueAdsClickedByIp and hasIpClickedAdToday. All of these are
+COUNT(*) / GROUP BY scans of ads_click_logs (SHAPES below). The two
+"today" queries used to filter on DATE(clicked_at), which no index can
+serve; `bench` times both that and the range form they use now. Their
+cost grows with click history. With the window service, chargeClick takes
+the daily counts from the /check result and skips both queries.
+
+Subcommands:
+
+    bench         grow a copy of ads_click_logs (`--table`, created LIKE the
+                  real one) through `--sizes` synthetic clicks. At each size
+                  it times every query shape, with the DATE() shapes also
+                  rewritten as ranges, and runs EXPLAIN. With --advised it
+                  then adds the recommended indexes and times them again.
+                  Finishes with the advisor's report.
+    advise        EXPLAIN every shape against an existing table (the real
+                  ads_click_logs by default) and print the recommended
+                  index / partition layout as DDL
+    serve         in-memory sliding-window counters answering the same
+                  checks in constant time. AdFraudDetectionService uses it
+                  when AD_FRAUD_SERVICE_URL is set and falls back to SQL
+                  when it does not answer.
+    window-bench  feed synthetic clicks to the window counters in-process
+                  and show check latency staying flat as history grows
+
+Service API (JSON):
+    GET  /check?ad=12&ip=1.2.3.4&session=1 -> checkRapidClickFraud() result
+         plus unique_ads_today / ad_clicks_today
+    POST /click {"ad": 12, "ip": "1.2.3.4", "id": 981}  (Ad::logClick, after
+         the INSERT; `id` is the new ads_click_logs row)
+    GET  /health
+
+ads_click_logs stays the source of truth. On start, `serve` warms itself
+from today's and the last hour's rows (skip with --no-warm). It then
+tails the table by id every --tail-interval seconds, so a click whose
+POST /click timed out or failed is still counted. A click reported both
+ways is counted once. POST /click only makes a click visible before the
+next poll.
+
+Usage:
+    python test/python/fraud_window.py bench --sizes 1M,5M,10M,50M --advised --png fraud_scaling.png
+    python test/python/fraud_window.py advise
+    python test/python/fraud_window.py serve --port 8791
+    python test/python/fraud_window.py window-bench --clicks 5000000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+from zoneinfo import ZoneInfo
+
+import loadgen
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except Exception:
+    plt = None
+
+
+# Thresholds mirrored from AdFraudDetectionService
+RAPID_CLICK_THRESHOLD = 10
+RAPID_CLICK_WINDOW = 60
+FRAUD_SUSPENSION_THRESHOLD = 50
+SESSION_CLICK_LIMIT = 5
+MAX_CLICKS_PER_HOUR_PER_IP = 3
+HOUR = 3600
+
+# name -> (sql, params, source); params are filled from a probe (ad, ip, day)
+SHAPES = {
+    "ip_hour_count": (
+        "SELECT COUNT(*) FROM {t} WHERE ads_id = %s AND ip_address = %s "
+        "AND clicked_at >= DATE_SUB(NOW(), INTERVAL 1 HOUR)", ("ad", "ip"), "checkRapidClickFraud"),
+    "rapid_recent": (
+        "SELECT id, clicked_at FROM {t} WHERE ads_id = %s AND ip_address = %s "
+        "AND clicked_at >= DATE_SUB(NOW(), INTERVAL 30 SECOND) ORDER BY clicked_at DESC LIMIT 1",
+        ("ad", "ip"), "checkRapidClickFraud"),
+    "ip_minute_count": (
+        "SELECT COUNT(*) FROM {t} WHERE ads_id = %s AND ip_address = %s "
+        "AND clicked_at >= DATE_SUB(NOW(), INTERVAL 60 SECOND)", ("ad", "ip"), "checkRapidClickFraud"),
+    "ad_ip_groups": (
+        "SELECT ip_address, COUNT(*) FROM {t} WHERE ads_id = %s "
+        "AND clicked_at >= DATE_SUB(NOW(), INTERVAL 1 HOUR) GROUP BY ip_address HAVING COUNT(*) >= 10",
+        ("ad",), "checkRapidClickFraud"),
+    "ad_hour_total": (
+        "SELECT COUNT(*) FROM {t} WHERE ads_id = %s AND clicked_at >= DATE_SUB(NOW(), INTERVAL 1 HOUR)",
+        ("ad",), "checkRapidClickFraud"),
+    "ip_unique_ads_today": (
+        "SELECT COUNT(DISTINCT ads_id) FROM {t} WHERE ip_address = %s AND DATE(clicked_at) = %s",
+        ("ip", "day"), "getUniqueAdsClickedByIp"),
+    "ip_ad_today": (
+        "SELECT COUNT(*) FROM {t} WHERE ads_id = %s AND ip_address = %s AND DATE(clicked_at) = %s",
+        ("ad", "ip", "day"), "hasIpClickedAdToday"),
+    "ip_unique_ads_today_range": (
+        "SELECT COUNT(DISTINCT ads_id) FROM {t} WHERE ip_address = %s "
+        "AND clicked_at >= %s AND clicked_at < %s + INTERVAL 1 DAY",
+        ("ip", "day", "day"), "rewrite of getUniqueAdsClickedByIp"),
+    "ip_ad_today_range": (
+        "SELECT COUNT(*) FROM {t} WHERE ads_id = %s AND ip_address = %s "
+        "AND clicked_at >= %s AND clicked_at < %s + INTERVAL 1 DAY",
+        ("ad", "ip", "day", "day"), "rewrite of hasIpClickedAdToday"),
+}
+
+# Recommended indexes: name -> (columns, shapes they serve)
+ADVISED = {
+    "idx_click_ad_ip_time": (("ads_id", "ip_address", "clicked_at"),
+                             ("ip_hour_count", "rapid_recent", "ip_minute_count", "ip_ad_today_range")),
+    "idx_click_ad_time_ip": (("ads_id", "clicked_at", "ip_address"), ("ad_ip_groups", "ad_hour_total")),
+    "idx_click_ip_time_ad": (("ip_address", "clicked_at", "ads_id"), ("ip_unique_ads_today_range",)),
+}
+REWRITES = {"ip_unique_ads_today": "ip_unique_ads_today_range", "ip_ad_today": "ip_ad_today_range"}
+FALLBACK_SCHEMA = ("CREATE TABLE {t} (id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY, "
+                   "ads_id INT NOT NULL, ip_address VARCHAR(45) NOT NULL, "
+                   "clicked_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, KEY idx_ads_id (ads_id))")
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    scale = {"K": 1000, "M": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("KM")) * scale)
+
+
+def connect(args):
+    if mysql is None:
+        raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+    return mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database,
+                         autocommit=True)
+
+
+# ------------------------------------------------------------------ seeding
+
+class ClickGenerator:
+    """Synthetic click stream: a few hot ads, Zipf-ish IPs, `--recent-share` in the last hour."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.hot = list(range(1, args.hot_ads + 1))
+        self.probes: List[Tuple[int, str]] = []
+
+    def ip(self) -> str:
+        n = int(self.args.ips * self.rng.random() ** 3)
+        return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+    def rows(self, count: int, now: datetime.datetime):
+        history = self.args.days * 86400
+        for _ in range(count):
+            ad = self.rng.choice(self.hot) if self.rng.random() < self.args.hot_share \
+                else self.rng.randint(1, self.args.ads)
+            ip = self.ip()
+            if self.rng.random() < self.args.recent_share:
+                age = self.rng.random() * HOUR
+                if len(self.probes) < 5000 and ad in self.hot:
+                    self.probes.append((ad, ip))
+            else:
+                age = HOUR + self.rng.random() * history
+            yield ad, ip, now - datetime.timedelta(seconds=age)
+
+
+def prepare_table(cur, table: str, like: str, fresh: bool) -> None:
+    if fresh:
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+    cur.execute("SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (table,))
+    if cur.fetchone()[0]:
+        return
+    cur.execute("SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (like,))
+    if cur.fetchone()[0]:
+        cur.execute(f"CREATE TABLE {table} LIKE {like}")
+    else:
+        cur.execute(FALLBACK_SCHEMA.format(t=table))
+
+
+def table_rows(cur, table: str) -> int:
+    cur.execute(f"SELECT COUNT(*) FROM {table}")
+    return int(cur.fetchone()[0])
+
+
+def grow(cur, table: str, gen: ClickGenerator, count: int, batch: int) -> float:
+    start = time.perf_counter()
+    now = datetime.datetime.now()
+    sql = f"INSERT INTO {table} (ads_id, ip_address, clicked_at) VALUES (%s, %s, %s)"
+    pending = []
+    for row in gen.rows(count, now):
+        pending.append(row)
+        if len(pending) >= batch:
+            cur.executemany(sql, pending)
+            pending = []
+    if pending:
+        cur.executemany(sql, pending)
+    return time.perf_counter() - start
+
+
+# ------------------------------------------------------------------ timing / EXPLAIN
+
+def shape_params(shape: str, probe: Tuple[int, str], day: str) -> List[Any]:
+    values = {"ad": probe[0], "ip": probe[1], "day": day}
+    return [values[p] for p in SHAPES[shape][1]]
+
+
+def time_shape(cur, table: str, shape: str, probes: List[Tuple[int, str]], n: int, rng: random.Random) -> Dict[str, Any]:
+    sql = SHAPES[shape][0].format(t=table)
+    day = datetime.date.today().isoformat()
+    ms = []
+    for _ in range(n):
+        params = shape_params(shape, rng.choice(probes), day)
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        ms.append((time.perf_counter() - start) * 1000.0)
+    return {"p50_ms": loadgen.percentile(ms, 50), "p99_ms": loadgen.percentile(ms, 99)}
+
+
+def explain(cur, table: str, shape: str, probe: Tuple[int, str]) -> Dict[str, Any]:
+    cur.execute("EXPLAIN " + SHAPES[shape][0].format(t=table),
+                shape_params(shape, probe, datetime.date.today().isoformat()))
+    names = [d[0] for d in cur.description]
+    row = dict(zip(names, cur.fetchone()))
+    cur.fetchall()
+    return {"type": row.get("type"), "key": row.get("key"), "rows": int(row.get("rows") or 0),
+            "extra": row.get("Extra") or ""}
+
+
+def existing_indexes(cur, table: str) -> Dict[str, Tuple[str, ...]]:
+    cur.execute(f"SHOW INDEX FROM {table}")
+    names = [d[0] for d in cur.description]
+    cols: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    for r in cur.fetchall():
+        row = dict(zip(names, r))
+        cols[row["Key_name"]].append((int(row["Seq_in_index"]), row["Column_name"]))
+    return {k: tuple(c for _, c in sorted(v)) for k, v in cols.items()}
+
+
+def covered(columns: Tuple[str, ...], indexes: Dict[str, Tuple[str, ...]]) -> Optional[str]:
+    for name, cols in indexes.items():
+        if cols[:len(columns)] == columns:
+            return name
+    return None
+
+
+def needs_help(plan: Dict[str, Any]) -> bool:
+    return (plan["type"] in ("ALL", "index") or not plan["key"]
+            or "filesort" in plan["extra"] or "temporary" in plan["extra"])
+
+
+def advise(cur, table: str, plans: Dict[str, Dict[str, Any]], rows: int, args) -> List[str]:
+    """Print the recommended layout for `table` and return the index DDL."""
+    indexes = existing_indexes(cur, table)
+    print(f"\nCurrent indexes on {table}: " + ", ".join(f"{k}({', '.join(v)})" for k, v in indexes.items()))
+    print(f"\n{'shape':27} {'type':>6} {'key':>22} {'rows':>11}  verdict")
+    for shape, plan in plans.items():
+        verdict = "ok" if not needs_help(plan) else "scan"
+        if shape in REWRITES:
+            verdict += f"; DATE(clicked_at) defeats indexes, use {REWRITES[shape]}"
+        print(f"{shape:27} {str(plan['type']):>6} {str(plan['key'])[:22]:>22} {plan['rows']:11,}  {verdict}")
+
+    ddl = []
+    print("\nRecommended layout:")
+    for name, (columns, serves) in ADVISED.items():
+        have = covered(columns, indexes)
+        if have:
+            print(f"  ({', '.join(columns)}) already served by {have}")
+            continue
+        stmt = f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(columns)})"
+        ddl.append(stmt)
+        print(f"  {stmt};\n      -- serves {', '.join(serves)}")
+    for name, cols in indexes.items():
+        if name != "PRIMARY" and any(adv[:len(cols)] == cols for adv, _ in ADVISED.values()) \
+                and cols not in [adv for adv, _ in ADVISED.values()]:
+            print(f"  ALTER TABLE {table} DROP INDEX {name};  -- ({', '.join(cols)}) is a prefix of an advised index")
+    print("  Filter days as clicked_at >= ? AND clicked_at < ? + INTERVAL 1 DAY, not DATE(clicked_at) = ? "
+          "(as RealTimeAdBillingService::getUniqueAdsClickedByIp / hasIpClickedAdToday do).")
+    if rows >= args.partition_rows:
+        print(f"  At {rows:,} rows, partition by day and drop old partitions instead of DELETEing history:\n"
+              f"    ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, clicked_at);\n"
+              f"    ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(clicked_at)) (\n"
+              f"      PARTITION p{datetime.date.today():%Y%m%d} VALUES LESS THAN "
+              f"(TO_DAYS('{datetime.date.today() + datetime.timedelta(days=1)}')),\n"
+              f"      PARTITION pmax VALUES LESS THAN MAXVALUE);\n"
+              f"    -- fraud checks read at most today + 1 hour, so they prune to one or two partitions")
+    else:
+        print(f"  Partitioning not needed below {args.partition_rows:,} rows (--partition-rows).")
+    return ddl
+
+
+def run_bench(args) -> None:
+    conn = connect(args)
+    cur = conn.cursor()
+    prepare_table(cur, args.table, args.like, args.fresh)
+    gen = ClickGenerator(args)
+    rng = random.Random(args.seed + 1)
+    sizes = sorted(parse_size(s) for s in args.sizes.split(","))
+    series: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    plans: Dict[str, Dict[str, Any]] = {}
+    rows = table_rows(cur, args.table)
+
+    for size in sizes:
+        if size > rows:
+            print(f"Seeding {size - rows:,} clicks into {args.table}...")
+            took = grow(cur, args.table, gen, size - rows, args.batch)
+            print(f"  {size - rows:,} rows in {took:.0f}s")
+            rows = size
+        cur.execute(f"ANALYZE TABLE {args.table}")
+        cur.fetchall()
+        probes = gen.probes or [(1, "10.0.0.1")]
+        print(f"\n{rows:,} rows:")
+        print(f"{'shape':27} {'p50 ms':>9} {'p99 ms':>9} {'type':>6} {'key':>22} {'rows':>11}")
+        for shape in SHAPES:
+            timing = time_shape(cur, args.table, shape, probes, args.probes, rng)
+            plans[shape] = explain(cur, args.table, shape, probes[0])
+            series[shape].append(dict(timing, size=rows, **plans[shape]))
+            print(f"{shape:27} {timing['p50_ms']:9.2f} {timing['p99_ms']:9.2f} {str(plans[shape]['type']):>6} "
+                  f"{str(plans[shape]['key'])[:22]:>22} {plans[shape]['rows']:11,}")
+
+    if len(sizes) > 1:
+        print(f"\nGrowth {sizes[0]:,} -> {rows:,} rows (x{rows / sizes[0]:.0f}):")
+        for shape, points in series.items():
+            first, last = points[0]["p50_ms"], points[-1]["p50_ms"]
+            print(f"  {shape:27} p50 x{last / first if first else 0:6.1f}")
+
+    ddl = advise(cur, args.table, plans, rows, args)
+    if args.advised and ddl:
+        print("\nApplying advised indexes...")
+        for stmt in ddl:
+            start = time.perf_counter()
+            cur.execute(stmt)
+            print(f"  {stmt} ({time.perf_counter() - start:.0f}s)")
+        probes = gen.probes or [(1, "10.0.0.1")]
+        print(f"\n{'shape':27} {'before p50':>11} {'after p50':>10} {'after p99':>10} {'key':>22}")
+        for shape in SHAPES:
+            timing = time_shape(cur, args.table, shape, probes, args.probes, rng)
+            plan = explain(cur, args.table, shape, probes[0])
+            series[shape + " (advised)"].append(dict(timing, size=rows, **plan))
+            print(f"{shape:27} {series[shape][-1]['p50_ms']:11.2f} {timing['p50_ms']:10.2f} "
+                  f"{timing['p99_ms']:10.2f} {str(plan['key'])[:22]:>22}")
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(series, fh, indent=1, default=str)
+        print(f"\nResults written to {args.out}")
+    if args.png:
+        plot(series, args.png)
+    cur.close()
+    conn.close()
+
+
+def plot(series: Dict[str, List[Dict[str, Any]]], path: str) -> None:
+    if plt is None:
+        print("\nmatplotlib not installed; skipping chart.")
+        return
+    fig, ax = plt.subplots(figsize=(9, 6))
+    for shape, points in sorted(series.items()):
+        if len(points) > 1:
+            ax.plot([p["size"] for p in points], [p["p50_ms"] for p in points], marker="o", label=shape)
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("rows in click table")
+    ax.set_ylabel("p50 latency (ms)")
+    ax.legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    print(f"\nChart written to {path}")
+
+
+def run_advise(args) -> None:
+    conn = connect(args)
+    cur = conn.cursor()
+    cur.execute(f"SELECT ads_id, ip_address FROM {args.table} ORDER BY id DESC LIMIT 1")
+    row = cur.fetchone()
+    probe = (int(row[0]), row[1]) if row else (1, "10.0.0.1")
+    plans = {shape: explain(cur, args.table, shape, probe) for shape in SHAPES}
+    advise(cur, args.table, plans, table_rows(cur, args.table), args)
+    cur.close()
+    conn.close()
+
+
+# ------------------------------------------------------------------ sliding windows
+
+class ClickWindows:
+    """Last-hour click counters per (ad, IP) and per ad, plus today's ads per IP.
+
+    Every click is appended once and expired once, so recording and checking
+    cost O(1) amortized however long the click history is. "Today" is the
+    calendar day in `tz`, which should match the app's
+    date_default_timezone_set() (RealTimeAdBillingService uses date('Y-m-d')).
+    """
+
+    def __init__(self, tz: Optional[datetime.tzinfo] = None):
+        self.tz = tz
+        self.lock = threading.Lock()
+        self.pairs: Dict[Tuple[int, str], Deque[float]] = {}
+        self.ad_hour: Dict[int, Deque[Tuple[float, str]]] = defaultdict(deque)
+        self.rapid_ips: Counter = Counter()
+        self.today: Dict[str, Tuple[datetime.date, Counter]] = {}
+        self.clicks = 0
+        # Highest ads_click_logs id tailed, and ids POSTed ahead of the tail
+        self.last_id = 0
+        self.posted: Set[int] = set()
+        self.tailed = 0
+
+    def day(self, ts: float) -> datetime.date:
+        return datetime.datetime.fromtimestamp(ts, self.tz).date()
+
+    def expire(self, ad: int, now: float) -> None:
+        q = self.ad_hour.get(ad)
+        while q and q[0][0] < now - HOUR:
+            _, ip = q.popleft()
+            pair = self.pairs[(ad, ip)]
+            if len(pair) == RAPID_CLICK_THRESHOLD:
+                self.rapid_ips[ad] -= 1
+            pair.popleft()
+            if not pair:
+                del self.pairs[(ad, ip)]
+
+    def record(self, ad: int, ip: str, ts: Optional[float] = None, click_id: Optional[int] = None) -> bool:
+        """Count a click; returns False when `click_id` was already counted."""
+        with self.lock:
+            if click_id is not None:
+                if click_id <= self.last_id or click_id in self.posted:
+                    return False
+                self.posted.add(click_id)
+            self._record(ad, ip, ts)
+        return True
+
+    def catch_up(self, rows: Iterable[Tuple[int, int, str, float]]) -> int:
+        """Count (id, ad, ip, ts) rows tailed from ads_click_logs that no POST /click reported."""
+        added = 0
+        with self.lock:
+            for click_id, ad, ip, ts in rows:
+                if click_id <= self.last_id:
+                    continue
+                self.last_id = click_id
+                if click_id in self.posted:
+                    self.posted.discard(click_id)
+                    continue
+                self._record(ad, ip, ts)
+                added += 1
+            if self.posted:
+                self.posted = {i for i in self.posted if i > self.last_id}
+            self.tailed += added
+        return added
+
+    def _record(self, ad: int, ip: str, ts: Optional[float]) -> None:
+        now = time.time()
+        ts = now if ts is None else ts
+        self.clicks += 1
+        day = self.day(ts)
+        seen_day, ads = self.today.get(ip, (day, Counter()))
+        if seen_day != day:
+            ads = Counter()
+        ads[ad] += 1
+        self.today[ip] = (day, ads)
+        if ts < now - HOUR:
+            return
+        self.expire(ad, now)
+        pair = self.pairs.setdefault((ad, ip), deque())
+        pair.append(ts)
+        if len(pair) == RAPID_CLICK_THRESHOLD:
+            self.rapid_ips[ad] += 1
+        self.ad_hour[ad].append((ts, ip))
+
+    def check(self, ad: int, ip: str, session: bool = True) -> Dict[str, Any]:
+        """Same result as AdFraudDetectionService::checkRapidClickFraud with ADS_IP_LIMIT enabled."""
+        now = time.time()
+        with self.lock:
+            self.expire(ad, now)
+            pair = self.pairs.get((ad, ip), ())
+            hour = len(pair)
+            day, ads = self.today.get(ip, (None, Counter()))
+            if day != self.day(now):
+                ads = Counter()
+            extra = {"unique_ads_today": len(ads), "ad_clicks_today": ads.get(ad, 0)}
+
+            if hour >= MAX_CLICKS_PER_HOUR_PER_IP:
+                return dict(extra, is_fraud=True, fraud_score=80, click_count=hour, total_clicks=0,
+                            should_suspend=False, is_duplicate=False,
+                            indicators=[f"Exceeded click limit: {hour} clicks from same IP in last hour "
+                                        f"(limit: {MAX_CLICKS_PER_HOUR_PER_IP})"])
+            if pair and pair[-1] >= now - 30:
+                return dict(extra, is_fraud=True, fraud_score=100, click_count=hour + 1, total_clicks=0,
+                            should_suspend=False, is_duplicate=True,
+                            indicators=["Rapid-fire click from same IP within 30 seconds - likely bot/fraud"])
+
+            minute = 0
+            for ts in reversed(pair):
+                if ts < now - RAPID_CLICK_WINDOW:
+                    break
+                minute += 1
+            session_clicks = hour if session else 0
+            rapid_ips = self.rapid_ips[ad]
+            total = len(self.ad_hour.get(ad, ()))
+
+        is_fraud, score, indicators = False, 0, []
+        if minute >= RAPID_CLICK_THRESHOLD:
+            is_fraud, score = True, score + 30
+            indicators.append(f"Rapid clicks from same IP: {minute} clicks in {RAPID_CLICK_WINDOW} seconds")
+        if session_clicks >= SESSION_CLICK_LIMIT:
+            is_fraud, score = True, score + 40
+            indicators.append(f"Session click limit exceeded: {session_clicks} clicks from same session "
+                              f"(limit: {SESSION_CLICK_LIMIT})")
+        if rapid_ips > 0:
+            score += 20
+            indicators.append(f"Multiple IPs showing rapid click patterns: {rapid_ips} IPs")
+        if total >= FRAUD_SUSPENSION_THRESHOLD:
+            is_fraud, score = True, score + 50
+            indicators.append(f"Excessive clicks detected: {total} clicks in last hour "
+                              f"(threshold: {FRAUD_SUSPENSION_THRESHOLD})")
+        return dict(extra, is_fraud=is_fraud, fraud_score=score, indicators=indicators, click_count=minute,
+                    session_clicks=session_clicks, total_clicks=total,
+                    should_suspend=total >= FRAUD_SUSPENSION_THRESHOLD, is_duplicate=False)
+
+    def sweep(self) -> None:
+        """Expire idle ads and yesterday's per-IP sets."""
+        now = time.time()
+        today = self.day(now)
+        with self.lock:
+            for ad in list(self.ad_hour):
+                self.expire(ad, now)
+                if not self.ad_hour[ad]:
+                    del self.ad_hour[ad]
+                    self.rapid_ips.pop(ad, None)
+            for ip in [ip for ip, (day, _) in self.today.items() if day != today]:
+                del self.today[ip]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"clicks": self.clicks, "pairs": len(self.pairs), "ads": len(self.ad_hour),
+                "ips_today": len(self.today), "last_id": self.last_id, "tailed": self.tailed}
+
+
+def warm(windows: ClickWindows, args) -> None:
+    """Load today's and the last hour's clicks and start the tail at the newest id."""
+    conn = connect(args)
+    cur = conn.cursor()
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM ads_click_logs")
+    head = int(cur.fetchone()[0])
+    n = 0
+    if not args.no_warm:
+        now = datetime.datetime.now(windows.tz)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        since = min(midnight.timestamp(), now.timestamp() - HOUR)
+        cur.execute("SELECT id, ads_id, ip_address, UNIX_TIMESTAMP(clicked_at) FROM ads_click_logs "
+                    "WHERE clicked_at >= FROM_UNIXTIME(%s) AND id <= %s ORDER BY id", (int(since), head))
+        n = windows.catch_up((int(i), int(ad), ip, float(ts)) for i, ad, ip, ts in cur)
+    cur.close()
+    conn.close()
+    with windows.lock:
+        windows.last_id = max(windows.last_id, head)
+        windows.tailed = 0
+    print(f"Warmed from {n:,} clicks in ads_click_logs; tailing from id {head}")
+
+
+def tail(windows: ClickWindows, args) -> None:
+    """Poll ads_click_logs by id and count clicks no POST /click reported."""
+    conn = None
+    while True:
+        time.sleep(args.tail_interval)
+        try:
+            if conn is None:
+                conn = connect(args)
+            cur = conn.cursor()
+            cur.execute("SELECT id, ads_id, ip_address, UNIX_TIMESTAMP(clicked_at) FROM ads_click_logs "
+                        "WHERE id > %s ORDER BY id LIMIT %s", (windows.last_id, args.tail_batch))
+            rows = [(int(i), int(ad), ip, float(ts)) for i, ad, ip, ts in cur.fetchall()]
+            cur.close()
+        except mysql.Error as exc:
+            print(f"Tail of ads_click_logs failed ({exc}); reconnecting")
+            conn = None
+            continue
+        added = windows.catch_up(rows)
+        if added:
+            print(f"Tail picked up {added} clicks not reported by POST /click (up to id {windows.last_id})")
+
+
+def make_handler(windows: ClickWindows):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def send_json(self, payload: Dict[str, Any], code: int = 200) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def params(self) -> Dict[str, Any]:
+            url = urlsplit(self.path)
+            params: Dict[str, Any] = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                try:
+                    params.update(json.loads(self.rfile.read(length)))
+                except ValueError:
+                    pass
+            return params
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            if path == "/health":
+                self.send_json(dict(windows.stats(), success=True))
+                return
+            if path != "/check":
+                self.send_json({"success": False, "error": "not found"}, 404)
+                return
+            params = self.params()
+            try:
+                ad = int(params["ad"])
+            except (KeyError, ValueError):
+                self.send_json({"success": False, "error": "ad required"}, 400)
+                return
+            start = time.perf_counter()
+            result = windows.check(ad, str(params.get("ip", "")), str(params.get("session", "1")) != "0")
+            result.update(success=True, took_us=round((time.perf_counter() - start) * 1e6, 1))
+            self.send_json(result)
+
+        def do_POST(self):
+            if urlsplit(self.path).path != "/click":
+                self.send_json({"success": False, "error": "not found"}, 404)
+                return
+            params = self.params()
+            try:
+                windows.record(int(params["ad"]), str(params.get("ip", "")),
+                               float(params["ts"]) if params.get("ts") else None,
+                               int(params["id"]) if params.get("id") else None)
+            except (KeyError, ValueError):
+                self.send_json({"success": False, "error": "ad required"}, 400)
+                return
+            self.send_json({"success": True})
+
+    return Handler
+
+
+def serve(args) -> None:
+    windows = ClickWindows(ZoneInfo(args.timezone))
+    if not args.no_warm or args.tail_interval > 0:
+        warm(windows, args)
+    if args.tail_interval > 0:
+        threading.Thread(target=tail, args=(windows, args), daemon=True).start()
+
+    def sweeper() -> None:
+        while True:
+            time.sleep(60)
+            windows.sweep()
+
+    threading.Thread(target=sweeper, daemon=True).start()
+    server = ThreadingHTTPServer((args.bind, args.port), make_handler(windows))
+    print(f"Fraud window service listening on http://{args.bind}:{args.port}")
+    server.serve_forever()
+
+
+def window_bench(args) -> None:
+    gen = ClickGenerator(args)
+    windows = ClickWindows()
+    rng = random.Random(args.seed + 1)
+    # Replay the synthetic stream compressed into the last hour so every click stays in the window
+    now = time.time()
+    marks = sorted({int(args.clicks * f) for f in (0.01, 0.1, 0.5, 1.0)})
+    print(f"{'clicks':>12} {'pairs':>10} {'record us':>10} {'check p50 us':>13} {'check p99 us':>13}")
+    done = 0
+    for mark in marks:
+        start = time.perf_counter()
+        for i, (ad, ip, _) in enumerate(gen.rows(mark - done, datetime.datetime.now())):
+            windows.record(ad, ip, now - HOUR + HOUR * (done + i) / args.clicks)
+        record_us = (time.perf_counter() - start) * 1e6 / max(mark - done, 1)
+        done = mark
+        probes = gen.probes or [(1, "10.0.0.1")]
+        us = []
+        for _ in range(args.probes):
+            ad, ip = rng.choice(probes)
+            t0 = time.perf_counter()
+            windows.check(ad, ip)
+            us.append((time.perf_counter() - t0) * 1e6)
+        print(f"{done:12,} {len(windows.pairs):10,} {record_us:10.2f} {loadgen.percentile(us, 50):13.2f} "
+              f"{loadgen.percentile(us, 99):13.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Click-fraud query benchmark, index advisor and window service")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    parser.add_argument("--partition-rows", type=int, default=20000000,
+                        help="recommend daily partitions from this many rows")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def synthetic(p) -> None:
+        p.add_argument("--ads", type=int, default=2000)
+        p.add_argument("--hot-ads", type=int, default=5)
+        p.add_argument("--hot-share", type=float, default=0.3, help="share of clicks on the hot ads")
+        p.add_argument("--ips", type=int, default=500000)
+        p.add_argument("--days", type=int, default=90, help="history spread")
+        p.add_argument("--recent-share", type=float, default=0.01, help="share of clicks in the last hour")
+        p.add_argument("--probes", type=int, default=200, help="timed executions per query shape")
+        p.add_argument("--seed", type=int, default=7)
+
+    bn = sub.add_parser("bench", help="grow a synthetic click table and time every fraud query shape")
+    synthetic(bn)
+    bn.add_argument("--table", default="ads_click_logs_bench")
+    bn.add_argument("--like", default="ads_click_logs", help="copy this table's schema when it exists")
+    bn.add_argument("--sizes", default="1M,5M,10M")
+    bn.add_argument("--batch", type=int, default=10000)
+    bn.add_argument("--fresh", action="store_true", help="drop and recreate --table first")
+    bn.add_argument("--advised", action="store_true", help="add the advised indexes at the end and re-time")
+    bn.add_argument("--out", default=None, help="write the timing series as JSON")
+    bn.add_argument("--png", default=None, help="write a log-log chart here (needs matplotlib)")
+
+    ad = sub.add_parser("advise", help="EXPLAIN the fraud queries on an existing table")
+    ad.add_argument("--table", default="ads_click_logs")
+
+    sv = sub.add_parser("serve", help="run the sliding-window counter service")
+    sv.add_argument("--bind", default="127.0.0.1")
+    sv.add_argument("--port", type=int, default=8791)
+    sv.add_argument("--no-warm", action="store_true", help="start empty instead of loading recent clicks")
+    sv.add_argument("--tail-interval", type=float, default=1.0,
+                    help="seconds between ads_click_logs polls by id (0 = trust POST /click only)")
+    sv.add_argument("--tail-batch", type=int, default=5000, help="rows read per poll")
+    sv.add_argument("--timezone", default="Asia/Kolkata",
+                    help="day boundary for the per-IP daily counts (App/Config/config.php time zone)")
+
+    wb = sub.add_parser("window-bench", help="time the window counters in-process")
+    synthetic(wb)
+    wb.add_argument("--clicks", type=int, default=1000000)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        run_bench(args)
+    elif args.command == "advise":
+        run_advise(args)
+    elif args.command == "serve":
+        serve(args)
+    else:
+        window_bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Build responsive image variants ahead of time for PerformanceCache.
+
+PerformanceCache::cacheImage() resizes and re-encodes with GD on the first
+request for each size, and ImageCompressor does the same inside uploads.
+This walks public/images and public/uploads in a process pool and writes
+width-bucketed WebP, AVIF (when Pillow has an AVIF encoder) and JPEG
+variants plus a manifest that PerformanceCache::getOptimizedImagePath()
+reads, so views resolve to a prebuilt file without touching GD.
+
+Variants are content-addressed (`variants/<sha1[:2]>/<sha1[:16]>-<width>.<ext>`),
+so identical files share variants and a re-run only encodes images whose
+hash changed. The manifest lives next to them in App/storage/cache/variants/
+(outside the images/ directory clearAllCache() empties):
+
+    {"version": 1, "widths": [...], "images": {
+        "images/logo/logo.png": {"sha1": "...", "mtime": 1760000000, "width": 800,
+            "height": 400, "variants": {"webp": {"320": "/App/storage/cache/variants/ab/...-320.webp"}}}}}
+
+Keys are paths relative to public/. The product card and product page
+call View::imageVariant() with their asset URLs, which are mapped back to
+these keys; remote image URLs are left alone.
+
+Usage:
+    python test/python/image_pipeline.py
+    python test/python/image_pipeline.py --workers 8 --formats webp,jpeg --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image, features
+except Exception:
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  registers the AVIF plugin on older Pillow
+except Exception:
+    pass
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+PUBLIC_DIR = os.path.join(REPO_ROOT, "public")
+SOURCE_DIRS = ("images", "uploads")
+OUT_DIR = os.path.join(REPO_ROOT, "App", "storage", "cache", "variants")
+URL_PREFIX = "/App/storage/cache/variants"
+WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+QUALITY = {"webp": 82, "avif": 55, "jpeg": 82}
+SAVE_FORMAT = {"webp": "WEBP", "avif": "AVIF", "jpeg": "JPEG"}
+EXT = {"webp": "webp", "avif": "avif", "jpeg": "jpg"}
+
+
+def available_formats(requested: List[str]) -> List[str]:
+    out = []
+    for fmt in requested:
+        if fmt == "avif" and "AVIF" not in Image.registered_extensions().values():
+            print("AVIF encoder not available in this Pillow build; skipping avif variants.")
+            continue
+        if fmt == "webp" and not features.check("webp"):
+            print("Pillow built without WebP; skipping webp variants.")
+            continue
+        out.append(fmt)
+    return out
+
+
+def sha1_of(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def iter_sources(public_dir: str, dirs: Tuple[str, ...]) -> List[str]:
+    out = []
+    for top in dirs:
+        for root, _, files in os.walk(os.path.join(public_dir, top)):
+            for name in files:
+                if name.lower().endswith(EXTENSIONS):
+                    out.append(os.path.relpath(os.path.join(root, name), public_dir).replace(os.sep, "/"))
+    return sorted(out)
+
+
+def target_widths(width: int) -> List[int]:
+    """Buckets narrower than the original, plus the original width up to the largest bucket."""
+    return [w for w in WIDTHS if w < width] + ([width] if width <= WIDTHS[-1] else [])
+
+
+def build_variants(public_dir: str, rel: str, digest: str, formats: List[str], out_dir: str) -> Dict[str, Any]:
+    """Encode every width/format for one image (runs in a worker process)."""
+    src = os.path.join(public_dir, rel)
+    with Image.open(src) as im:
+        im.load()
+        width, height = im.size
+        has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+        base = im.convert("RGBA" if has_alpha else "RGB")
+
+    sub = os.path.join(out_dir, digest[:2])
+    os.makedirs(sub, exist_ok=True)
+    variants: Dict[str, Dict[str, str]] = {fmt: {} for fmt in formats}
+    written = 0
+    for w in target_widths(width):
+        h = max(1, round(height * w / width))
+        resized = base if w == width else base.resize((w, h), Image.LANCZOS)
+        for fmt in formats:
+            name = f"{digest[:16]}-{w}.{EXT[fmt]}"
+            path = os.path.join(sub, name)
+            if not os.path.exists(path):
+                img = resized
+                if fmt == "jpeg" and has_alpha:
+                    img = Image.new("RGB", resized.size, (255, 255, 255))
+                    img.paste(resized, mask=resized.getchannel("A"))
+                tmp = f"{path}.{os.getpid()}.tmp"
+                img.save(tmp, SAVE_FORMAT[fmt], quality=QUALITY[fmt], optimize=fmt == "jpeg")
+                os.replace(tmp, path)
+                written += os.path.getsize(path)
+            variants[fmt][str(w)] = f"{URL_PREFIX}/{digest[:2]}/{name}"
+    return {
+        "entry": {"sha1": digest, "mtime": int(os.path.getmtime(src)), "width": width, "height": height,
+                  "variants": variants},
+        "bytes_in": os.path.getsize(src),
+        "bytes_out": written,
+    }
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    return {"version": 1, "images": {}}
+
+
+def up_to_date(entry: Optional[Dict[str, Any]], digest: str, formats: List[str], out_dir: str) -> bool:
+    if not entry or entry.get("sha1") != digest:
+        return False
+    for fmt in formats:
+        urls = entry["variants"].get(fmt)
+        if not urls or not all(os.path.exists(os.path.join(out_dir, u[len(URL_PREFIX) + 1:])) for u in urls.values()):
+            return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prebuild responsive image variants")
+    parser.add_argument("--public", default=PUBLIC_DIR)
+    parser.add_argument("--dirs", default=",".join(SOURCE_DIRS), help="comma-separated dirs under public/")
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--formats", default="webp,avif,jpeg")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--force", action="store_true", help="re-encode even when the hash is unchanged")
+    args = parser.parse_args()
+
+    if Image is None:
+        raise SystemExit("Pillow not installed (pip install Pillow).")
+    formats = available_formats([f.strip() for f in args.formats.split(",") if f.strip()])
+    manifest_path = os.path.join(args.out, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    old = manifest.get("images", {})
+
+    sources = iter_sources(args.public, tuple(d.strip() for d in args.dirs.split(",")))
+    images: Dict[str, Any] = {}
+    todo: Dict[str, List[str]] = {}  # digest -> paths; identical files are encoded once
+    for rel in sources:
+        digest = sha1_of(os.path.join(args.public, rel))
+        if not args.force and up_to_date(old.get(rel), digest, formats, args.out):
+            images[rel] = dict(old[rel], mtime=int(os.path.getmtime(os.path.join(args.public, rel))))
+        else:
+            todo.setdefault(digest, []).append(rel)
+    print(f"{len(sources)} images, {len(images)} unchanged, encoding {len(todo)} distinct "
+          f"as {'/'.join(formats)} with {args.workers} workers")
+
+    start = time.perf_counter()
+    bytes_in = bytes_out = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(build_variants, args.public, rels[0], digest, formats, args.out): rels
+                   for digest, rels in todo.items()}
+        for fut in as_completed(futures):
+            rels = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as exc:
+                failed += 1
+                print(f"  failed {rels[0]}: {exc}")
+                continue
+            for rel in rels:
+                images[rel] = dict(res["entry"], mtime=int(os.path.getmtime(os.path.join(args.public, rel))))
+            bytes_in += res["bytes_in"]
+            bytes_out += res["bytes_out"]
+    elapsed = time.perf_counter() - start
+
+    manifest = {"version": 1, "generated": int(time.time()), "widths": list(WIDTHS), "formats": formats,
+                "images": dict(sorted(images.items()))}
+    os.makedirs(args.out, exist_ok=True)
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, separators=(",", ":"))
+    os.replace(tmp, manifest_path)
+
+    print(f"Encoded {len(todo) - failed} images in {elapsed:.1f}s ({failed} failed): "
+          f"{bytes_in / 1e6:.1f} MB of sources -> {bytes_out / 1e6:.1f} MB of new variants")
+    print(f"Manifest: {manifest_path} ({len(images)} images)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Asyncio HTTP load engine shared by the Python performance scripts.
+
+Drives a list of URLs with a pooled, keep-alive aiohttp session and
+collects one result dict per request, in the same shape that
+`perf_admin_routes.measure_route` returns (url, status, ms). Two arrival
+models are supported:
+
+- closed loop: N virtual users, each issuing its next request as soon as
+  the previous one finishes (throughput is limited by latency).
+- open loop: requests arrive at a fixed rate (Poisson by default) whether
+  or not earlier requests have completed. Latency is measured from the
+  scheduled arrival time, so a stalled server shows up in the numbers
+  instead of silently slowing the generator down.
+
+Usage (library):
+    results = run_load(urls, concurrency=200, duration=30)
+    print_summary(summarize(results))
+"""
+
+import asyncio
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+
+PERCENTILES = (50, 90, 99, 99.9)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the `pct` percentile of `values` using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    rank = (pct / 100.0) * (len(ordered) - 1)
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return float(ordered[low])
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def histogram(values: Iterable[float], buckets: Iterable[float] = LATENCY_BUCKETS_MS) -> List[tuple]:
+    """Return [(upper_bound_ms, count), ...] with a final ("+Inf", count) bucket."""
+    bounds = list(buckets)
+    counts = [0] * (len(bounds) + 1)
+    for v in values:
+        for i, b in enumerate(bounds):
+            if v <= b:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return list(zip(bounds + ["+Inf"], counts))
+
+
+def is_error(result: Dict[str, Any]) -> bool:
+    """A result counts as an error on transport failure or a 5xx status."""
+    status = result.get("status")
+    return not isinstance(status, int) or status >= 500
+
+
+def make_session(concurrency: int, timeout: float = 10.0, **kwargs: Any) -> aiohttp.ClientSession:
+    """Create a keep-alive session whose pool is sized for `concurrency`."""
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        limit_per_host=concurrency,
+        keepalive_timeout=30,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        **kwargs,
+    )
+
+
+async def fetch(
+    session: aiohttp.ClientSession,
+    url: str,
+    method: str = "GET",
+    started: Optional[float] = None,
+    label: Optional[str] = None,
+    want_body: bool = False,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Issue one request and return {url, status, ms, bytes, ttfb_ms}.
+
+    `started` lets open-loop callers pass the scheduled arrival time so
+    queueing delay inside the generator is charged to the request.
+    With `want_body` the decoded response text is kept under "body".
+    A request that was redirected records the final path as "redirected_to".
+    """
+    start = started if started is not None else time.perf_counter()
+    result: Dict[str, Any] = {"url": label or url, "status": "ERR", "ms": 0.0, "bytes": 0, "ttfb_ms": None}
+    try:
+        async with session.request(method, url, **kwargs) as resp:
+            result["ttfb_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+            body = await resp.read()
+            result["status"] = resp.status
+            result["bytes"] = len(body)
+            if resp.history:
+                result["redirected_to"] = resp.url.path
+            if want_body:
+                result["body"] = body.decode(resp.charset or "utf-8", errors="replace")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        result["error"] = type(exc).__name__
+    result["ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+    return result
+
+
+async def closed_loop(
+    session: aiohttp.ClientSession,
+    urls: List[str],
+    concurrency: int,
+    duration: Optional[float] = None,
+    requests_per_user: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    sessions: Optional[List[aiohttp.ClientSession]] = None,
+) -> List[Dict[str, Any]]:
+    """Run `concurrency` virtual users round-robin over `urls`.
+
+    Stops after `duration` seconds or `requests_per_user` requests per user,
+    whichever is given (duration wins when both are set). With `sessions`,
+    user n sends through sessions[n % len(sessions)] instead of `session`.
+    """
+    results: List[Dict[str, Any]] = []
+    deadline = time.perf_counter() + duration if duration else None
+    limit = requests_per_user if requests_per_user else (None if duration else 1)
+
+    async def user(offset: int) -> None:
+        i = 0
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if deadline is None and limit is not None and i >= limit:
+                return
+            res = await fetch(sessions[offset % len(sessions)] if sessions else session,
+                              urls[(offset + i) % len(urls)])
+            results.append(res)
+            if on_result:
+                on_result(res)
+            i += 1
+
+    await asyncio.gather(*(user(n) for n in range(concurrency)))
+    return results
+
+
+async def open_loop(
+    session: aiohttp.ClientSession,
+    urls: List[str],
+    rate: float,
+    duration: float,
+    max_in_flight: int = 1000,
+    poisson: bool = True,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    sessions: Optional[List[aiohttp.ClientSession]] = None,
+) -> List[Dict[str, Any]]:
+    """Issue requests at `rate` per second for `duration` seconds.
+
+    Arrivals beyond `max_in_flight` outstanding requests are recorded as
+    status "DROP" rather than queued, so an overloaded server cannot make
+    the generator's own memory grow without bound. With `sessions`,
+    arrivals are spread round-robin over them.
+    """
+    results: List[Dict[str, Any]] = []
+    in_flight = 0
+    tasks = set()
+
+    async def one(url: str, scheduled: float, via: aiohttp.ClientSession) -> None:
+        nonlocal in_flight
+        try:
+            res = await fetch(via, url, started=scheduled)
+        finally:
+            in_flight -= 1
+        results.append(res)
+        if on_result:
+            on_result(res)
+
+    start = time.perf_counter()
+    next_at = start
+    i = 0
+    while next_at - start < duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        url = urls[i % len(urls)]
+        if in_flight >= max_in_flight:
+            results.append({"url": url, "status": "DROP", "ms": 0.0, "bytes": 0, "ttfb_ms": None})
+        else:
+            in_flight += 1
+            task = asyncio.ensure_future(one(url, next_at, sessions[i % len(sessions)] if sessions else session))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        i += 1
+        gap = random.expovariate(rate) if poisson else 1.0 / rate
+        next_at += gap
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return results
+
+
+def run_load(
+    urls: Iterable[str],
+    concurrency: int = 50,
+    duration: Optional[float] = None,
+    requests_per_user: Optional[int] = None,
+    rate: Optional[float] = None,
+    timeout: float = 10.0,
+    poisson: bool = True,
+    login: Optional[Callable[[aiohttp.ClientSession], Awaitable[bool]]] = None,
+    users: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Synchronous entry point: open loop when `rate` is set, else closed loop.
+
+    With `login`, each of `users` virtual users (default: `concurrency`)
+    gets its own cookie jar over the shared connection pool and is logged
+    in before the clock starts; RuntimeError if any login fails.
+    """
+    urls = list(urls)
+
+    async def runner() -> List[Dict[str, Any]]:
+        async with make_session(concurrency, timeout) as session:
+            sessions = None
+            if login:
+                sessions = [
+                    aiohttp.ClientSession(connector=session.connector, connector_owner=False,
+                                          cookie_jar=aiohttp.CookieJar(unsafe=True), timeout=session.timeout)
+                    for _ in range(users or concurrency)
+                ]
+            try:
+                if sessions:
+                    failed = (await asyncio.gather(*(login(s) for s in sessions))).count(False)
+                    if failed:
+                        raise RuntimeError(f"{failed} of {len(sessions)} virtual users could not log in")
+                if rate:
+                    return await open_loop(
+                        session, urls, rate, duration or 10.0,
+                        max_in_flight=concurrency, poisson=poisson, sessions=sessions,
+                    )
+                return await closed_loop(session, urls, concurrency, duration, requests_per_user, sessions=sessions)
+            finally:
+                for s in sessions or []:
+                    await s.close()
+
+    return asyncio.run(runner())
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: Optional[float] = None, key: str = "url") -> Dict[str, Dict[str, Any]]:
+    """Group results by `key` and compute throughput, percentiles and error rate.
+
+    `elapsed` is the wall-clock run time used for throughput (rps); when
+    omitted, rps is left out of the summary.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for r in results:
+        groups[str(r.get(key))].append(r)
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for name, items in groups.items():
+        ok = [r["ms"] for r in items if not is_error(r) and r.get("status") != "DROP"]
+        errors = sum(1 for r in items if is_error(r))
+        stats: Dict[str, Any] = {
+            "count": len(items),
+            "errors": errors,
+            "error_rate": round(errors / len(items), 4) if items else 0.0,
+            "bytes": sum(int(r.get("bytes") or 0) for r in items),
+            "mean_ms": round(sum(ok) / len(ok), 2) if ok else 0.0,
+            "max_ms": round(max(ok), 2) if ok else 0.0,
+        }
+        for p in PERCENTILES:
+            stats[f"p{p:g}_ms"] = round(percentile(ok, p), 2)
+        if elapsed:
+            stats["rps"] = round(len(items) / elapsed, 2)
+        summary[name] = stats
+    return summary
+
+
+def print_summary(summary: Dict[str, Dict[str, Any]], title: str = "Load test results") -> None:
+    """Print one line per route, slowest p99 first."""
+    print(f"{title}:")
+    print(f"{'rps':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'p99.9':>9} {'err%':>6} {'n':>7}  url")
+    rows = sorted(summary.items(), key=lambda kv: kv[1]["p99_ms"], reverse=True)
+    for name, s in rows:
+        print(
+            f"{s.get('rps', 0.0):9.1f} {s['p50_ms']:9.2f} {s['p90_ms']:9.2f} {s['p99_ms']:9.2f} "
+            f"{s['p99.9_ms']:9.2f} {s['error_rate'] * 100:6.2f} {s['count']:7d}  {name}"
+        )
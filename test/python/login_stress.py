@@ -0,0 +1,251 @@
+"""Credential-stuffing simulation against login throttling.
+
+AuthController keeps every failed login in public/login_attempts.dat, a
+PHP-serialized array. Each AuthController request unserializes the whole
+file, and each failed attempt serializes it back with file_put_contents()
+without a lock. Entries are only dropped when the same IP later logs in
+successfully, so the file grows with every attacker attempt.
+
+This drives Poisson-timed login attempts (GET /auth/login for the CSRF
+token, then POST /auth/processLogin with random credentials) from
+`--ips` simulated clients, while legitimate users (`--users`, a
+phone,password CSV) keep logging in from their own addresses. Clients
+get distinct REMOTE_ADDRs by binding to different 127.x.y.z source
+addresses, so the server has to run on loopback for the per-IP limits to
+apply (use --no-bind otherwise).
+
+Phases: `--baseline` seconds of legitimate traffic only, then
+`--duration` seconds with the attack running. The report covers:
+
+- legitimate login latency before vs. during the attack
+- attack outcome counts (invalid credentials, rate limited, errors)
+- size and entry count of the attempts file, sampled every second
+- torn reads: samples whose serialized header disagrees with the body
+- lost updates: "Invalid credentials" responses, each of which appended
+  one record, minus the growth of the entry count
+
+Usage:
+    python test/python/login_stress.py --rate 200 --ips 500 --duration 60
+    python test/python/login_stress.py --users customers.csv --rate 1000 --ips 5000 --max-in-flight 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+import loadgen
+from checkout_funnel import CSRF_RE, load_customers
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+ATTEMPTS_FILE = os.path.join(REPO_ROOT, "public", "login_attempts.dat")
+
+SERIALIZED_HEADER_RE = re.compile(rb"^a:(\d+):\{")
+ENTRY_MARK = b's:2:"ip";'
+OUTCOMES = (
+    ("invalid", "Invalid credentials"),
+    ("rate_limited", "Too many login attempts"),
+    ("lock_busy", "Another login session is in progress"),
+)
+
+
+def read_attempts(path: str) -> Dict[str, Any]:
+    """Size, declared and actual entry count of the serialized attempts file."""
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+    except OSError:
+        return {"bytes": 0, "declared": 0, "entries": 0, "torn": False}
+    match = SERIALIZED_HEADER_RE.match(data)
+    entries = data.count(ENTRY_MARK)
+    declared = int(match.group(1)) if match else -1
+    torn = bool(data) and (not match or not data.rstrip().endswith(b"}") or declared != entries)
+    return {"bytes": len(data), "declared": declared, "entries": entries, "torn": torn}
+
+
+def address(n: int, prefix: int) -> str:
+    return f"127.{prefix}.{(n >> 8) & 255}.{(n & 255) or 1}"
+
+
+class Client:
+    """One simulated source address with its own connection pool and cookies."""
+
+    def __init__(self, ip: Optional[str], timeout: float):
+        connector = aiohttp.TCPConnector(limit=8, local_addr=(ip, 0) if ip else None)
+        self.session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.CookieJar(unsafe=True),
+                                             timeout=aiohttp.ClientTimeout(total=timeout))
+
+    async def login(self, base: str, phone: str, password: str, label: str,
+                    started: Optional[float] = None) -> Dict[str, Any]:
+        page = await loadgen.fetch(self.session, base + "/auth/login", want_body=True, started=started,
+                                   label=f"{label}_page")
+        match = CSRF_RE.search(page.pop("body", None) or "")
+        res = await loadgen.fetch(self.session, base + "/auth/processLogin", "POST", want_body=True,
+                                  label=label, data={"phone": phone, "password": password,
+                                                     "_csrf_token": match.group(1) if match else ""})
+        body = res.pop("body", None) or ""
+        res["outcome"] = next((name for name, text in OUTCOMES if text in body), "other")
+        res["page_ms"] = page["ms"]
+        return res
+
+    def reset(self) -> None:
+        """Forget the PHP session, as a browser that logged out would."""
+        self.session.cookie_jar.clear()
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+async def legit_loop(base: str, users: List[Tuple[str, str]], clients: List[Client], stop: asyncio.Event,
+                     interval: float, phase: Dict[str, str], results: List[Dict[str, Any]]) -> None:
+    i = 0
+    while not stop.is_set():
+        phone, password = users[i % len(users)]
+        client = clients[i % len(clients)]
+        # A client reused after a successful login would be redirected away
+        # from /auth/login, so every legitimate login starts logged out
+        client.reset()
+        res = await client.login(base, phone, password, "legit")
+        res["phase"] = phase["name"]
+        results.append(res)
+        i += 1
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def sample_file(path: str, stop: asyncio.Event, samples: List[Dict[str, Any]]) -> None:
+    start = time.perf_counter()
+    while not stop.is_set():
+        samples.append(dict(read_attempts(path), t=time.perf_counter() - start))
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args) -> Dict[str, Any]:
+    base = args.base_url.rstrip("/")
+    users = load_customers(args.users)
+    attackers = [Client(None if args.no_bind else address(i, 10), args.timeout) for i in range(args.ips)]
+    legit_clients = [Client(None if args.no_bind else address(i, 200), args.timeout)
+                     for i in range(max(1, min(len(users), 50)))] if users else []
+
+    stop = asyncio.Event()
+    phase = {"name": "baseline"}
+    legit: List[Dict[str, Any]] = []
+    samples: List[Dict[str, Any]] = []
+    attack: List[Dict[str, Any]] = []
+    background = [asyncio.ensure_future(sample_file(args.attempts_file, stop, samples))]
+    if users:
+        background.append(asyncio.ensure_future(
+            legit_loop(base, users, legit_clients, stop, args.legit_interval, phase, legit)))
+    initial = read_attempts(args.attempts_file)
+
+    try:
+        if users and args.baseline > 0:
+            print(f"Baseline: legitimate logins only for {args.baseline:.0f}s...")
+            await asyncio.sleep(args.baseline)
+        phase["name"] = "attack"
+        print(f"Attack: {args.rate:.0f} attempts/s from {args.ips} addresses for {args.duration:.0f}s...")
+
+        in_flight = 0
+        tasks = set()
+
+        async def attempt(client: Client, scheduled: float) -> None:
+            nonlocal in_flight
+            try:
+                phone = f"98{random.randint(0, 99999999):08d}"
+                attack.append(await client.login(base, phone, f"guess{random.randint(0, 1 << 30)}", "attack",
+                                                 started=scheduled))
+            finally:
+                in_flight -= 1
+
+        start = time.perf_counter()
+        next_at = start
+        while next_at - start < args.duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if in_flight >= args.max_in_flight:
+                attack.append({"url": "attack", "status": "DROP", "ms": 0.0, "bytes": 0, "outcome": "dropped"})
+            else:
+                in_flight += 1
+                task = asyncio.ensure_future(attempt(random.choice(attackers), next_at))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            next_at += random.expovariate(args.rate)
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        await asyncio.gather(*background)
+        for c in attackers + legit_clients:
+            await c.close()
+
+    return {"initial": initial, "final": read_attempts(args.attempts_file), "samples": samples,
+            "attack": attack, "legit": legit, "elapsed": elapsed}
+
+
+def report(out: Dict[str, Any]) -> None:
+    attack, legit = out["attack"], out["legit"]
+    outcomes = Counter(r.get("outcome", "other") for r in attack)
+    print(f"\nAttack attempts: {len(attack)} -> " + ", ".join(f"{k}={v}" for k, v in outcomes.most_common()))
+    loadgen.print_summary(loadgen.summarize(attack, out["elapsed"]), "Attacker login POST latency (ms)")
+
+    if legit:
+        print(f"\n{'legit login':12} {'n':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'page p50':>9}  outcomes")
+        for name in ("baseline", "attack"):
+            rows = [r for r in legit if r["phase"] == name]
+            if rows:
+                ms = [r["ms"] for r in rows]
+                page = [r["page_ms"] for r in rows]
+                oc = Counter(r["outcome"] for r in rows)
+                print(f"{name:12} {len(rows):6d} {loadgen.percentile(ms, 50):9.1f} {loadgen.percentile(ms, 90):9.1f} "
+                      f"{loadgen.percentile(ms, 99):9.1f} {loadgen.percentile(page, 50):9.1f}  "
+                      + ", ".join(f"{k}={v}" for k, v in oc.items()))
+
+    initial, final, samples = out["initial"], out["final"], out["samples"]
+    print(f"\nAttempts file: {initial['bytes']:,} -> {final['bytes']:,} bytes, "
+          f"{initial['entries']:,} -> {final['entries']:,} entries")
+    if len(samples) > 1:
+        span = samples[-1]["t"] - samples[0]["t"]
+        growth = (samples[-1]["bytes"] - samples[0]["bytes"]) / span if span else 0.0
+        print(f"  growth {growth / 1024:.1f} KiB/s, {final['bytes'] / max(final['entries'], 1):.0f} bytes/entry")
+    torn = sum(1 for s in samples if s["torn"])
+    print(f"  torn samples: {torn} of {len(samples)}")
+    appended = outcomes.get("invalid", 0)
+    lost = appended - (final["entries"] - initial["entries"])
+    print(f"  lost updates: {lost} of {appended} recorded failures ({100.0 * lost / max(appended, 1):.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Login throttling stress test")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--rate", type=float, default=100.0, help="attack attempts per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="attack phase length (s)")
+    parser.add_argument("--baseline", type=float, default=10.0, help="legit-only phase length (s)")
+    parser.add_argument("--ips", type=int, default=256, help="simulated attacker addresses")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--users", default=None, help="phone,password CSV of legitimate users")
+    parser.add_argument("--legit-interval", type=float, default=0.5, help="pause between legit logins (s)")
+    parser.add_argument("--attempts-file", default=ATTEMPTS_FILE)
+    parser.add_argument("--no-bind", action="store_true", help="don't bind 127.x.y.z source addresses")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    report(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Collect real remote traffic from the ngrok agent into a replay corpus.
+
+Polls the local ngrok agent's captured-request endpoint
+(`/api/requests/http`, newest first, at most `limit` entries), keeps only
+requests it has not seen before and appends them in the traffic.py JSONL
+format (ts, method, path, headers, body, body_size, session, status,
+duration_ms, response_size). Request bodies are decoded from the agent's
+raw capture; a body the agent truncated is not stored and the record is
+marked `"replayable": false`, which `traffic.py replay` skips. Seen
+request ids are checkpointed in a state file so restarts do not duplicate
+entries. A poll that shares no request with the ones already collected
+prints a warning, since the agent's buffer may have rolled past requests
+that were never read. Output rolls over to a new numbered segment once
+the current one passes `--max-bytes`; `traffic.py replay --file <dir>`
+replays all segments in order.
+
+`stub` serves a fake agent API (tunnels plus a stream of synthetic
+captured requests) so the collector can be exercised offline.
+
+Usage:
+    python test/python/ngrok_collector.py collect --interval 5
+    python test/python/ngrok_collector.py stub --port 4041 &
+    python test/python/ngrok_collector.py collect --api http://localhost:4041/api --once
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+import traffic
+
+
+NGROK_API = "http://localhost:4040/api"
+CORPUS_DIR = os.path.join(traffic.TRAFFIC_DIR, "ngrok")
+MAX_SEEN = 10000  # ids remembered for de-duplication
+
+
+def parse_start(value: str) -> float:
+    """ngrok timestamps are RFC 3339 with nanoseconds; keep microseconds."""
+    value = value.rstrip("Z")
+    if "." in value:
+        head, frac = value.split(".", 1)
+        value = f"{head}.{frac[:6]}"
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def raw_body(raw_b64: Optional[str]) -> Tuple[bytes, bool]:
+    """Body of a base64 raw HTTP message and whether the capture holds all of it.
+
+    Chunked bodies are de-chunked. The agent truncates large captures, so a
+    body shorter than its Content-Length (or without the final chunk) is
+    reported incomplete.
+    """
+    if not raw_b64:
+        return b"", True
+    raw = base64.b64decode(raw_b64)
+    head, sep, body = raw.partition(b"\r\n\r\n")
+    if not sep:
+        return b"", True
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get(b"transfer-encoding", b"").lower() == b"chunked":
+        out = bytearray()
+        while True:
+            size_line, sep, body = body.partition(b"\r\n")
+            try:
+                size = int(size_line.split(b";")[0], 16)
+            except ValueError:
+                return bytes(out), False
+            if size == 0:
+                return bytes(out), True
+            if not sep or len(body) < size:
+                return bytes(out + body[:size]), False
+            out += body[:size]
+            body = body[size + 2:]
+    try:
+        expected = int(headers[b"content-length"])
+    except (KeyError, ValueError):
+        expected = len(body)
+    return body[:expected], len(body) >= expected
+
+
+def raw_body_size(raw_b64: Optional[str]) -> int:
+    """Body length of a base64 raw HTTP message."""
+    return len(raw_body(raw_b64)[0])
+
+
+def normalize(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert one agent API capture into a traffic.py corpus record."""
+    req = entry.get("request") or {}
+    resp = entry.get("response") or {}
+    headers = {k: v[0] if isinstance(v, list) and v else v for k, v in (req.get("headers") or {}).items()}
+    body, complete = raw_body(req.get("raw"))
+    record = {
+        "ts": round(parse_start(entry["start"]), 6),
+        "method": req.get("method", "GET"),
+        "path": req.get("uri") or entry.get("uri", "/"),
+        "headers": {k: v for k, v in headers.items() if k.lower() not in traffic.SKIP_HEADERS},
+        **traffic.encode_body(body if complete else b""),
+        "body_size": len(body),
+        "session": traffic.session_of(headers.get("Cookie", "")),
+        "status": resp.get("status_code"),
+        "duration_ms": round((entry.get("duration") or 0) / 1e6, 3),
+        "response_size": raw_body_size(resp.get("raw")),
+        "remote_addr": entry.get("remote_addr"),
+        "source": "ngrok",
+    }
+    if not complete:
+        # Truncated by the agent: replaying a partial body would send a different request
+        record["replayable"] = False
+    return record
+
+
+class RollingWriter:
+    """Append JSON lines to numbered segments, starting a new one past max_bytes."""
+
+    def __init__(self, directory: str, max_bytes: int, prefix: str = "requests"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(f for f in os.listdir(directory) if f.startswith(prefix) and f.endswith(".jsonl"))
+        self.index = int(existing[-1][len(prefix) + 1:-len(".jsonl")]) if existing else 1
+        self.fh = open(self.path(), "a", encoding="utf-8")
+
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{self.prefix}-{self.index:05d}.jsonl")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self.fh.tell() >= self.max_bytes:
+            self.fh.close()
+            self.index += 1
+            self.fh = open(self.path(), "a", encoding="utf-8")
+        self.fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+class Collector:
+    def __init__(self, api: str, writer: RollingWriter, state_path: str, tunnel: Optional[str] = None):
+        self.api = api.rstrip("/")
+        self.writer = writer
+        self.state_path = state_path
+        self.tunnel = tunnel
+        self.session = requests.Session()
+        self.seen: "OrderedDict[str, None]" = OrderedDict()
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as fh:
+                self.seen.update((i, None) for i in json.load(fh).get("seen", []))
+
+    def poll(self, limit: int = 100) -> int:
+        """Fetch the agent's buffer once; returns the number of new records written."""
+        params: Dict[str, Any] = {"limit": limit}
+        if self.tunnel:
+            params["tunnel_name"] = self.tunnel
+        resp = self.session.get(f"{self.api}/requests/http", params=params, timeout=10)
+        resp.raise_for_status()
+        entries = resp.json().get("requests", [])
+        if entries and self.seen and not any(e.get("id") in self.seen for e in entries):
+            # No overlap with what we already have: the agent's buffer rolled
+            # past the previous poll, so requests in between may be lost.
+            print(f"Warning: none of the {len(entries)} captured requests was seen before; "
+                  f"traffic since the last poll may be missing (lower --interval)")
+        fresh = [e for e in entries if e.get("id") not in self.seen]
+        # The agent returns newest first; write oldest first so segments stay ordered.
+        fresh.sort(key=lambda e: e.get("start", ""))
+        written = 0
+        for entry in fresh:
+            if not entry.get("response"):
+                continue  # still in flight; pick it up on the next poll
+            self.writer.write(normalize(entry))
+            written += 1
+            self.seen[entry["id"]] = None
+            while len(self.seen) > MAX_SEEN:
+                self.seen.popitem(last=False)
+        self.writer.flush()
+        self.save_state()
+        return written
+
+    def save_state(self) -> None:
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"seen": list(self.seen)}, fh)
+        os.replace(tmp, self.state_path)
+
+
+# ------------------------------------------------------------------- stub
+
+
+def make_stub_server(port: int, rate: float = 5.0, buffer: int = 50) -> ThreadingHTTPServer:
+    """Fake ngrok agent API producing `rate` synthetic requests per second."""
+    paths = ["/", "/products", "/cart", "/products/category/Supplements", "/checkout", "/cart/add"]
+    captured: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    counter = [0]
+
+    def generate() -> None:
+        while True:
+            time.sleep(1.0 / rate)
+            counter[0] += 1
+            method = "POST" if counter[0] % 7 == 0 else "GET"
+            path = "/cart/add" if method == "POST" else random.choice(paths[:-1])
+            body = b"product_id=3&quantity=1" if method == "POST" else b""
+            form = "Content-Type: application/x-www-form-urlencoded\r\n" if body else ""
+            raw_req = (f"{method} {path} HTTP/1.1\r\nHost: example.ngrok.app\r\n{form}"
+                       f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+            raw_resp = b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n" + b"x" * random.randint(500, 50000)
+            entry = {
+                "id": f"airt_{counter[0]:08d}",
+                "uri": f"/api/requests/http/airt_{counter[0]:08d}",
+                "tunnel_name": "command_line",
+                "remote_addr": f"203.0.113.{counter[0] % 250}",
+                "start": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                "duration": random.randint(5, 800) * 1_000_000,
+                "request": {"method": method, "proto": "HTTP/1.1", "uri": path,
+                            "headers": dict({"User-Agent": ["stub"], "Cookie": [f"PHPSESSID=s{counter[0] % 20}"]},
+                                            **({"Content-Type": ["application/x-www-form-urlencoded"]}
+                                               if body else {})),
+                            "raw": base64.b64encode(raw_req).decode()},
+                "response": {"status": "200 OK", "status_code": 200, "headers": {},
+                             "raw": base64.b64encode(raw_resp).decode()},
+            }
+            with lock:
+                captured.insert(0, entry)
+                del captured[buffer:]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/api/tunnels":
+                payload = {"tunnels": [{"name": "command_line", "proto": "https",
+                                        "public_url": "https://example.ngrok.app"}]}
+            elif url.path == "/api/requests/http":
+                limit = int(parse_qs(url.query).get("limit", ["50"])[0])
+                with lock:
+                    payload = {"uri": "/api/requests/http", "requests": captured[:limit]}
+            else:
+                self.send_error(404)
+                return
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    threading.Thread(target=generate, daemon=True).start()
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ngrok agent traffic collector")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    col = sub.add_parser("collect", help="poll the agent API into a rolling corpus")
+    col.add_argument("--api", default=NGROK_API)
+    col.add_argument("--dir", default=CORPUS_DIR)
+    col.add_argument("--max-bytes", type=int, default=64 * 1024 * 1024, help="roll segments over at this size")
+    col.add_argument("--interval", type=float, default=5.0)
+    col.add_argument("--tunnel", default=None, help="only this tunnel name")
+    col.add_argument("--once", action="store_true")
+
+    stub = sub.add_parser("stub", help="serve a fake agent API for offline runs")
+    stub.add_argument("--port", type=int, default=4041)
+    stub.add_argument("--rate", type=float, default=5.0, help="synthetic requests per second")
+    args = parser.parse_args()
+
+    if args.command == "stub":
+        print(f"Stub ngrok agent API on http://127.0.0.1:{args.port}/api")
+        make_stub_server(args.port, args.rate).serve_forever()
+        return
+
+    writer = RollingWriter(args.dir, args.max_bytes)
+    collector = Collector(args.api, writer, os.path.join(args.dir, "state.json"), args.tunnel)
+    print(f"Collecting from {args.api} into {args.dir}")
+    try:
+        while True:
+            try:
+                added = collector.poll()
+                if added:
+                    print(f"+{added} requests -> {writer.path()}")
+            except requests.RequestException as exc:
+                print(f"Agent API unavailable: {exc}")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
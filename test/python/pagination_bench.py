@@ -0,0 +1,249 @@
+"""Deep-scroll benchmark: OFFSET paging vs. keyset cursors.
+
+The storefront listings page through ProductController:
+
+    filter    GET /products/filter?categories[]=X&sort=S  (AJAX, HTML cards)
+    infinite  GET /api/products/infinite                  (JSON, home feed)
+
+With `page=N` both use LIMIT 12 OFFSET 12*(N-1), so MySQL reads and
+discards every earlier row and page N costs more than page N-1. With
+`cursor=` (empty for the first page, then the `nextCursor` of the
+previous response) they seek past the last row seen instead.
+
+The infinite feed ranks products with a multi-join scoring query in page
+mode, but cursor mode can only walk the newest-first order. For
+`--endpoint infinite` three walks are therefore run, so that offset and
+cursor paging are compared on the same query:
+
+    ranked  page=N             (the feed as served today)
+    offset  page=N&sort=newest (same query as cursor, OFFSET paging)
+    cursor  cursor=...         (newest-first, keyset paging)
+
+For each category (`--categories`, or every active category from MySQL
+with `--db`) this scrolls `--pages` pages deep in both modes, `--rounds`
+times, and reports the median latency per page. The output covers:
+
+- latency at pages 1, 10, 50, 100 and 200 for each mode
+- growth, as a least-squares slope in ms per 100 pages
+- rows seen twice, a sign of an unstable sort order between pages
+- with `--png`, a latency-per-page chart (needs matplotlib)
+
+Usage:
+    python test/python/pagination_bench.py --categories Protein,Vitamins --pages 200
+    python test/python/pagination_bench.py --db --sort price-low --rounds 5 --png pagination.png
+    python test/python/pagination_bench.py --endpoint infinite --pages 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+from typing import Any, Dict, List, Optional, Set
+
+import aiohttp
+
+import loadgen
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except Exception:
+    plt = None
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
+AJAX_HEADERS = {"X-Requested-With": "XMLHttpRequest"}
+PRODUCT_ID_RE = re.compile(r'data-product-id="(\d+)"')
+CATEGORY_SQL = ("SELECT category, COUNT(*) FROM products WHERE status = 'active' "
+                "AND category IS NOT NULL AND category != '' GROUP BY category ORDER BY COUNT(*) DESC")
+MARK_PAGES = (1, 10, 50, 100, 200)
+ALL = "(all)"
+
+
+def load_categories(args) -> List[str]:
+    if args.categories:
+        return [c.strip() for c in args.categories.split(",") if c.strip()]
+    if not args.db:
+        return [ALL]
+    if mysql is None:
+        raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+    conn = mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database)
+    try:
+        cur = conn.cursor()
+        cur.execute(CATEGORY_SQL)
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+    for name, count in rows:
+        print(f"  {name}: {count:,} products")
+    return [name for name, _ in rows[:args.max_categories]]
+
+
+def slope(points: List[float]) -> float:
+    """Least-squares slope of latency against page number, in ms per page."""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = (n + 1) / 2.0
+    mean_y = sum(points) / n
+    num = sum((i + 1 - mean_x) * (y - mean_y) for i, y in enumerate(points))
+    den = sum((i + 1 - mean_x) ** 2 for i in range(n))
+    return num / den
+
+
+class Scroller:
+    def __init__(self, args, session: aiohttp.ClientSession):
+        self.args = args
+        self.session = session
+        self.base = args.base_url.rstrip("/")
+
+    def modes(self) -> List[str]:
+        return ["ranked", "offset", "cursor"] if self.args.endpoint == "infinite" else ["offset", "cursor"]
+
+    def params(self, category: str, mode: str, page: int, cursor: Optional[str]) -> Dict[str, str]:
+        params = {}
+        if self.args.endpoint == "filter":
+            params["sort"] = self.args.sort
+            if category != ALL:
+                params["categories[]"] = category
+        elif mode == "offset":
+            params["sort"] = "newest"
+        if cursor is None:
+            params["page"] = str(page)
+        else:
+            params["cursor"] = cursor
+        return params
+
+    def ids(self, data: Dict[str, Any]) -> List[int]:
+        if self.args.endpoint == "infinite":
+            return [int(p["id"]) for p in data.get("products") or [] if "id" in p]
+        return sorted({int(i) for i in PRODUCT_ID_RE.findall(data.get("html") or "")})
+
+    async def scroll(self, category: str, mode: str) -> Dict[str, Any]:
+        """Walk up to --pages pages; returns per-page latencies and ids seen."""
+        path = "/products/filter" if self.args.endpoint == "filter" else "/api/products/infinite"
+        cursor: Optional[str] = "" if mode == "cursor" else None
+        latencies: List[float] = []
+        seen: Set[int] = set()
+        repeats = errors = 0
+        for page in range(1, self.args.pages + 1):
+            res = await loadgen.fetch(self.session, self.base + path, want_body=True, label=mode,
+                                      params=self.params(category, mode, page, cursor), headers=AJAX_HEADERS)
+            if loadgen.is_error(res):
+                errors += 1
+                break
+            latencies.append(res["ms"])
+            try:
+                data = json.loads(res.get("body") or "")
+            except ValueError:
+                errors += 1
+                break
+            ids = self.ids(data)
+            repeats += sum(1 for i in ids if i in seen)
+            seen.update(ids)
+            if mode == "cursor":
+                cursor = data.get("nextCursor")
+                if not cursor:
+                    break
+            elif data.get("hasMore") is False or not data.get("count", len(ids)):
+                break
+        return {"ms": latencies, "seen": len(seen), "repeats": repeats, "errors": errors}
+
+
+async def run(args) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    categories = load_categories(args)
+    connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=30)
+    out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=args.timeout)) as session:
+        scroller = Scroller(args, session)
+        for category in categories:
+            out[category] = {}
+            for mode in scroller.modes():
+                walks = [await scroller.scroll(category, mode) for _ in range(args.rounds)]
+                depth = min(len(w["ms"]) for w in walks)
+                out[category][mode] = {
+                    "ms": [statistics.median(w["ms"][p] for w in walks) for p in range(depth)],
+                    "seen": walks[-1]["seen"],
+                    "repeats": walks[-1]["repeats"],
+                    "errors": sum(w["errors"] for w in walks),
+                }
+                print(f"  {category} / {mode}: {depth} pages, {walks[-1]['seen']:,} products")
+    return out
+
+
+def report(out: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    marks = "".join(f" {'p' + str(p):>8}" for p in MARK_PAGES)
+    print(f"\n{'category':24} {'mode':>7} {'pages':>6}{marks} {'ms/100pg':>9} {'repeats':>8} {'err':>4}")
+    for category, modes in out.items():
+        for mode, r in modes.items():
+            ms = r["ms"]
+            cells = "".join(f" {ms[p - 1]:8.1f}" if p <= len(ms) else f" {'-':>8}" for p in MARK_PAGES)
+            print(f"{category[:24]:24} {mode:>7} {len(ms):6d}{cells} {slope(ms) * 100:9.1f} "
+                  f"{r['repeats']:8d} {r['errors']:4d}")
+        offset, cursor = modes["offset"]["ms"], modes["cursor"]["ms"]
+        depth = min(len(offset), len(cursor))
+        if depth:
+            print(f"{'':24} {'':>7} last common page {depth}: offset {offset[depth - 1]:.1f} ms, "
+                  f"cursor {cursor[depth - 1]:.1f} ms")
+        if "ranked" in modes:
+            print(f"{'':24} {'':>7} ranked runs a different (scoring) query; compare offset with cursor "
+                  f"for the paging cost")
+
+
+def plot(out: Dict[str, Dict[str, Dict[str, Any]]], path: str) -> None:
+    if plt is None:
+        print("\nmatplotlib not installed; skipping chart.")
+        return
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for i, (category, modes) in enumerate(out.items()):
+        color = f"C{i % 10}"
+        for mode, style in (("ranked", ":"), ("offset", "-"), ("cursor", "--")):
+            if mode not in modes:
+                continue
+            ms = modes[mode]["ms"]
+            ax.plot(range(1, len(ms) + 1), ms, style, color=color, linewidth=1, label=f"{category} ({mode})")
+    ax.set_xlabel("page")
+    ax.set_ylabel("median latency (ms)")
+    ax.set_title("OFFSET (solid) vs. cursor (dashed) paging, ranked feed dotted")
+    ax.legend(fontsize="small", ncol=2)
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    print(f"\nChart written to {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OFFSET vs. keyset pagination benchmark")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--endpoint", choices=("filter", "infinite"), default="filter")
+    parser.add_argument("--categories", default=None, help="comma-separated category names")
+    parser.add_argument("--max-categories", type=int, default=8, help="largest N categories with --db")
+    parser.add_argument("--sort", default="newest", help="filter sort: newest, price-low, price-high, name, popular")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3, help="scrolls per category and mode")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--png", default=None, help="write a latency-per-page chart here (needs matplotlib)")
+    parser.add_argument("--db", action="store_true", help="read the category list from MySQL")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    args = parser.parse_args()
+    if args.endpoint == "infinite":
+        args.categories = ALL
+
+    out = asyncio.run(run(args))
+    report(out)
+    if args.png:
+        plot(out, args.png)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,34 @@
+"""Admin route performance check.
+
+Without arguments, hits each admin route once and prints single-request
+latency. With `--concurrency`, `--duration` or `--requests` (closed loop)
+or `--rate` (open loop), drives all ROUTES concurrently through the async
+engine in `loadgen.py` and reports throughput, p50/p90/p99/p99.9 and
+error rate per route.
+
+Admin routes redirect anonymous requests to /auth/login, so every
+virtual user logs in with its own cookie jar (ADMIN_PHONE /
+ADMIN_PASSWORD, or --phone / --password) before the clock starts. A
+request that still ends up on /auth/login is counted as an error
+(status "LOGIN") instead of as a fast 200.
+
+Usage:
+    python test/python/perf_admin_routes.py
+    python test/python/perf_admin_routes.py --concurrency 200 --duration 30
+    python test/python/perf_admin_routes.py --rate 500 --duration 60 --users 50
+"""
+
+import argparse
+import os
+import re
 import time
+from urllib.parse import urlsplit
+
 import requests
 
 BASE_URL = "http://127.0.0.1:8000"
+LOGIN_PATH = "/auth/login"
+CSRF_RE = re.compile(r'name="_csrf_token"\s+value="([^"]+)"')
 
 ROUTES = [
     "/admin",
@@ -11,21 +38,32 @@ ROUTES = [
     "/admin/coupons",
 ]
 
-def measure_route(url: str, timeout: float = 10.0):
+def measure_route(url: str, timeout: float = 10.0, session=None):
     start = time.perf_counter()
     try:
-        r = requests.get(url, timeout=timeout)
-        status = r.status_code
+        r = (session or requests).get(url, timeout=timeout)
+        status = "LOGIN" if r.history and urlsplit(r.url).path.rstrip("/") == LOGIN_PATH else r.status_code
     except requests.RequestException as e:
         status = "ERR"
     ms = (time.perf_counter() - start) * 1000.0
     return {"url": url, "status": status, "ms": round(ms, 2)}
 
-def main():
+def login_admin(session: requests.Session, phone: str, password: str) -> bool:
+    page = session.get(BASE_URL + LOGIN_PATH, timeout=15)
+    match = CSRF_RE.search(page.text)
+    resp = session.post(BASE_URL + "/auth/processLogin", timeout=15, data={
+        "phone": phone, "password": password, "_csrf_token": match.group(1) if match else ""})
+    # A failed login is redirected back to /auth/login; only an admin lands on /admin
+    return urlsplit(resp.url).path.rstrip("/").endswith("/admin")
+
+def run_sequential(args):
+    session = requests.Session()
+    if args.phone and args.password and not login_admin(session, args.phone, args.password):
+        raise SystemExit("Admin login failed; check ADMIN_PHONE / ADMIN_PASSWORD.")
     results = []
     for route in ROUTES:
         url = BASE_URL + route
-        results.append(measure_route(url))
+        results.append(measure_route(url, args.timeout, session))
 
     results.sort(key=lambda x: x["ms"])  # fastest first
 
@@ -33,5 +71,64 @@ def main():
     for item in results:
         print(f"{item['ms']:8.2f} ms  {item['status']:>3}  {item['url']}")
 
+def run_concurrent(args):
+    import loadgen
+
+    urls = [BASE_URL + route for route in ROUTES]
+    mode = f"open loop @ {args.rate:g} req/s" if args.rate else f"closed loop x{args.concurrency}"
+    print(f"Driving {len(urls)} admin routes ({mode})...")
+
+    async def login(session) -> bool:
+        page = await loadgen.fetch(session, BASE_URL + LOGIN_PATH, want_body=True)
+        match = CSRF_RE.search(page.get("body") or "")
+        res = await loadgen.fetch(session, BASE_URL + "/auth/processLogin", "POST", data={
+            "phone": args.phone, "password": args.password, "_csrf_token": match.group(1) if match else ""})
+        return (res.get("redirected_to") or "").rstrip("/").endswith("/admin")
+
+    start = time.perf_counter()
+    try:
+        results = loadgen.run_load(
+            urls,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            requests_per_user=args.requests,
+            rate=args.rate,
+            timeout=args.timeout,
+            login=login if args.phone and args.password else None,
+            users=args.users if args.rate else None,
+        )
+    except RuntimeError as exc:
+        raise SystemExit(f"Admin login failed: {exc}")
+    elapsed = time.perf_counter() - start
+    for res in results:
+        if (res.get("redirected_to") or "").rstrip("/") == LOGIN_PATH:
+            res["status"] = "LOGIN"
+
+    loadgen.print_summary(loadgen.summarize(results, elapsed), "Admin route load (ms)")
+    print(f"\n{len(results)} requests in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s overall)")
+
+def main():
+    global BASE_URL
+    parser = argparse.ArgumentParser(description="Admin route latency / load test")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=0, help="virtual users (closed loop) or max in-flight (open loop)")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=None, help="requests per virtual user when no duration is given")
+    parser.add_argument("--rate", type=float, default=None, help="open-loop arrival rate in requests/second")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=50, help="logged-in admin sessions shared by open-loop arrivals")
+    parser.add_argument("--phone", default=os.environ.get("ADMIN_PHONE"))
+    parser.add_argument("--password", default=os.environ.get("ADMIN_PASSWORD"))
+    args = parser.parse_args()
+    BASE_URL = args.base_url.rstrip("/")
+
+    if not (args.phone and args.password):
+        print("No admin credentials (ADMIN_PHONE / ADMIN_PASSWORD); every route will count as a LOGIN error.")
+    if args.concurrency or args.rate or args.duration or args.requests:
+        args.concurrency = args.concurrency or (1000 if args.rate else 50)
+        run_concurrent(args)
+    else:
+        run_sequential(args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,276 @@
+"""MySQL query-load profiler.
+
+Reads a MySQL slow query log (recorded with `long_query_time = 0` so
+every statement is captured) or general query log while the Python
+harness scenarios run, normalizes each statement into a fingerprint and
+reports per fingerprint: calls, total/avg/p99 time, rows examined and
+rows sent. Statements are attributed to the request that issued them
+when the app runs with DB_QUERY_TAGS=true, which makes
+App\\Core\\Database tag each connection's first statement with
+`/* nn-request: METHOD /path */`; PHP opens one connection per request,
+so every later statement on that connection id belongs to the same
+request. Fingerprints executed repeatedly within one request are
+reported as N+1 candidates per path.
+
+The general log has no durations, so times there are approximated by the
+gap to the next event on the same connection.
+
+Usage:
+    python test/python/query_profiler.py enable-logging          # needs mysql-connector
+    python test/python/query_profiler.py report /var/lib/mysql/slow.log
+    python test/python/query_profiler.py report general.log --format general --n1-threshold 5
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+
+TAG_RE = re.compile(r"/\* nn-request: (\S+) (\S*) \*/")
+COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+NUMBER_RE = re.compile(r"\b-?\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+VALUES_RE = re.compile(r"\bVALUES\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*", re.I)
+SPACE_RE = re.compile(r"\s+")
+
+GENERAL_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}T[\d:.]+Z?)\s+(\d+)\s+(\w[\w ]*?)\t(.*)$")
+SLOW_TIME_RE = re.compile(r"^# Time: (\S+)")
+SLOW_ID_RE = re.compile(r"^# User@Host: .*Id:\s*(\d+)")
+SLOW_STATS_RE = re.compile(r"^# Query_time: ([\d.]+)\s+Lock_time: ([\d.]+)\s+Rows_sent: (\d+)\s+Rows_examined: (\d+)")
+
+SKIP_PREFIXES = ("set timestamp", "use ", "set names", "administrator command")
+
+
+def fingerprint(sql: str) -> str:
+    """Reduce a statement to its shape: no literals, lists collapsed."""
+    fp = COMMENT_RE.sub(" ", sql)
+    fp = STRING_RE.sub("?", fp)
+    fp = NUMBER_RE.sub("?", fp)
+    fp = SPACE_RE.sub(" ", fp).strip().rstrip(";")
+    fp = IN_LIST_RE.sub("IN (?+)", fp)
+    fp = VALUES_RE.sub(r"VALUES \1+", fp)
+    return fp
+
+
+def parse_ts(ts: str) -> float:
+    return datetime.fromisoformat(ts.rstrip("Z")).timestamp()
+
+
+def iter_slow_log(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one event per statement from a slow query log."""
+    entry: Dict[str, Any] = {}
+    sql_lines: List[str] = []
+
+    def flush() -> Optional[Dict[str, Any]]:
+        sql = " ".join(sql_lines).strip()
+        if entry and sql and not sql.lower().startswith(SKIP_PREFIXES):
+            return dict(entry, sql=sql)
+        return None
+
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            line = line.rstrip("\n")
+            if line.startswith("# Time:"):
+                ev = flush()
+                if ev:
+                    yield ev
+                entry, sql_lines = {"ts": parse_ts(SLOW_TIME_RE.match(line).group(1))}, []
+            elif line.startswith("# User@Host:"):
+                if sql_lines:
+                    ev = flush()
+                    if ev:
+                        yield ev
+                    entry, sql_lines = {"ts": entry.get("ts")}, []
+                m = SLOW_ID_RE.match(line)
+                entry["conn"] = int(m.group(1)) if m else None
+            elif line.startswith("# Query_time:"):
+                m = SLOW_STATS_RE.match(line)
+                if m:
+                    entry.update(ms=float(m.group(1)) * 1000.0, lock_ms=float(m.group(2)) * 1000.0,
+                                 rows_sent=int(m.group(3)), rows_examined=int(m.group(4)))
+            elif line.startswith("#") or line.lower().startswith("set timestamp="):
+                continue
+            elif entry:
+                sql_lines.append(line)
+        ev = flush()
+        if ev:
+            yield ev
+
+
+def iter_general_log(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield Query/Execute events from a general log with approximate durations."""
+    last: Dict[int, Dict[str, Any]] = {}
+    current: Optional[Dict[str, Any]] = None
+
+    def close(ev: Dict[str, Any], next_ts: float) -> Dict[str, Any]:
+        ev["ms"] = max(0.0, (next_ts - ev["ts"]) * 1000.0)
+        return ev
+
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            m = GENERAL_LINE_RE.match(line.rstrip("\n"))
+            if not m:
+                if current is not None:
+                    current["sql"] += " " + line.strip()
+                continue
+            ts, conn, command, arg = parse_ts(m.group(1)), int(m.group(2)), m.group(3).strip(), m.group(4)
+            prev = last.pop(conn, None)
+            if prev is not None:
+                yield close(prev, ts)
+            current = None
+            if command in ("Query", "Execute") and not arg.lower().startswith(SKIP_PREFIXES):
+                current = {"ts": ts, "conn": conn, "sql": arg}
+                last[conn] = current
+        for ev in last.values():
+            yield close(ev, ev["ts"])
+
+
+def profile(events: Iterator[Dict[str, Any]], n1_threshold: int = 5) -> Dict[str, Any]:
+    """Aggregate events by fingerprint and by tagged request path."""
+    by_fp: Dict[str, Dict[str, Any]] = {}
+    conn_path: Dict[int, str] = {}
+    per_request: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    per_path: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"requests": set(), "queries": 0, "ms": 0.0})
+
+    for ev in events:
+        tag = TAG_RE.search(ev["sql"])
+        conn = ev.get("conn")
+        if tag:
+            conn_path[conn] = f"{tag.group(1)} {tag.group(2)}"
+            continue
+        fp = fingerprint(ev["sql"])
+        s = by_fp.setdefault(fp, {"fingerprint": fp, "calls": 0, "times": [], "rows_examined": 0,
+                                  "rows_sent": 0, "paths": defaultdict(int), "example": ev["sql"][:300]})
+        s["calls"] += 1
+        s["times"].append(ev.get("ms") or 0.0)
+        s["rows_examined"] += ev.get("rows_examined") or 0
+        s["rows_sent"] += ev.get("rows_sent") or 0
+        path = conn_path.get(conn, "(untagged)")
+        s["paths"][path] += 1
+        per_request[conn][fp] += 1
+        pp = per_path[path]
+        pp["requests"].add(conn)
+        pp["queries"] += 1
+        pp["ms"] += ev.get("ms") or 0.0
+
+    fingerprints = []
+    for s in by_fp.values():
+        times = s.pop("times")
+        s.update(
+            total_ms=round(sum(times), 3),
+            avg_ms=round(sum(times) / len(times), 3),
+            p99_ms=round(statistics.quantiles(times, n=100, method="inclusive")[98] if len(times) > 1 else times[0], 3),
+            paths=dict(s["paths"]),
+        )
+        fingerprints.append(s)
+    fingerprints.sort(key=lambda s: s["total_ms"], reverse=True)
+
+    n_plus_one: Dict[tuple, Dict[str, Any]] = {}
+    for conn, counts in per_request.items():
+        path = conn_path.get(conn, "(untagged)")
+        for fp, calls in counts.items():
+            if calls >= n1_threshold:
+                key = (path, fp)
+                hit = n_plus_one.setdefault(key, {"path": path, "fingerprint": fp, "requests": 0, "max_calls": 0})
+                hit["requests"] += 1
+                hit["max_calls"] = max(hit["max_calls"], calls)
+
+    paths = []
+    for path, pp in per_path.items():
+        n = len(pp["requests"]) or 1
+        paths.append({"path": path, "requests": len(pp["requests"]), "queries_per_request": round(pp["queries"] / n, 2),
+                      "db_ms_per_request": round(pp["ms"] / n, 3)})
+    paths.sort(key=lambda p: p["db_ms_per_request"] * p["requests"], reverse=True)
+
+    return {
+        "fingerprints": fingerprints,
+        "paths": paths,
+        "n_plus_one": sorted(n_plus_one.values(), key=lambda h: h["max_calls"], reverse=True),
+    }
+
+
+def print_report(report: Dict[str, Any], top: int = 20) -> None:
+    print(f"{'calls':>8} {'total ms':>10} {'avg ms':>8} {'p99 ms':>8} {'rows exam':>10}  fingerprint")
+    for s in report["fingerprints"][:top]:
+        print(f"{s['calls']:8d} {s['total_ms']:10.1f} {s['avg_ms']:8.3f} {s['p99_ms']:8.3f} "
+              f"{s['rows_examined']:10d}  {s['fingerprint'][:110]}")
+
+    if report["paths"]:
+        print(f"\n{'requests':>8} {'q/req':>7} {'db ms/req':>10}  path")
+        for p in report["paths"][:top]:
+            print(f"{p['requests']:8d} {p['queries_per_request']:7.1f} {p['db_ms_per_request']:10.2f}  {p['path']}")
+
+    if report["n_plus_one"]:
+        print("\nN+1 candidates (same statement repeated within one request):")
+        for h in report["n_plus_one"][:top]:
+            print(f"  up to {h['max_calls']:4d}x in {h['requests']} request(s) of {h['path']}: {h['fingerprint'][:90]}")
+
+
+def enable_logging(args) -> None:
+    """Turn on full statement logging on a local MySQL."""
+    if mysql is None:
+        raise SystemExit("mysql-connector not installed; run the SET GLOBAL statements manually.")
+    conn = mysql.connect(host=args.host, user=args.user, password=args.password)
+    cur = conn.cursor()
+    for stmt in (
+        "SET GLOBAL slow_query_log = 1",
+        "SET GLOBAL long_query_time = 0",
+        "SET GLOBAL log_slow_extra = 1" if args.extra else None,
+        "SET GLOBAL general_log = 1" if args.general else None,
+    ):
+        if stmt:
+            cur.execute(stmt)
+    cur.execute("SELECT @@slow_query_log_file, @@general_log_file")
+    slow, general = cur.fetchone()
+    cur.close()
+    conn.close()
+    print(f"Slow log: {slow}")
+    if args.general:
+        print(f"General log: {general}")
+    print("Start the app with DB_QUERY_TAGS=true to attribute statements to request paths.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MySQL query-load profiler")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    en = sub.add_parser("enable-logging", help="enable statement logging on a local MySQL")
+    en.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    en.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    en.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    en.add_argument("--general", action="store_true", help="also enable the general log")
+    en.add_argument("--extra", action="store_true", help="log_slow_extra (MySQL 8.0.14+)")
+
+    rp = sub.add_parser("report", help="digest a slow or general log")
+    rp.add_argument("log")
+    rp.add_argument("--format", choices=("slow", "general"), default="slow")
+    rp.add_argument("--n1-threshold", type=int, default=5)
+    rp.add_argument("--top", type=int, default=20)
+    rp.add_argument("--json", default=None)
+    args = parser.parse_args()
+
+    if args.command == "enable-logging":
+        enable_logging(args)
+        return
+
+    events = iter_slow_log(args.log) if args.format == "slow" else iter_general_log(args.log)
+    report = profile(events, args.n1_threshold)
+    print_report(report, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Route table analyzer and dispatch benchmark for App/Core/Router.php.
+
+Extracts every `$this->router->get/post/...` registration from
+App/Core/App.php and models `Router::resolve()` exactly: an exact-match
+lookup, then a linear scan over the method's routes in registration
+order where every parameterized route costs one `convertRouteToRegex`
+(a `preg_replace`) plus one `preg_match` until the first hit.
+
+For each URL it reports how many routes were scanned and how many
+preg_replace/preg_match calls resolution cost, then summarizes the table
+(static vs parameterized routes, duplicates, routes shadowed by an
+earlier pattern, candidates per first path segment for a trie or
+compiled dispatcher). With `--php` the same URLs are timed through the
+real Router class in a PHP CLI stand-in.
+
+URLs default to the routes' own static paths plus every sitemap URL;
+`--corpus` adds paths from a traffic.py capture.
+
+Usage:
+    python test/python/route_analyzer.py
+    python test/python/route_analyzer.py --php --iterations 2000 --json router_report.json
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+APP_PHP = os.path.join(REPO_ROOT, "App", "Core", "App.php")
+ROUTER_PHP = os.path.join(REPO_ROOT, "App", "Core", "Router.php")
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+ROUTE_RE = re.compile(r"\$this->router->(get|post|put|delete|head)\(\s*'([^']*)'\s*,\s*'([^']*)'\s*\)")
+PARAM_RE = re.compile(r"\{([a-zA-Z0-9_]+)\}")
+
+# Router::resolve() for the CLI stand-in: register the extracted table
+# on the real class, then time resolve() per URL.
+PHP_BENCH = r"""<?php
+require $argv[1];
+$router = new App\Core\Router();
+foreach (json_decode(file_get_contents($argv[2]), true) as $r) {
+    $router->{strtolower($r['method'])}($r['uri'], $r['handler']);
+}
+$iterations = (int)$argv[4];
+$_SERVER['SCRIPT_NAME'] = '/index.php';
+$out = [];
+foreach (json_decode(file_get_contents($argv[3]), true) as $u) {
+    $_SERVER['REQUEST_METHOD'] = $u['method'];
+    $_SERVER['REQUEST_URI'] = '/' . $u['path'];
+    $router->resolve();
+    $start = hrtime(true);
+    for ($i = 0; $i < $iterations; $i++) {
+        $router->resolve();
+    }
+    $out[] = ['method' => $u['method'], 'path' => $u['path'], 'ns' => (hrtime(true) - $start) / $iterations];
+}
+echo json_encode($out);
+"""
+
+
+def extract_routes(app_php: str = APP_PHP) -> Dict[str, Dict[str, str]]:
+    """Return {METHOD: {uri: handler}} in PHP array order.
+
+    Re-registering a URI overwrites the handler but keeps the original
+    position, which is also how Python dicts behave.
+    """
+    with open(app_php, encoding="utf-8") as fh:
+        source = fh.read()
+    table: Dict[str, Dict[str, str]] = {m: {} for m in ("GET", "POST", "PUT", "DELETE", "HEAD")}
+    for method, uri, handler in ROUTE_RE.findall(source):
+        table[method.upper()][uri] = handler
+    return table
+
+
+def registrations(app_php: str = APP_PHP) -> List[Tuple[str, str, str]]:
+    with open(app_php, encoding="utf-8") as fh:
+        return [(m.upper(), u, h) for m, u, h in ROUTE_RE.findall(fh.read())]
+
+
+def route_regex(route: str) -> re.Pattern:
+    """Python equivalent of Router::convertRouteToRegex()."""
+    return re.compile("^" + PARAM_RE.sub("([^/]+)", route) + "$")
+
+
+def resolve(table: Dict[str, Dict[str, str]], method: str, path: str,
+            compiled: Dict[str, re.Pattern]) -> Dict[str, Any]:
+    """Model Router::resolve() and count the work it does."""
+    if method == "HEAD":
+        method = "GET"
+    routes = table.get(method, {})
+    cost = {"method": method, "path": path, "handler": None, "route": None,
+            "exact": False, "scanned": 0, "preg_replace": 0, "preg_match": 0}
+    if path in routes:
+        cost.update(handler=routes[path], route=path, exact=True)
+        return cost
+    for route, handler in routes.items():
+        cost["scanned"] += 1
+        if "{" not in route:
+            continue
+        cost["preg_replace"] += 1
+        cost["preg_match"] += 1
+        if compiled[route].match(path):
+            cost.update(handler=handler, route=route)
+            break
+    return cost
+
+
+def analyze_table(table: Dict[str, Dict[str, str]], regs: List[Tuple[str, str, str]],
+                  compiled: Dict[str, re.Pattern]) -> Dict[str, Any]:
+    """Static properties of the route table."""
+    report: Dict[str, Any] = {"methods": {}, "duplicates": [], "shadowed": []}
+    counts = Counter((m, u) for m, u, _ in regs)
+    report["duplicates"] = [{"method": m, "uri": u, "registrations": n} for (m, u), n in counts.items() if n > 1]
+
+    for method, routes in table.items():
+        if not routes:
+            continue
+        params = [r for r in routes if "{" in r]
+        by_segment: Dict[str, int] = defaultdict(int)
+        for r in params:
+            by_segment[r.split("/")[0]] += 1
+        report["methods"][method] = {
+            "routes": len(routes),
+            "static": len(routes) - len(params),
+            "parameterized": len(params),
+            "worst_case_preg_calls": 2 * len(params),
+            "max_candidates_per_first_segment": max(by_segment.values()) if by_segment else 0,
+            "busiest_segments": sorted(by_segment.items(), key=lambda kv: kv[1], reverse=True)[:5],
+        }
+        # A route is shadowed when an earlier pattern already matches a
+        # sample path built from it (params filled with "1").
+        for i, route in enumerate(params):
+            sample = PARAM_RE.sub("1", route)
+            if sample in routes:
+                continue
+            for earlier in params[:i]:
+                if compiled[earlier].match(sample):
+                    report["shadowed"].append({"method": method, "route": route, "by": earlier})
+                    break
+    return report
+
+
+def sample_paths(table: Dict[str, Dict[str, str]], sitemap_dir: str, corpus: Optional[str]) -> List[Tuple[str, str]]:
+    """Representative (method, path) pairs for the benchmark."""
+    paths: List[Tuple[str, str]] = []
+    for method, routes in table.items():
+        for route in routes:
+            paths.append((method, PARAM_RE.sub("1", route).strip("/")))
+    for name in sorted(os.listdir(sitemap_dir)):
+        if name.endswith("sitemap.xml"):
+            for loc in ET.parse(os.path.join(sitemap_dir, name)).iter(f"{SITEMAP_NS}loc"):
+                path = urlsplit((loc.text or "").strip()).path.strip("/")
+                if not path.endswith(".xml"):
+                    paths.append(("GET", path))
+    if corpus:
+        with open(corpus, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    rec = json.loads(line)
+                    paths.append((rec["method"].upper(), urlsplit(rec["path"]).path.strip("/")))
+    seen = set()
+    return [p for p in paths if not (p in seen or seen.add(p))]
+
+
+def bench_php(table: Dict[str, Dict[str, str]], urls: List[Tuple[str, str]], iterations: int,
+              php: str = "php") -> Optional[List[Dict[str, Any]]]:
+    """Time the real Router::resolve() per URL; None when no PHP CLI is available."""
+    if not shutil.which(php):
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        routes_file = os.path.join(tmp, "routes.json")
+        urls_file = os.path.join(tmp, "urls.json")
+        script = os.path.join(tmp, "bench.php")
+        with open(routes_file, "w") as fh:
+            json.dump([{"method": m, "uri": u, "handler": h} for m, r in table.items() for u, h in r.items()], fh)
+        with open(urls_file, "w") as fh:
+            json.dump([{"method": m, "path": p} for m, p in urls], fh)
+        with open(script, "w") as fh:
+            fh.write(PHP_BENCH)
+        out = subprocess.run([php, script, ROUTER_PHP, routes_file, urls_file, str(iterations)],
+                             capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def bench_python(table: Dict[str, Dict[str, str]], urls: List[Tuple[str, str]], iterations: int,
+                 compiled: Dict[str, re.Pattern]) -> List[Dict[str, Any]]:
+    """Pure-Python timing of the same algorithm, for relative comparison only."""
+    out = []
+    for method, path in urls:
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            resolve(table, method, path, compiled)
+        out.append({"method": method, "path": path, "ns": (time.perf_counter_ns() - start) / iterations})
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Router dispatch analyzer")
+    parser.add_argument("--app", default=APP_PHP)
+    parser.add_argument("--sitemaps", default=os.path.join(REPO_ROOT, "App"), help="directory with *sitemap.xml")
+    parser.add_argument("--corpus", default=None, help="traffic.py JSONL capture to add real paths from")
+    parser.add_argument("--php", action="store_true", help="time the real Router through PHP CLI")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", default=None, help="write the full report to this file")
+    args = parser.parse_args()
+
+    table = extract_routes(args.app)
+    regs = registrations(args.app)
+    compiled = {r: route_regex(r) for routes in table.values() for r in routes if "{" in r}
+    info = analyze_table(table, regs, compiled)
+
+    print(f"Route table: {len(regs)} registrations, {sum(len(r) for r in table.values())} unique")
+    for method, m in info["methods"].items():
+        print(f"  {method:6} {m['routes']:4d} routes ({m['static']} static, {m['parameterized']} parameterized), "
+              f"worst case {m['worst_case_preg_calls']} preg calls, max {m['max_candidates_per_first_segment']} "
+              f"patterns behind one first segment")
+    print(f"  {len(info['duplicates'])} URIs registered more than once, {len(info['shadowed'])} routes shadowed")
+    for s in info["shadowed"][:args.top]:
+        print(f"    {s['method']} {s['route']}  <- matched first by {s['by']}")
+
+    urls = sample_paths(table, args.sitemaps, args.corpus)
+    costs = [resolve(table, m, p, compiled) for m, p in urls]
+    unresolved = [c for c in costs if c["handler"] is None]
+    costs.sort(key=lambda c: c["preg_match"], reverse=True)
+    print(f"\nResolution cost over {len(urls)} URLs "
+          f"(mean {sum(c['preg_match'] for c in costs) / max(len(costs), 1):.1f} preg_match, "
+          f"{len(unresolved)} unresolved):")
+    print(f"{'scanned':>8} {'replace':>8} {'match':>6}  url -> route")
+    for c in costs[:args.top]:
+        print(f"{c['scanned']:8d} {c['preg_replace']:8d} {c['preg_match']:6d}  {c['method']} /{c['path']} -> {c['route']}")
+
+    timings = bench_php(table, urls, args.iterations) if args.php else None
+    engine = "PHP Router::resolve()"
+    if timings is None:
+        if args.php:
+            print("\nphp not found on PATH; timing the Python model instead.")
+        timings = bench_python(table, urls, args.iterations, compiled)
+        engine = "Python model of resolve()"
+    timings.sort(key=lambda t: t["ns"], reverse=True)
+    print(f"\nSlowest resolutions ({engine}, {args.iterations} iterations each):")
+    for t in timings[:args.top]:
+        print(f"{t['ns'] / 1000:10.2f} us  {t['method']} /{t['path']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"table": info, "costs": costs, "timings": timings, "engine": engine}, fh, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
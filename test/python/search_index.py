@@ -0,0 +1,717 @@
+"""In-memory inverted index and query service for product search.
+
+ProductController::search and liveSearch run
+`product_name LIKE '%q%' OR description LIKE ... OR tags LIKE ...` on every
+request (liveSearch on every keystroke), and searchByFlavor does the same
+on flavor, so each query is a full scan of `products`. This builds an
+inverted index over name, description, tags, flavor, brand (the seller's
+company_name), category, subtype, sizes and colors. It serves it over a
+small local HTTP API that SearchIndexService.php calls when
+SEARCH_SERVICE_URL is set.
+
+Matching: every query term must match (AND). The last term also matches
+as a prefix, for live search. Terms with no exact or prefix hit fall back
+to vocabulary words one edit away (typos and transpositions). Ranking puts
+docs whose name matches every term ahead of docs matching elsewhere. Ties
+are broken by a static score: featured flag, recency, and the product's
+SponsoredAdsService ad rank (bid + product score x 0.3, same formula,
+normalized). This blends ads into organic results rather than inserting
+them; the wallet check and ad slots stay in PHP. Facet counts (category,
+subtype, flavor, brand, size, color) come from set intersections against
+per-value postings.
+
+Sync: `serve` loads all visible products, then polls
+`products.updated_at` every `--sync-interval` seconds and re-indexes
+changed rows (rows re-read at the watermark second are skipped when
+unchanged). Replaced or hidden products are tombstoned. The index is
+rebuilt from scratch every `--rebuild-interval` seconds (this also catches
+hard DELETEs) or once tombstones pass 25%. Ad ranks refresh every
+`--ads-interval`. POST /sync forces a poll, e.g. right after an admin edit;
+POST /remove {"id": 12} drops a deleted product at once.
+
+Queries never rebuild anything: a new doc is searchable as soon as it is
+added (ranked after existing docs), and the static order is recomputed
+by the sync thread outside the lock and swapped in.
+
+API (JSON):
+    GET  /search?q=whey+choc&limit=8&offset=0&sort=relevance&facets=1&category=Supplements
+         -> {success, total, count, ids, products: [...], facets: {...}, took_ms}
+    GET  /health -> {success, docs, tokens, dead, last_sync}
+    POST /sync
+    POST /remove {"id": 12}
+
+`bench` builds the index from MySQL or a dataset_gen.py `--out` directory
+and replays typed prefixes, multi-word and misspelled queries in-process,
+reporting p50/p99 per query kind.
+
+Usage:
+    python test/python/search_index.py serve --port 8790
+    python test/python/dataset_gen.py --out /tmp/ds --products 100000 --orders 1000
+    python test/python/search_index.py bench --tsv /tmp/ds --queries 5000
+"""
+
+import argparse
+import bisect
+import csv
+import heapq
+import json
+import os
+import random
+import re
+import resource
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import loadgen
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {"a", "an", "and", "for", "in", "of", "the", "with"}
+TEXT_FIELDS = ("product_name", "description", "tags", "flavor", "brand", "category", "subtype", "sizes", "colors")
+FACETS = ("category", "subtype", "flavor", "brand", "size", "color")
+STORED = ("id", "product_name", "slug", "price", "sale_price", "image", "category", "stock_quantity")
+SORTS = ("relevance", "newest", "price-low", "price-high", "popular")
+MAX_EXPANSION = 256
+TOMBSTONE_LIMIT = 0.25
+
+PRODUCTS_SQL = """
+    SELECT p.id, p.product_name, p.slug, p.description, p.tags, p.flavor, p.category, p.subtype, p.colors,
+           p.size_available, p.weight, p.price, p.sale_price, p.image, p.stock_quantity, p.is_featured,
+           p.status, p.approval_status, p.seller_id, p.created_at, p.updated_at, s.company_name AS brand
+    FROM products p
+    LEFT JOIN sellers s ON s.id = p.seller_id
+    WHERE p.updated_at >= %s
+    ORDER BY p.updated_at, p.id
+"""
+
+# Same filters and inputs as SponsoredAdsService::getSponsoredProductsForSearch().
+ADS_SQL = """
+    SELECT a.product_id, a.billing_type, a.daily_budget, a.per_click_rate, a.reach, a.click,
+           COALESCE(ac.cost_amount, 0) AS bid_amount,
+           (SELECT AVG(r.rating) FROM reviews r WHERE r.product_id = a.product_id) AS avg_rating,
+           (SELECT COUNT(*) FROM order_items oi
+            INNER JOIN orders o ON oi.order_id = o.id
+            WHERE oi.product_id = a.product_id
+            AND o.status = 'delivered'
+            AND o.created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)) AS monthly_sales
+    FROM ads a
+    INNER JOIN ads_types at ON a.ads_type_id = at.id
+    LEFT JOIN ads_costs ac ON a.ads_cost_id = ac.id
+    WHERE a.status = 'active'
+    AND a.auto_paused = 0
+    AND at.name = 'product_internal'
+    AND (a.approval_status = 'approved' OR a.approval_status IS NULL)
+    AND CURDATE() BETWEEN a.start_date AND a.end_date
+"""
+
+
+# ------------------------------------------------------------------ text
+
+def fold(text: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    return text.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def tokenize(text: Any) -> List[str]:
+    return TOKEN_RE.findall(fold(text))
+
+
+def split_list(value: Any) -> List[str]:
+    """Colors / sizes are stored as JSON arrays or comma-separated text."""
+    if value in (None, "", "\\N"):
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    try:
+        parsed = json.loads(value)
+        if isinstance(parsed, list):
+            return [str(v).strip() for v in parsed if str(v).strip()]
+    except (TypeError, ValueError):
+        pass
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def deletes(token: str) -> List[str]:
+    return [token[:i] + token[i + 1:] for i in range(len(token))]
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """Levenshtein distance <= 1, or a single adjacent transposition."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        return len(diff) == 1 or (len(diff) == 2 and diff[1] == diff[0] + 1
+                                   and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if la > lb:
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+# ------------------------------------------------------------------ ad rank
+
+def product_score(rating: float, sales: int, ctr: float) -> float:
+    return rating * 0.6 + min(sales / 100.0, 10) * 0.3 + min(ctr * 10, 10) * 0.1
+
+
+def ad_rank(row: Dict[str, Any]) -> float:
+    reach = float(row.get("reach") or 0)
+    ctr = float(row.get("click") or 0) / reach if reach > 0 else 0.0
+    score = product_score(float(row.get("avg_rating") or 0), int(row.get("monthly_sales") or 0), ctr)
+    if row.get("billing_type") == "daily_budget":
+        bid = float(row.get("daily_budget") or 0)
+    elif row.get("billing_type") == "per_click":
+        bid = float(row.get("per_click_rate") or 0) * 10
+    else:
+        bid = float(row.get("bid_amount") or 0)
+    return bid + score * 0.3
+
+
+# ------------------------------------------------------------------ index
+
+class LRU:
+    def __init__(self, size: int):
+        self.size = size
+        self.data: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        self.data[key] = value
+        if len(self.data) > self.size:
+            self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+
+def visible(row: Dict[str, Any]) -> bool:
+    if (row.get("status") or "active") != "active":
+        return False
+    approval = row.get("approval_status")
+    return approval in (None, "", "approved", "\\N") or not int(row.get("seller_id") or 0)
+
+
+def timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.strptime(str(value)[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return 0.0
+
+
+class Index:
+    """Postings are array('I') of doc ordinals; replaced docs get a new ordinal and the old one is tombstoned."""
+
+    def __init__(self, ad_weight: float = 0.5, cache_size: int = 4096):
+        self.ad_weight = ad_weight
+        self.lock = threading.RLock()
+        self.docs: List[Optional[Dict[str, Any]]] = []
+        self.by_id: Dict[int, int] = {}
+        self.postings: Dict[str, array] = {}
+        self.name_postings: Dict[str, array] = {}
+        self.facets: Dict[str, Dict[str, array]] = {f: {} for f in FACETS}
+        self.typo: Dict[str, List[str]] = defaultdict(list)
+        self.dead: set = set()
+        self.price = array("d")
+        self.created = array("d")
+        self.featured = array("B")
+        self.ad_ranks: Dict[int, float] = {}
+        self.pos = array("I")
+        self.vocab: List[str] = []
+        self.dirty = True
+        self.ready = False
+        self.cache = LRU(cache_size)
+
+    # -- writes
+
+    def add(self, row: Dict[str, Any]) -> None:
+        pid = int(row["id"])
+        self.remove(pid)
+        if not visible(row):
+            return
+        ordinal = len(self.docs)
+        doc = {k: row.get(k) for k in STORED}
+        doc["id"] = pid
+        self.docs.append(doc)
+        self.by_id[pid] = ordinal
+
+        sizes = split_list(row.get("size_available")) + split_list(row.get("weight"))
+        colors = split_list(row.get("colors"))
+        values = dict(row, sizes=" ".join(sizes), colors=" ".join(colors))
+        for token in set(t for f in TEXT_FIELDS for t in tokenize(values.get(f))):
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = array("I")
+                if self.ready:
+                    bisect.insort(self.vocab, token)
+                if len(token) >= 4 and not token.isdigit():
+                    for d in deletes(token):
+                        self.typo[d].append(token)
+            postings.append(ordinal)
+        for token in set(tokenize(row.get("product_name"))):
+            self.name_postings.setdefault(token, array("I")).append(ordinal)
+
+        facet_values = {"category": [row.get("category")], "subtype": [row.get("subtype")],
+                        "flavor": [row.get("flavor")], "brand": [row.get("brand")], "size": sizes, "color": colors}
+        for facet, vals in facet_values.items():
+            for v in set(str(v).strip() for v in vals if v not in (None, "", "\\N")):
+                self.facets[facet].setdefault(v, array("I")).append(ordinal)
+
+        price = float(row.get("price") or 0)
+        sale = float(row.get("sale_price") or 0)
+        self.price.append(sale if 0 < sale < price else price)
+        self.created.append(timestamp(row.get("created_at")))
+        self.featured.append(1 if str(row.get("is_featured") or "0") in ("1", "True", "true") else 0)
+        # Provisional rank after every existing doc until the next refresh()
+        self.pos.append(len(self.pos))
+        self.cache.clear()
+        self.dirty = True
+
+    def remove(self, pid: int) -> None:
+        ordinal = self.by_id.pop(pid, None)
+        if ordinal is not None:
+            self.dead.add(ordinal)
+            self.docs[ordinal] = None
+            self.cache.clear()
+
+    def set_ad_ranks(self, ranks: Dict[int, float]) -> None:
+        if ranks != self.ad_ranks:
+            self.ad_ranks = ranks
+            self.dirty = True
+
+    def tombstone_ratio(self) -> float:
+        return len(self.dead) / len(self.docs) if self.docs else 0.0
+
+    def refresh(self) -> None:
+        """Recompute the static order (and vocabulary) after writes.
+
+        Called by the single writer (build / sync thread), never on the query
+        path: the new state is computed without the lock, and queries keep
+        using the previous one until it is swapped in.
+        """
+        if not self.dirty:
+            return
+        vocab = sorted(self.postings) if not self.ready else None
+        n = len(self.docs)
+        newest = max(self.created) if n else 0.0
+        oldest = min(self.created) if n else 0.0
+        span = (newest - oldest) or 1.0
+        top_ad = max(self.ad_ranks.values()) if self.ad_ranks else 0.0
+        static = [0.0] * n
+        for o, doc in enumerate(self.docs):
+            if doc is None:
+                continue
+            s = 0.5 * self.featured[o] + 0.5 * (self.created[o] - oldest) / span
+            if top_ad > 0:
+                s += self.ad_weight * self.ad_ranks.get(doc["id"], 0.0) / top_ad
+            static[o] = s
+        order = sorted(range(n), key=static.__getitem__, reverse=True)
+        pos = array("I", bytes(4 * n))
+        for i, o in enumerate(order):
+            pos[o] = i
+        with self.lock:
+            if vocab is not None:
+                self.vocab = vocab
+            self.pos = pos
+            self.cache.clear()
+            self.dirty = False
+            self.ready = True
+
+    # -- reads
+
+    def _union(self, key: Tuple, lists: Iterable[array]) -> set:
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = set().union(*lists)
+            self.cache.put(key, cached)
+        return cached
+
+    def expand(self, term: str, prefix: bool) -> Tuple[List[str], bool]:
+        """Vocabulary tokens a query term matches, and whether the match is exact/prefix (not a typo)."""
+        if prefix:
+            lo = bisect.bisect_left(self.vocab, term)
+            hi = bisect.bisect_left(self.vocab, term + "\x7f")
+            tokens = self.vocab[lo:hi]
+            if len(tokens) > MAX_EXPANSION:
+                tokens = heapq.nlargest(MAX_EXPANSION, tokens, key=lambda t: len(self.postings[t]))
+            if tokens:
+                return tokens, True
+        elif term in self.postings:
+            return [term], True
+        if len(term) < 4:
+            return [], False
+        candidates = set(self.typo.get(term, ()))
+        for d in deletes(term):
+            if d in self.postings:
+                candidates.add(d)
+            candidates.update(self.typo.get(d, ()))
+        return [t for t in candidates if within_one_edit(term, t)], False
+
+    def search(self, q: str, limit: int = 8, offset: int = 0, sort: str = "relevance",
+               filters: Optional[Dict[str, str]] = None, facets: bool = False) -> Dict[str, Any]:
+        terms = tokenize(q)
+        terms = [t for t in terms if t not in STOPWORDS] or terms
+        empty = {"total": 0, "ids": [], "products": [], "facets": {}}
+        if not terms:
+            return empty
+        with self.lock:
+            groups = []
+            for i, term in enumerate(terms):
+                tokens, exact = self.expand(term, prefix=i == len(terms) - 1)
+                if not tokens:
+                    return empty
+                key = tuple(tokens) if len(tokens) < 8 else (term, i == len(terms) - 1, len(tokens))
+                groups.append((self._union(("all",) + key, (self.postings[t] for t in tokens)),
+                               self._union(("name",) + key, (self.name_postings[t] for t in tokens
+                                                             if t in self.name_postings)), exact))
+            groups.sort(key=lambda g: len(g[0]))
+            cand = groups[0][0].intersection(*(g[0] for g in groups[1:])) - self.dead
+            for facet, value in (filters or {}).items():
+                postings = self.facets.get(facet, {}).get(value)
+                cand &= self._union(("facet", facet, value), [postings]) if postings else set()
+
+            need = offset + limit
+            if sort == "newest":
+                top = heapq.nlargest(need, cand, key=self.created.__getitem__)
+            elif sort == "price-low":
+                top = heapq.nsmallest(need, cand, key=self.price.__getitem__)
+            elif sort == "price-high":
+                top = heapq.nlargest(need, cand, key=self.price.__getitem__)
+            elif sort == "popular":
+                top = heapq.nsmallest(need, cand, key=self.pos.__getitem__)
+            else:
+                strong = cand.intersection(*(g[1] for g in groups)) if all(g[2] for g in groups) else set()
+                top = heapq.nsmallest(need, strong, key=self.pos.__getitem__)
+                if len(top) < need:
+                    top += heapq.nsmallest(need - len(top), cand - strong, key=self.pos.__getitem__)
+            page = top[offset:need]
+            out = {"total": len(cand), "ids": [self.docs[o]["id"] for o in page],
+                   "products": [self.docs[o] for o in page], "facets": {}}
+            if facets:
+                for facet, values in self.facets.items():
+                    counts = {}
+                    for value, postings in values.items():
+                        n = len(cand & self._union(("facet", facet, value), [postings]))
+                        if n:
+                            counts[value] = n
+                    out["facets"][facet] = dict(sorted(counts.items(), key=lambda kv: -kv[1]))
+            return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {"docs": len(self.by_id), "tokens": len(self.postings), "dead": len(self.dead)}
+
+
+# ------------------------------------------------------------------ sources
+
+def connect(args):
+    if mysql is None:
+        raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+    return mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database,
+                         autocommit=True)
+
+
+def fetch_products(conn, since: Any = "1970-01-01 00:00:00") -> List[Dict[str, Any]]:
+    cur = conn.cursor(dictionary=True)
+    cur.execute(PRODUCTS_SQL, (since,))
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+
+def fetch_ad_ranks(conn) -> Dict[int, float]:
+    cur = conn.cursor(dictionary=True)
+    cur.execute(ADS_SQL)
+    ranks: Dict[int, float] = {}
+    for row in cur.fetchall():
+        pid = int(row["product_id"])
+        ranks[pid] = max(ranks.get(pid, 0.0), ad_rank(row))
+    cur.close()
+    return ranks
+
+
+def read_tsv(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8", newline="") as fh:
+        reader = csv.reader(fh, delimiter="\t", quoting=csv.QUOTE_NONE)
+        header = next(reader)
+        return [{k: (None if v == "\\N" else v) for k, v in zip(header, row)} for row in reader]
+
+
+def load_tsv(directory: str) -> Tuple[List[Dict[str, Any]], Dict[int, float]]:
+    """Products (and ad ranks from bids alone) from a dataset_gen.py --out directory."""
+    brands = {r["id"]: r.get("company_name") for r in read_tsv(os.path.join(directory, "sellers.tsv"))}
+    products = read_tsv(os.path.join(directory, "products.tsv"))
+    for row in products:
+        row.setdefault("subtype", row.get("subcategory"))
+        row["brand"] = brands.get(row.get("seller_id"))
+    ranks: Dict[int, float] = {}
+    for row in read_tsv(os.path.join(directory, "ads.tsv")):
+        if row.get("product_id") and (row.get("status") or "active") == "active":
+            pid = int(row["product_id"])
+            ranks[pid] = max(ranks.get(pid, 0.0), ad_rank(row))
+    return products, ranks
+
+
+def row_version(row: Dict[str, Any]) -> int:
+    return hash(tuple(str(v) for v in row.values()))
+
+
+def build(rows: Iterable[Dict[str, Any]], ranks: Dict[int, float], ad_weight: float) -> Index:
+    index = Index(ad_weight)
+    for row in rows:
+        index.add(row)
+    index.set_ad_ranks(ranks)
+    index.refresh()
+    return index
+
+
+# ------------------------------------------------------------------ service
+
+class Service:
+    def __init__(self, args):
+        self.args = args
+        self.conn = connect(args)
+        self.index = Index(args.ad_weight)
+        self.last_sync = 0.0
+        self.watermark: Any = "1970-01-01 00:00:00"
+        self.versions: Dict[int, int] = {}
+        self.sync_now = threading.Event()
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        start = time.perf_counter()
+        rows = fetch_products(self.conn)
+        index = build(rows, fetch_ad_ranks(self.conn), self.args.ad_weight)
+        if rows:
+            self.watermark = max(r["updated_at"] for r in rows)
+        self.versions = {int(r["id"]): row_version(r) for r in rows}
+        self.index = index
+        self.last_rebuild = self.last_ads = self.last_sync = time.time()
+        print(f"Indexed {index.stats()['docs']:,} products, {index.stats()['tokens']:,} tokens "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    def sync(self) -> int:
+        # >= with the previous watermark re-reads rows updated in the same second
+        # (updated_at has second resolution); those are skipped unless they changed.
+        rows = fetch_products(self.conn, self.watermark)
+        if rows:
+            self.watermark = max(r["updated_at"] for r in rows)
+        changed = [r for r in rows if self.versions.get(int(r["id"])) != row_version(r)]
+        if changed:
+            with self.index.lock:
+                for row in changed:
+                    self.index.add(row)
+            for row in changed:
+                self.versions[int(row["id"])] = row_version(row)
+        if time.time() - self.last_ads >= self.args.ads_interval:
+            self.index.set_ad_ranks(fetch_ad_ranks(self.conn))
+            self.last_ads = time.time()
+        self.index.refresh()
+        self.last_sync = time.time()
+        return len(changed)
+
+    def remove(self, pid: int) -> None:
+        with self.index.lock:
+            self.index.remove(pid)
+        self.versions.pop(pid, None)
+
+    def loop(self) -> None:
+        while True:
+            self.sync_now.wait(self.args.sync_interval)
+            self.sync_now.clear()
+            try:
+                if (time.time() - self.last_rebuild >= self.args.rebuild_interval
+                        or self.index.tombstone_ratio() > TOMBSTONE_LIMIT):
+                    self.rebuild()
+                else:
+                    self.sync()
+            except Exception as exc:
+                print(f"sync failed: {exc}")
+
+
+def make_handler(service: Service):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def send_json(self, payload: Dict[str, Any], code: int = 200) -> None:
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/health":
+                self.send_json(dict(service.index.stats(), success=True, last_sync=service.last_sync))
+                return
+            if url.path != "/search":
+                self.send_json({"success": False, "error": "not found"}, 404)
+                return
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            start = time.perf_counter()
+            try:
+                limit = max(1, min(100, int(params.get("limit", 8))))
+                offset = max(0, int(params.get("offset", 0)))
+            except ValueError:
+                self.send_json({"success": False, "error": "bad limit/offset"}, 400)
+                return
+            sort = params.get("sort", "relevance")
+            result = service.index.search(params.get("q", ""), limit, offset, sort if sort in SORTS else "relevance",
+                                          {f: params[f] for f in FACETS if params.get(f)}, params.get("facets") == "1")
+            result.update(success=True, count=len(result["ids"]),
+                          took_ms=round((time.perf_counter() - start) * 1000.0, 3))
+            self.send_json(result)
+
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            if path == "/sync":
+                service.sync_now.set()
+                self.send_json({"success": True})
+            elif path == "/remove":
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    service.remove(int(json.loads(self.rfile.read(length) or b"{}")["id"]))
+                except (KeyError, TypeError, ValueError):
+                    self.send_json({"success": False, "error": "id required"}, 400)
+                    return
+                self.send_json({"success": True})
+            else:
+                self.send_json({"success": False, "error": "not found"}, 404)
+
+    return Handler
+
+
+def serve(args) -> None:
+    service = Service(args)
+    threading.Thread(target=service.loop, daemon=True).start()
+    server = ThreadingHTTPServer((args.bind, args.port), make_handler(service))
+    print(f"Search index listening on http://{args.bind}:{args.port}")
+    server.serve_forever()
+
+
+# ------------------------------------------------------------------ bench
+
+def typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def make_queries(index: Index, n: int, rng: random.Random) -> List[Tuple[str, str]]:
+    names = [d["product_name"] for d in index.docs if d and d.get("product_name")]
+    queries = []
+    while len(queries) < n:
+        words = [w for w in tokenize(rng.choice(names)) if not w.isdigit()]
+        if not words:
+            continue
+        kind = rng.random()
+        if kind < 0.6:
+            # What liveSearch sees while a user types the first word or two.
+            text = " ".join(words[:2])
+            queries.append(("prefix", text[:rng.randint(2, len(text))]))
+        elif kind < 0.85:
+            queries.append(("words", " ".join(rng.sample(words, min(len(words), 2)))))
+        else:
+            long_words = [w for w in words if len(w) >= 5]
+            if long_words:
+                queries.append(("typo", typo(rng.choice(long_words), rng)))
+    return queries
+
+
+def bench(args) -> None:
+    start = time.perf_counter()
+    if args.tsv:
+        rows, ranks = load_tsv(args.tsv)
+    else:
+        conn = connect(args)
+        rows, ranks = fetch_products(conn), fetch_ad_ranks(conn)
+        conn.close()
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    index = build(rows, ranks, args.ad_weight)
+    built = time.perf_counter() - start
+    stats = index.stats()
+    print(f"{len(rows):,} rows loaded in {loaded:.1f}s, indexed in {built:.1f}s: {stats['docs']:,} docs, "
+          f"{stats['tokens']:,} tokens, max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    rng = random.Random(args.seed)
+    queries = make_queries(index, args.queries, rng)
+    timings: Dict[str, List[float]] = defaultdict(list)
+    hits: Dict[str, int] = defaultdict(int)
+    for kind, q in queries:
+        for mode, limit, facets in (("live", 8, False), ("page", 20, True)):
+            t0 = time.perf_counter()
+            res = index.search(q, limit=limit, facets=facets)
+            timings[f"{mode}:{kind}"].append((time.perf_counter() - t0) * 1000.0)
+            if mode == "live" and res["ids"]:
+                hits[kind] += 1
+
+    print(f"\n{'query kind':16} {'n':>6} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'hit %':>6}")
+    for name in sorted(timings):
+        ms = timings[name]
+        kind = name.split(":")[1]
+        print(f"{name:16} {len(ms):6d} {loadgen.percentile(ms, 50):8.2f} {loadgen.percentile(ms, 99):8.2f} "
+              f"{max(ms):8.2f} {100.0 * hits[kind] / len(ms):6.1f}")
+    live = [v for k, ms in timings.items() if k.startswith("live:") for v in ms]
+    verdict = "within" if loadgen.percentile(live, 99) <= args.budget_ms else "over"
+    print(f"\nlive search p99 {loadgen.percentile(live, 99):.2f} ms ({verdict} the {args.budget_ms:g} ms budget)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Product search index")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    parser.add_argument("--ad-weight", type=float, default=0.5, help="weight of normalized ad rank in the static score")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sv = sub.add_parser("serve", help="run the HTTP query service")
+    sv.add_argument("--bind", default="127.0.0.1")
+    sv.add_argument("--port", type=int, default=8790)
+    sv.add_argument("--sync-interval", type=float, default=10.0)
+    sv.add_argument("--ads-interval", type=float, default=60.0)
+    sv.add_argument("--rebuild-interval", type=float, default=3600.0)
+
+    bn = sub.add_parser("bench", help="build the index and time queries in-process")
+    bn.add_argument("--tsv", default=None, help="dataset_gen.py --out directory instead of MySQL")
+    bn.add_argument("--queries", type=int, default=2000)
+    bn.add_argument("--budget-ms", type=float, default=20.0)
+    bn.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
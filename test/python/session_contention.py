@@ -0,0 +1,244 @@
+"""Same-session burst benchmark for DatabaseSessionHandler and SessionLock.
+
+Storefront pages fire several AJAX calls at once (cart.js,
+cartNotifier.js), all carrying the same PHPSESSID. Every one of them
+makes DatabaseSessionHandler read the whole session row at start and
+upsert the whole payload at shutdown. For each burst size B this fires B
+concurrent requests on one session and, as a control, B requests on B
+separate sessions. It then reports per-request latency, burst makespan
+and throughput for both. The gap between the two is the cost of sharing
+a session.
+
+Mixes (`--mix`):
+
+    count   GET /cart/count, the cartNotifier poll
+    add     POST /cart/add with B distinct products on a guest session;
+            afterwards /cart/count shows how many adds survived, because
+            the handler does not lock and the last payload written wins
+    login   POST /auth/processLogin B times for one user (`--login
+            phone:password`); SessionLock::acquire() lets one through and
+            polls up to 5 s for the rest, so this measures lock wait and
+            the "Another login session is in progress" rejections
+
+With `--db`, SHOW GLOBAL STATUS and the `sessions` row are sampled around
+each burst. From those it reports session writes and payload bytes
+rewritten per request, plus InnoDB bytes written per request (session
+write amplification).
+
+Usage:
+    python test/python/session_contention.py --bursts 1,2,4,8,16,32
+    python test/python/session_contention.py --mix add --product-ids 1-32 --db
+    python test/python/session_contention.py --mix login --login 9800000001:password123
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+import loadgen
+
+try:
+    import mysql.connector as mysql
+except Exception:
+    mysql = None
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
+AJAX_HEADERS = {"X-Requested-With": "XMLHttpRequest"}
+LOCK_REJECTED = "Another login session is in progress"
+CSRF_RE = re.compile(r'name="_csrf_token"\s+value="([^"]+)"')
+STATUS_KEYS = ("Com_insert", "Innodb_data_written", "Innodb_rows_updated")
+
+
+def parse_ids(spec: str) -> List[int]:
+    ids: List[int] = []
+    for part in spec.split(","):
+        lo, _, hi = part.partition("-")
+        ids.extend(range(int(lo), int(hi or lo) + 1))
+    return ids
+
+
+class DbProbe:
+    """Session row size and global write counters around a burst."""
+
+    def __init__(self, args):
+        if mysql is None:
+            raise SystemExit("mysql-connector not installed (pip install mysql-connector-python).")
+        self.conn = mysql.connect(host=args.host, user=args.user, password=args.password, database=args.database,
+                                  autocommit=True)
+        self.cur = self.conn.cursor()
+
+    def status(self) -> Dict[str, int]:
+        self.cur.execute("SHOW GLOBAL STATUS WHERE Variable_name IN (%s, %s, %s)", STATUS_KEYS)
+        return {k: int(v) for k, v in self.cur.fetchall()}
+
+    def payload_bytes(self, session_id: Optional[str]) -> int:
+        if not session_id:
+            return 0
+        self.cur.execute("SELECT LENGTH(payload) FROM sessions WHERE id = %s", (session_id,))
+        row = self.cur.fetchone()
+        return int(row[0]) if row else 0
+
+    def close(self) -> None:
+        self.cur.close()
+        self.conn.close()
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.base = args.base_url.rstrip("/")
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self.product_ids = parse_ids(args.product_ids)
+        self.tokens: Dict[int, str] = {}
+
+    def client(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(connector=self.connector, connector_owner=False,
+                                     cookie_jar=aiohttp.CookieJar(unsafe=True),
+                                     timeout=aiohttp.ClientTimeout(total=self.args.timeout))
+
+    async def warm(self, session: aiohttp.ClientSession) -> Optional[str]:
+        """Open a PHP session and return its id."""
+        page = await loadgen.fetch(session, self.base + ("/auth/login" if self.args.mix == "login" else "/"),
+                                   want_body=True)
+        match = CSRF_RE.search(page.get("body") or "")
+        if match:
+            self.tokens[id(session)] = match.group(1)
+        for cookie in session.cookie_jar:
+            if cookie.key == "PHPSESSID":
+                return cookie.value
+        return None
+
+    def request(self, session: aiohttp.ClientSession, i: int, started: float):
+        if self.args.mix == "add":
+            pid = self.product_ids[i % len(self.product_ids)]
+            return loadgen.fetch(session, self.base + "/cart/add", "POST", started=started, label="add",
+                                 data={"product_id": pid, "quantity": 1}, headers=AJAX_HEADERS)
+        if self.args.mix == "login":
+            phone, _, password = self.args.login.partition(":")
+            return loadgen.fetch(session, self.base + "/auth/processLogin", "POST", started=started, label="login",
+                                 want_body=True, data={"phone": phone, "password": password,
+                                                       "_csrf_token": self.tokens.get(id(session), "")})
+        return loadgen.fetch(session, self.base + "/cart/count", started=started, label="count",
+                             headers=AJAX_HEADERS)
+
+    async def cart_count(self, session: aiohttp.ClientSession) -> Optional[int]:
+        async with session.get(self.base + "/cart/count", headers=AJAX_HEADERS) as resp:
+            try:
+                return int((await resp.json(content_type=None)).get("count"))
+            except (ValueError, TypeError, AttributeError):
+                return None
+
+    async def burst(self, size: int, shared: bool, probe: Optional[DbProbe]) -> Dict[str, Any]:
+        sessions = [self.client()] if shared else [self.client() for _ in range(size)]
+        try:
+            ids = [await self.warm(s) for s in sessions]
+            before = probe.status() if probe else None
+            start = time.perf_counter()
+            results = await asyncio.gather(*(self.request(sessions[i % len(sessions)], i, start) for i in range(size)))
+            makespan = (time.perf_counter() - start) * 1000.0
+            after = probe.status() if probe else None
+
+            out: Dict[str, Any] = {"results": list(results), "makespan_ms": makespan}
+            if self.args.mix == "login":
+                out["rejected"] = sum(1 for r in results if LOCK_REJECTED in (r.pop("body", None) or ""))
+            if self.args.mix == "add" and shared:
+                out["expected"] = size
+                out["survived"] = await self.cart_count(sessions[0])
+            if probe:
+                out["session_writes"] = after["Com_insert"] - before["Com_insert"]
+                out["innodb_bytes"] = after["Innodb_data_written"] - before["Innodb_data_written"]
+                out["payload_bytes"] = sum(probe.payload_bytes(i) for i in ids) / max(len(ids), 1)
+            return out
+        finally:
+            for s in sessions:
+                await s.close()
+
+    async def run(self) -> List[Dict[str, Any]]:
+        probe = DbProbe(self.args) if self.args.db else None
+        self.connector = aiohttp.TCPConnector(limit=0, keepalive_timeout=30)
+        rows = []
+        try:
+            for size in [int(b) for b in self.args.bursts.split(",")]:
+                for shared in (True, False):
+                    bursts = [await self.burst(size, shared, probe) for _ in range(self.args.rounds)]
+                    rows.append(summarize(size, shared, bursts))
+        finally:
+            if probe:
+                probe.close()
+            await self.connector.close()
+        return rows
+
+
+def summarize(size: int, shared: bool, bursts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = [r["ms"] for b in bursts for r in b["results"]]
+    makespans = [b["makespan_ms"] for b in bursts]
+    requests = size * len(bursts)
+    row: Dict[str, Any] = {
+        "burst": size,
+        "mode": "same" if shared else "distinct",
+        "p50_ms": loadgen.percentile(latencies, 50),
+        "p99_ms": loadgen.percentile(latencies, 99),
+        "makespan_ms": sum(makespans) / len(makespans),
+        "rps": requests / (sum(makespans) / 1000.0) if sum(makespans) else 0.0,
+        "errors": sum(1 for b in bursts for r in b["results"] if loadgen.is_error(r)),
+    }
+    if "rejected" in bursts[0]:
+        row["rejected"] = sum(b["rejected"] for b in bursts)
+    if "survived" in bursts[0]:
+        row["lost"] = sum(b["expected"] - (b["survived"] or 0) for b in bursts)
+    if "session_writes" in bursts[0]:
+        row["writes_per_req"] = sum(b["session_writes"] for b in bursts) / requests
+        row["payload_bytes_per_req"] = sum(b["payload_bytes"] * b["session_writes"] for b in bursts) / requests
+        row["innodb_bytes_per_req"] = sum(b["innodb_bytes"] for b in bursts) / requests
+    return row
+
+
+def print_table(rows: List[Dict[str, Any]], mix: str) -> None:
+    extra = [k for k in ("rejected", "lost", "writes_per_req", "payload_bytes_per_req", "innodb_bytes_per_req")
+             if any(k in r for r in rows)]
+    print(f"\n{'burst':>5} {'session':>8} {'p50 ms':>9} {'p99 ms':>9} {'makespan':>9} {'req/s':>8} {'err':>4}"
+          + "".join(f" {k:>21}" for k in extra))
+    by_key = {(r["burst"], r["mode"]): r for r in rows}
+    for r in rows:
+        line = (f"{r['burst']:5d} {r['mode']:>8} {r['p50_ms']:9.1f} {r['p99_ms']:9.1f} {r['makespan_ms']:9.1f} "
+                f"{r['rps']:8.1f} {r['errors']:4d}")
+        line += "".join(f" {r[k]:21.1f}" if k in r else f" {'':>21}" for k in extra)
+        print(line)
+    print(f"\nSame-session penalty ({mix}): extra p50 latency vs. the same burst on separate sessions")
+    for size in sorted({r["burst"] for r in rows}):
+        same, distinct = by_key.get((size, "same")), by_key.get((size, "distinct"))
+        if same and distinct:
+            print(f"  burst {size:3d}: +{same['p50_ms'] - distinct['p50_ms']:8.1f} ms p50, "
+                  f"throughput x{same['rps'] / distinct['rps'] if distinct['rps'] else 0:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Same-session concurrency benchmark")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--mix", choices=("count", "add", "login"), default="count")
+    parser.add_argument("--bursts", default="1,2,4,8,16")
+    parser.add_argument("--rounds", type=int, default=5, help="bursts per size and mode")
+    parser.add_argument("--product-ids", default="1-16", help="ids for --mix add, e.g. 1-16,40")
+    parser.add_argument("--login", default=None, help="phone:password for --mix login")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--db", action="store_true", help="sample session writes from MySQL")
+    parser.add_argument("--host", default=os.getenv("NUTRINEXAS_DB_HOST", "localhost"))
+    parser.add_argument("--user", default=os.getenv("NUTRINEXAS_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("NUTRINEXAS_DB_PASS", "123456"))
+    parser.add_argument("--database", default=os.getenv("NUTRINEXAS_DB_NAME", "nutrinexas"))
+    args = parser.parse_args()
+    if args.mix == "login" and not args.login:
+        parser.error("--mix login needs --login phone:password")
+
+    rows = asyncio.run(Harness(args).run())
+    print_table(rows, args.mix)
+
+
+if __name__ == "__main__":
+    main()
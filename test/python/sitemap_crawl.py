@@ -0,0 +1,231 @@
+"""Sitemap-driven crawl benchmark.
+
+Streams the sitemap index (and every child sitemap it lists) with
+`iterparse`, fetches each URL with bounded concurrency over one pooled
+keep-alive session, and records per URL: sitemap kind, status, TTFB,
+total time, bytes and cache headers. Results are written column-wise
+(Parquet when pyarrow is installed, otherwise gzipped columnar JSON) and
+the slowest product and category pages are printed.
+
+Child sitemaps are read from the directory of the index file when a
+local copy exists (the repo ships them at the root and under App/), and
+fetched over HTTP otherwise. URLs are re-pointed at `--base-url`, with
+product entries mapped to the routed `/products/view/<slug>` path. Any
+URL that does not answer 2xx is listed after the summary, since a 404
+page is fast and would otherwise pass for a healthy one.
+
+Usage:
+    python test/python/sitemap_crawl.py
+    python test/python/sitemap_crawl.py --index App/sitemap.xml --concurrency 32 --out crawl.parquet
+"""
+
+import argparse
+import asyncio
+import gzip
+import io
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+import loadgen
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except Exception:
+    pyarrow = None
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SITEMAP_INDEX = os.path.join(REPO_ROOT, "App", "sitemap.xml")
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+CACHE_HEADERS = ["cache-control", "etag", "last-modified", "expires", "age", "x-cache"]
+COLUMNS = ["url", "kind", "status", "ttfb_ms", "ms", "bytes"] + [h.replace("-", "_") for h in CACHE_HEADERS]
+
+
+def repoint(url: str, base: str) -> str:
+    """Re-point `url` at `base`, mapping product pages to their routed path.
+
+    The product sitemap lists `/products/<slug>`, which App.php does not
+    route; the product page lives at `products/view/{slug}`.
+    """
+    parts = urlsplit(url)
+    path = parts.path
+    segments = path.rstrip("/").split("/")
+    if len(segments) == 3 and segments[1] == "products" and segments[2]:
+        path = "/products/view/" + segments[2]
+    return base.rstrip("/") + path + (f"?{parts.query}" if parts.query else "")
+
+
+def iter_locs(source) -> Iterator[Tuple[str, str]]:
+    """Yield (tag, loc) for each <url>/<sitemap> entry without building the tree."""
+    for _, elem in ET.iterparse(source, events=("end",)):
+        if elem.tag in (f"{SITEMAP_NS}url", f"{SITEMAP_NS}sitemap"):
+            loc = elem.find(f"{SITEMAP_NS}loc")
+            if loc is not None and loc.text:
+                yield elem.tag[len(SITEMAP_NS):], loc.text.strip()
+            elem.clear()
+
+
+def open_sitemap(loc: str, local_dir: str):
+    """Return a file object for a child sitemap, preferring the local copy."""
+    local = os.path.join(local_dir, os.path.basename(urlsplit(loc).path))
+    if os.path.exists(local):
+        return open(local, "rb")
+    resp = requests.get(loc, timeout=30)
+    resp.raise_for_status()
+    return io.BytesIO(resp.content)
+
+
+def sitemap_kind(name: str) -> str:
+    """`product-sitemap.xml` -> `product`."""
+    base = os.path.basename(urlsplit(name).path)
+    return base.replace("-sitemap.xml", "").replace(".xml", "") or "page"
+
+
+def iter_sitemap_urls(index: str, base: str) -> Iterator[Tuple[str, str]]:
+    """Yield (url, kind) for every page reachable from `index`, de-duplicated."""
+    seen = set()
+    local_dir = os.path.dirname(os.path.abspath(index))
+
+    def walk(source, kind: str) -> Iterator[Tuple[str, str]]:
+        for tag, loc in iter_locs(source):
+            if tag == "sitemap":
+                with open_sitemap(loc, local_dir) as child:
+                    yield from walk(child, sitemap_kind(loc))
+            else:
+                url = repoint(loc, base)
+                if url not in seen:
+                    seen.add(url)
+                    yield url, kind
+
+    with open(index, "rb") as fh:
+        yield from walk(fh, sitemap_kind(index))
+
+
+async def crawl(urls: Iterator[Tuple[str, str]], concurrency: int, timeout: float) -> List[Dict[str, Any]]:
+    """Fetch URLs with at most `concurrency` in flight; the feed is consumed lazily."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    rows: List[Dict[str, Any]] = []
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            url, kind = item
+            row = await fetch_row(session, url)
+            row["kind"] = kind
+            rows.append(row)
+            if len(rows) % 100 == 0:
+                print(f"  {len(rows)} URLs fetched...")
+
+    async with loadgen.make_session(concurrency, timeout) as session:
+        workers = [asyncio.ensure_future(worker(session)) for _ in range(concurrency)]
+        for item in urls:
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    return rows
+
+
+async def fetch_row(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+    row: Dict[str, Any] = {"url": url, "status": "ERR", "ttfb_ms": None, "ms": None, "bytes": 0}
+    start = time.perf_counter()
+    try:
+        async with session.get(url) as resp:
+            row["ttfb_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+            size = 0
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                size += len(chunk)
+            row["status"] = resp.status
+            row["bytes"] = size
+            for h in CACHE_HEADERS:
+                row[h.replace("-", "_")] = resp.headers.get(h)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        row["error"] = type(exc).__name__
+    row["ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+    return row
+
+
+def to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    cols = {c: [r.get(c) for r in rows] for c in COLUMNS}
+    cols["status"] = [s if isinstance(s, int) else None for s in cols["status"]]
+    return cols
+
+
+def write_results(rows: List[Dict[str, Any]], path: str) -> str:
+    """Write rows column-wise; returns the path actually written."""
+    cols = to_columns(rows)
+    if path.endswith(".parquet"):
+        if pyarrow is None:
+            path = path[: -len(".parquet")] + ".json.gz"
+            print("pyarrow not installed; writing columnar JSON instead.")
+        else:
+            pyarrow.parquet.write_table(pyarrow.table(cols), path, compression="zstd")
+            return path
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        json.dump({"rows": len(rows), "columns": cols}, fh, separators=(",", ":"))
+    return path
+
+
+def print_slowest(rows: List[Dict[str, Any]], kinds=("product", "category"), top: int = 10) -> None:
+    for kind in kinds:
+        subset = [r for r in rows if r.get("kind") == kind and r.get("ms") is not None]
+        if not subset:
+            continue
+        subset.sort(key=lambda r: r["ms"], reverse=True)
+        print(f"\nSlowest {kind} pages:")
+        for r in subset[:top]:
+            cache = r.get("cache_control") or "-"
+            print(f"{r['ms']:9.1f} ms  ttfb {r['ttfb_ms'] or 0:8.1f}  {r['bytes']:>9} B  {r['status']!s:>3}  {cache[:24]:<24}  {urlsplit(r['url']).path}")
+
+
+def print_non_2xx(rows: List[Dict[str, Any]], top: int = 10) -> None:
+    bad = [r for r in rows if not (isinstance(r.get("status"), int) and 200 <= r["status"] < 300)]
+    if not bad:
+        return
+    by_status: Dict[str, int] = {}
+    for r in bad:
+        by_status[str(r["status"])] = by_status.get(str(r["status"]), 0) + 1
+    print(f"\nNon-2xx responses: {len(bad)} of {len(rows)} "
+          f"({', '.join(f'{k}={v}' for k, v in sorted(by_status.items()))})")
+    for r in bad[:top]:
+        print(f"  {r['status']!s:>3}  {r.get('kind')}  {urlsplit(r['url']).path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sitemap-driven crawl benchmark")
+    parser.add_argument("--index", default=SITEMAP_INDEX, help="sitemap index (or a single sitemap)")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", default="sitemap_crawl.parquet", help=".parquet or .json.gz")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"Crawling {args.index} against {args.base_url} ({args.concurrency} concurrent)...")
+    start = time.perf_counter()
+    rows = asyncio.run(crawl(iter_sitemap_urls(args.index, args.base_url), args.concurrency, args.timeout))
+    elapsed = time.perf_counter() - start
+
+    summary = loadgen.summarize(rows, elapsed, key="kind")
+    loadgen.print_summary(summary, "Latency by sitemap (ms)")
+    print_slowest(rows, top=args.top)
+    print_non_2xx(rows, top=args.top)
+
+    path = write_results(rows, args.out)
+    print(f"\n{len(rows)} URLs in {elapsed:.1f}s; results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,39 @@ This script measures page load times using a headless Chrome browser for
 the specified URLs. It performs an HTTP status check first, then loads
 each page in Selenium and records timing metrics.
 
-Usage: `python test/python/speed.py`
+With `--workers N` the URLs are spread over a pool of N processes, each
+keeping one reusable headless Chrome for its lifetime, and results are
+printed as they finish. `--sitemap` adds every URL from the product
+sitemap. `--cache cold` clears the browser cache and cookies before each
+page; `--cache warm` loads each page once unmeasured first.
+
+Core Web Vitals (LCP, CLS, FCP, TTFB, INP, long tasks and total blocking
+time) are captured by PerformanceObserver hooks installed before each
+navigation. `--profile` applies CPU and network throttling through the
+Chrome DevTools Protocol so mobile-grade numbers come from the same run.
+
+Usage:
+    python test/python/speed.py
+    python test/python/speed.py --workers 6 --sitemap --cache cold
+    python test/python/speed.py --profile mobile
 """
 
+import argparse
+import multiprocessing
+import multiprocessing.util
+import os
 import time
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
 import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
 
 # URLs to test
@@ -24,11 +46,77 @@ TEST_URLS = [
     "http://192.168.1.77:8000/checkout",
 ]
 
+PRODUCT_SITEMAP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "product-sitemap.xml")
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+CACHE_MODES = ("default", "cold", "warm")
+
+# CPU slowdown factor and DevTools network conditions (latency in ms,
+# throughput in bytes/s). "mobile" approximates Lighthouse's slow-4G
+# mobile preset.
+THROTTLE_PROFILES = {
+    "none": {"cpu": 1, "network": None},
+    "mobile": {"cpu": 4, "network": {"latency": 150, "downloadThroughput": 1.6 * 1024 * 1024 / 8,
+                                      "uploadThroughput": 750 * 1024 / 8}},
+    "slow-3g": {"cpu": 6, "network": {"latency": 400, "downloadThroughput": 400 * 1024 / 8,
+                                       "uploadThroughput": 400 * 1024 / 8}},
+}
+
+# Installed before any page script runs; observers use `buffered: true`
+# so entries emitted before registration are still delivered.
+VITALS_HOOK = """
+(() => {
+  const v = window.__nnVitals = {lcp: null, cls: 0, fcp: null, inp: null, longTasks: 0, tbt: 0};
+  const observe = (type, cb, opts) => {
+    try { new PerformanceObserver(l => l.getEntries().forEach(cb)).observe(Object.assign({type, buffered: true}, opts || {})); }
+    catch (e) { /* entry type unsupported */ }
+  };
+  observe('largest-contentful-paint', e => { v.lcp = e.renderTime || e.loadTime || e.startTime; });
+  observe('layout-shift', e => { if (!e.hadRecentInput) { v.cls += e.value; } });
+  observe('paint', e => { if (e.name === 'first-contentful-paint') { v.fcp = e.startTime; } });
+  observe('longtask', e => { v.longTasks += 1; v.tbt += Math.max(0, e.duration - 50); });
+  const interaction = e => { if (e.interactionId) { v.inp = Math.max(v.inp || 0, e.duration); } };
+  // 'event' only reports interactions slower than 16 ms; 'first-input' always reports the first one
+  observe('event', interaction, {durationThreshold: 16});
+  observe('first-input', interaction);
+})();
+"""
+
+# Viewport point over a non-interactive element, so the probe click used
+# for INP does not follow a link or submit a form.
+INTERACTION_POINT_JS = """
+const skip = 'a, button, input, select, textarea, label, summary, [onclick], [role=button], [tabindex]';
+for (let y = 40; y < window.innerHeight; y += 40) {
+  for (let x = 20; x < window.innerWidth; x += 60) {
+    const el = document.elementFromPoint(x, y);
+    if (el && !el.closest(skip)) { return [x, y]; }
+  }
+}
+return null;
+"""
+
+# Resolves after the next frames, once Event Timing entries for the probe
+# click have been delivered to the observers.
+READ_VITALS_JS = """
+const done = arguments[arguments.length - 1];
+requestAnimationFrame(() => requestAnimationFrame(() => setTimeout(() => {
+  const v = Object.assign({}, window.__nnVitals || {});
+  const nav = performance.getEntriesByType('navigation')[0];
+  v.ttfb = nav ? nav.responseStart : null;
+  done(v);
+}, 100)));
+"""
+
+# Per-process browser owned by a pool worker (see _init_worker).
+_worker_driver: Optional[webdriver.Chrome] = None
+_worker_profile = "none"
+
 
-def setup_driver() -> webdriver.Chrome:
+def setup_driver(profile: str = "none") -> webdriver.Chrome:
     """Configure and return a headless Chrome WebDriver.
 
-    Uses Selenium Manager to resolve the appropriate driver.
+    Uses Selenium Manager to resolve the appropriate driver. Web Vitals
+    hooks are installed and the throttling `profile` is applied.
     """
     options = Options()
     # Use new headless mode for modern Chrome versions
@@ -41,9 +129,40 @@ def setup_driver() -> webdriver.Chrome:
 
     driver = webdriver.Chrome(options=options)
     driver.set_page_load_timeout(30)
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": VITALS_HOOK})
+    apply_profile(driver, profile)
     return driver
 
 
+def apply_profile(driver: webdriver.Chrome, profile: str) -> None:
+    """Apply CPU and network throttling via the DevTools Protocol."""
+    settings = THROTTLE_PROFILES[profile]
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": settings["cpu"]})
+    if settings["network"]:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", dict(settings["network"], offline=False))
+
+
+def collect_vitals(driver: webdriver.Chrome) -> dict:
+    """Return Web Vitals gathered by VITALS_HOOK for the current page.
+
+    A trusted mouse click (DevTools Input.dispatchMouseEvent; script
+    clicks carry no interactionId) is sent to a non-interactive spot first
+    so INP has an interaction to measure. INP stays empty when the page
+    has no such spot. TTFB comes from the navigation entry.
+    """
+    try:
+        point = driver.execute_script(INTERACTION_POINT_JS)
+        if point:
+            for kind in ("mousePressed", "mouseReleased"):
+                driver.execute_cdp_cmd("Input.dispatchMouseEvent", {
+                    "type": kind, "x": point[0], "y": point[1], "button": "left", "clickCount": 1})
+        vitals = driver.execute_async_script(READ_VITALS_JS)
+        return vitals or {}
+    except Exception:
+        return {}
+
+
 def navigation_duration_ms(driver: webdriver.Chrome) -> float:
     """Return navigation duration in milliseconds from the Performance API.
 
@@ -69,13 +188,15 @@ def navigation_duration_ms(driver: webdriver.Chrome) -> float:
 def measure_url(driver: webdriver.Chrome, url: str, timeout: int = 30) -> dict:
     """Measure page load time for a single URL using Selenium.
 
-    Returns a dict with status_code, selenium_ms, navigation_ms, and error.
+    Returns a dict with status_code, selenium_ms, navigation_ms, vitals,
+    and error.
     """
     result = {
         "url": url,
         "status_code": None,
         "selenium_ms": None,
         "navigation_ms": None,
+        "vitals": {},
         "error": None,
     }
 
@@ -102,6 +223,7 @@ def measure_url(driver: webdriver.Chrome, url: str, timeout: int = 30) -> dict:
         nav_ms = navigation_duration_ms(driver)
         result["selenium_ms"] = elapsed_ms
         result["navigation_ms"] = nav_ms
+        result["vitals"] = collect_vitals(driver)
     except TimeoutException as exc:
         result["error"] = f"Timeout waiting for page load: {exc}"
     except NoSuchElementException as exc:
@@ -128,15 +250,137 @@ def print_result(result: dict) -> None:
         print(
             f"- {url} -> status: {status}, selenium load: {sel_txt}, navigation: {nav_txt}"
         )
+        vitals = result.get("vitals") or {}
+        if vitals:
+            def ms(key: str) -> str:
+                return f"{vitals[key]:.0f} ms" if vitals.get(key) is not None else "n/a"
+
+            print(
+                f"    LCP {ms('lcp')}, FCP {ms('fcp')}, TTFB {ms('ttfb')}, INP {ms('inp')}, "
+                f"CLS {vitals.get('cls', 0):.3f}, long tasks {vitals.get('longTasks', 0)}, TBT {ms('tbt')}"
+            )
+
+
+def sitemap_urls(path: str = PRODUCT_SITEMAP, base: Optional[str] = None) -> List[str]:
+    """Return every <loc> in a sitemap, re-pointed at `base` when given.
+
+    The committed sitemaps are generated against localhost:8000, so the
+    host is swapped for the one under test. They also list product pages
+    as `/products/<slug>`, which App.php does not route, so those are
+    mapped to `/products/view/<slug>`.
+    """
+    urls = []
+    for loc in ET.parse(path).iter(f"{SITEMAP_NS}loc"):
+        url = (loc.text or "").strip()
+        if not url:
+            continue
+        parts = urlsplit(url)
+        segments = parts.path.rstrip("/").split("/")
+        if len(segments) == 3 and segments[1] == "products" and segments[2]:
+            parts = parts._replace(path="/products/view/" + segments[2])
+        if base:
+            url = base.rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+        else:
+            url = parts.geturl()
+        urls.append(url)
+    return urls
+
+
+def prepare_cache(driver: webdriver.Chrome, url: str, mode: str) -> None:
+    """Put the browser cache into the requested state before measuring."""
+    if mode == "cold":
+        driver.get("about:blank")
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    elif mode == "warm":
+        try:
+            driver.get(url)
+        except WebDriverException:
+            pass
+
+
+def _quit_worker_driver() -> None:
+    global _worker_driver
+    if _worker_driver is not None:
+        try:
+            _worker_driver.quit()
+        except Exception:
+            pass
+        _worker_driver = None
+
+
+def _init_worker(profile: str = "none") -> None:
+    """Pool initializer: start this process's browser once.
+
+    Pool workers exit without running atexit hooks, so the driver is
+    shut down through a multiprocessing finalizer instead.
+    """
+    global _worker_driver, _worker_profile
+    _worker_profile = profile
+    _worker_driver = setup_driver(profile)
+    multiprocessing.util.Finalize(None, _quit_worker_driver, exitpriority=10)
+
+
+def _measure_in_worker(job: Tuple[str, str]) -> dict:
+    global _worker_driver
+    url, mode = job
+    try:
+        if _worker_driver is None:
+            _worker_driver = setup_driver(_worker_profile)
+        prepare_cache(_worker_driver, url, mode)
+        result = measure_url(_worker_driver, url)
+    except WebDriverException as exc:
+        # Browser crashed or lost its session; replace it for the next URL.
+        _quit_worker_driver()
+        result = {"url": url, "status_code": None, "selenium_ms": None, "navigation_ms": None,
+                  "error": f"Browser error: {exc.msg or exc}"}
+    result["cache"] = mode
+    result["profile"] = _worker_profile
+    result["worker"] = os.getpid()
+    return result
+
+
+def run_parallel(urls: List[str], workers: int, mode: str = "default", profile: str = "none") -> Iterator[dict]:
+    """Measure `urls` across `workers` browser processes, yielding as they finish."""
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=workers, initializer=_init_worker, initargs=(profile,)) as pool:
+        yield from pool.imap_unordered(_measure_in_worker, [(u, mode) for u in urls])
+        pool.close()
+        pool.join()
 
 
 def main() -> None:
     """Entry point for running measurements across all URLs."""
+    parser = argparse.ArgumentParser(description="Selenium page speed tester")
+    parser.add_argument("--workers", type=int, default=1, help="browser processes to run in parallel")
+    parser.add_argument("--sitemap", nargs="?", const=PRODUCT_SITEMAP, default=None,
+                        help="also test every URL in this sitemap (default: product-sitemap.xml)")
+    parser.add_argument("--base-url", default=None, help="host to test sitemap URLs against")
+    parser.add_argument("--cache", choices=CACHE_MODES, default="default")
+    parser.add_argument("--profile", choices=sorted(THROTTLE_PROFILES), default="none",
+                        help="CPU/network throttling profile")
+    args = parser.parse_args()
+
+    urls = list(TEST_URLS)
+    if args.sitemap:
+        base = args.base_url or "{0.scheme}://{0.netloc}".format(urlsplit(TEST_URLS[0]))
+        urls += [u for u in sitemap_urls(args.sitemap, base) if u not in urls]
+
+    if args.workers > 1:
+        print(f"Starting Selenium page speed measurements ({len(urls)} URLs, {args.workers} browsers, cache={args.cache}, profile={args.profile})...\n")
+        start = time.perf_counter()
+        for result in run_parallel(urls, args.workers, args.cache, args.profile):
+            print_result(result)
+        print(f"\nCompleted {len(urls)} measurements in {time.perf_counter() - start:.1f}s. Resources cleaned up.")
+        return
+
     driver = None
     try:
-        driver = setup_driver()
+        driver = setup_driver(args.profile)
         print("Starting Selenium page speed measurements...\n")
-        for url in TEST_URLS:
+        for url in urls:
+            if args.cache != "default":
+                prepare_cache(driver, url, args.cache)
             result = measure_url(driver, url)
             print_result(result)
     finally:
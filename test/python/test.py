@@ -9,13 +9,24 @@ Pages analyzed:
 - http://192.168.1.77:8000/cart
 - http://192.168.1.77:8000/checkout
 
-Run: python test/python/test.py
+Every run is saved to a SQLite store (`--db`, default
+resource_timing.db next to this script) so entries can be aggregated
+across runs and two runs can be diffed to catch assets whose size or
+duration regressed.
+
+Run: python test/python/test.py [--label release-1.4]
+     python test/python/test.py --aggregate [--last 10]
+     python test/python/test.py --diff 12 13 [--size-pct 20 --duration-pct 50]
 """
 
+import argparse
+import os
+import sqlite3
+import statistics
 import time
 import requests
 from collections import defaultdict
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -31,6 +42,37 @@ TEST_URLS = [
     "http://192.168.1.77:8000/checkout",
 ]
 
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resource_timing.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS page_loads (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    page_url TEXT NOT NULL,
+    status_code INTEGER,
+    selenium_ms REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS resources (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    page_url TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    initiator_type TEXT NOT NULL,
+    start_ms REAL,
+    duration_ms REAL,
+    transfer_size INTEGER,
+    encoded_size INTEGER,
+    decoded_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_resources_run ON resources(run_id);
+CREATE INDEX IF NOT EXISTS idx_resources_asset ON resources(asset, run_id);
+CREATE INDEX IF NOT EXISTS idx_resources_type ON resources(initiator_type, run_id);
+"""
+
 
 def setup_driver() -> webdriver.Chrome:
     options = Options()
@@ -185,19 +227,187 @@ def print_analysis(result: Dict[str, Any]) -> None:
             )
 
 
+def asset_key(name: str) -> str:
+    """Asset identity across runs: the URL without its cache-busting query."""
+    return (name or "").split("?")[0].split("#")[0]
+
+
+def entry_bytes(r: Dict[str, Any]) -> int:
+    return int(r.get("transferSize") or r.get("encodedBodySize") or 0)
+
+
+def open_store(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def save_run(conn: sqlite3.Connection, results: List[Dict[str, Any]], label: Optional[str] = None) -> int:
+    """Persist one run (all pages and their resource entries); returns the run id."""
+    with conn:
+        run_id = conn.execute(
+            "INSERT INTO runs (label, created_at) VALUES (?, ?)", (label, time.time())
+        ).lastrowid
+        for res in results:
+            conn.execute(
+                "INSERT INTO page_loads (run_id, page_url, status_code, selenium_ms, error) VALUES (?, ?, ?, ?, ?)",
+                (run_id, res["url"], res.get("status_code"), res.get("selenium_ms"), res.get("error")),
+            )
+            conn.executemany(
+                "INSERT INTO resources (run_id, page_url, asset, initiator_type, start_ms, duration_ms,"
+                " transfer_size, encoded_size, decoded_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id, res["url"], asset_key(r.get("name", "")), r.get("initiatorType") or "other",
+                        r.get("startTime"), r.get("duration"), entry_bytes(r),
+                        int(r.get("encodedBodySize") or 0), int(r.get("decodedBodySize") or 0),
+                    )
+                    for r in res.get("resources", [])
+                ],
+            )
+    return run_id
+
+
+def _pct(values: List[float], pct: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return float(values[0])
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def aggregate(conn: sqlite3.Connection, last: int = 10, by: str = "asset") -> List[Dict[str, Any]]:
+    """Median/p90 duration and bytes per asset (or initiator_type) over the last N runs."""
+    column = "initiator_type" if by == "type" else "asset"
+    rows = conn.execute(
+        f"SELECT {column}, initiator_type, duration_ms, transfer_size, run_id FROM resources"
+        " WHERE run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)",
+        (last,),
+    ).fetchall()
+    groups: Dict[str, Dict[str, Any]] = {}
+    for key, itype, duration, size, run_id in rows:
+        g = groups.setdefault(key, {"key": key, "type": itype, "durations": [], "sizes": [], "runs": set()})
+        g["durations"].append(duration or 0.0)
+        g["sizes"].append(size or 0)
+        g["runs"].add(run_id)
+    out = []
+    for g in groups.values():
+        out.append({
+            "key": g["key"],
+            "type": g["type"],
+            "runs": len(g["runs"]),
+            "samples": len(g["durations"]),
+            "median_ms": statistics.median(g["durations"]),
+            "p90_ms": _pct(g["durations"], 90),
+            "median_bytes": statistics.median(g["sizes"]),
+            "p90_bytes": _pct(g["sizes"], 90),
+        })
+    out.sort(key=lambda a: a["median_bytes"], reverse=True)
+    return out
+
+
+def _run_assets(conn: sqlite3.Connection, run_id: int) -> Dict[str, Tuple[str, float, int]]:
+    """asset -> (initiator_type, median duration, max bytes) for one run."""
+    per: Dict[str, Dict[str, Any]] = {}
+    for asset, itype, duration, size in conn.execute(
+        "SELECT asset, initiator_type, duration_ms, transfer_size FROM resources WHERE run_id = ?", (run_id,)
+    ):
+        p = per.setdefault(asset, {"type": itype, "d": [], "s": 0})
+        p["d"].append(duration or 0.0)
+        p["s"] = max(p["s"], size or 0)
+    return {a: (p["type"], statistics.median(p["d"]), p["s"]) for a, p in per.items()}
+
+
+def diff_runs(conn: sqlite3.Connection, base_run: int, new_run: int,
+              size_pct: float = 20.0, duration_pct: float = 50.0,
+              min_bytes: int = 1024, min_ms: float = 20.0) -> List[Dict[str, Any]]:
+    """Assets in `new_run` whose bytes or duration grew past the thresholds.
+
+    Tiny absolute changes (under `min_bytes` / `min_ms`) are ignored so
+    timing noise on small assets does not drown out real regressions.
+    Assets missing from the base run are reported as new.
+    """
+    base = _run_assets(conn, base_run)
+    new = _run_assets(conn, new_run)
+    flagged = []
+    for asset, (itype, dur, size) in new.items():
+        if asset not in base:
+            flagged.append({"asset": asset, "type": itype, "reason": "new", "bytes": size, "ms": dur})
+            continue
+        _, old_dur, old_size = base[asset]
+        if size - old_size >= min_bytes and size > old_size * (1 + size_pct / 100.0):
+            flagged.append({"asset": asset, "type": itype, "reason": "size", "old": old_size, "new": size})
+        if dur - old_dur >= min_ms and dur > old_dur * (1 + duration_pct / 100.0):
+            flagged.append({"asset": asset, "type": itype, "reason": "duration", "old": old_dur, "new": dur})
+    return flagged
+
+
+def print_aggregate(rows: List[Dict[str, Any]], limit: int = 25) -> None:
+    print(f"{'median':>10} {'p90':>10} {'med ms':>8} {'p90 ms':>8} {'runs':>5}  asset")
+    for a in rows[:limit]:
+        name = a["key"] if a["key"] == a["type"] else f"{a['type']}: {a['key']}"
+        print(
+            f"{format_bytes(int(a['median_bytes'])):>10} {format_bytes(int(a['p90_bytes'])):>10} "
+            f"{a['median_ms']:8.1f} {a['p90_ms']:8.1f} {a['runs']:5d}  {name}"
+        )
+
+
+def print_diff(flagged: List[Dict[str, Any]]) -> None:
+    if not flagged:
+        print("No asset regressions.")
+        return
+    for f in flagged:
+        if f["reason"] == "new":
+            print(f"  NEW       {format_bytes(f['bytes']):>10} | {f['type']} | {f['asset']}")
+        elif f["reason"] == "size":
+            print(f"  SIZE      {format_bytes(f['old'])} -> {format_bytes(f['new'])} | {f['type']} | {f['asset']}")
+        else:
+            print(f"  DURATION  {f['old']:.0f} ms -> {f['new']:.0f} ms | {f['type']} | {f['asset']}")
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Resource timing analysis and regression diffing")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite store for runs")
+    parser.add_argument("--label", default=None, help="label stored with this run (e.g. a release tag)")
+    parser.add_argument("--aggregate", action="store_true", help="report stored runs instead of measuring")
+    parser.add_argument("--by", choices=("asset", "type"), default="asset")
+    parser.add_argument("--last", type=int, default=10, help="runs to aggregate over")
+    parser.add_argument("--diff", nargs=2, type=int, metavar=("BASE_RUN", "NEW_RUN"))
+    parser.add_argument("--size-pct", type=float, default=20.0)
+    parser.add_argument("--duration-pct", type=float, default=50.0)
+    args = parser.parse_args()
+
+    conn = open_store(args.db)
+    if args.aggregate:
+        print_aggregate(aggregate(conn, args.last, args.by))
+        return
+    if args.diff:
+        flagged = diff_runs(conn, args.diff[0], args.diff[1], args.size_pct, args.duration_pct)
+        print(f"Run {args.diff[0]} -> {args.diff[1]}:")
+        print_diff(flagged)
+        raise SystemExit(1 if flagged else 0)
+
     driver = None
+    results = []
     try:
         driver = setup_driver()
         print("Starting request load analysis...")
         for url in TEST_URLS:
             res = measure_and_analyze(driver, url)
             print_analysis(res)
+            results.append(res)
     finally:
         if driver is not None:
             driver.quit()
         print("\nAnalysis complete. Resources cleaned up.")
 
+    run_id = save_run(conn, results, args.label)
+    print(f"Saved as run {run_id} in {args.db}")
+    previous = conn.execute("SELECT MAX(id) FROM runs WHERE id < ?", (run_id,)).fetchone()[0]
+    if previous:
+        print(f"\nChanges since run {previous}:")
+        print_diff(diff_runs(conn, previous, run_id, args.size_pct, args.duration_pct))
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""Record and replay HTTP traffic against the local dev server.
+
+`capture` runs a recording reverse proxy: point the browser (or another
+harness) at it and every request is forwarded to the dev server and
+appended to a JSONL corpus, one object per line:
+
+    {"ts": 1760000000.123, "method": "POST", "path": "/cart/add",
+     "headers": {...}, "body": "product_id=3&quantity=1", "body_size": 24,
+     "session": "<original PHPSESSID>", "status": 200,
+     "duration_ms": 41.2, "response_size": 512}
+
+Binary request bodies are stored base64-encoded under `body_b64`.
+Records marked `"replayable": false` (e.g. bodies truncated in an ngrok
+capture) are skipped on replay.
+
+`replay` re-issues a corpus with the original inter-arrival timing at
+`--speed` (1 = real time, N = N times faster, 0 = as fast as possible),
+capped at `--concurrency` requests in flight. Each original session gets
+its own cookie jar, so the server hands out fresh sessions; the latest
+CSRF token seen in each replayed session's HTML is substituted into
+`_csrf_token` form fields and X-CSRF-Token headers on the fly.
+
+The repo-root requests.jsonl is the team's work backlog, so the corpus
+defaults to test/python/traffic/requests.jsonl.
+
+Usage:
+    python test/python/traffic.py capture --listen 8080 --upstream http://127.0.0.1:8000
+    python test/python/traffic.py replay --speed 5 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+import aiohttp
+from aiohttp import web
+
+import loadgen
+
+
+TRAFFIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traffic")
+DEFAULT_CORPUS = os.path.join(TRAFFIC_DIR, "requests.jsonl")
+SESSION_COOKIE = "PHPSESSID"
+
+# Hop-by-hop and per-connection headers are never recorded or replayed.
+SKIP_HEADERS = {"host", "content-length", "connection", "keep-alive", "transfer-encoding", "upgrade", "cookie"}
+CSRF_RE = re.compile(r'name="_csrf_token"\s+value="([^"]+)"|<meta name="csrf-token" content="([^"]+)"')
+
+
+def session_of(cookie_header: str) -> Optional[str]:
+    for part in (cookie_header or "").split(";"):
+        name, _, value = part.strip().partition("=")
+        if name == SESSION_COOKIE:
+            return value
+    return None
+
+
+def encode_body(body: bytes) -> Dict[str, Any]:
+    if not body:
+        return {"body": None, "body_size": 0}
+    try:
+        return {"body": body.decode("utf-8"), "body_size": len(body)}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii"), "body_size": len(body)}
+
+
+def decode_body(record: Dict[str, Any]) -> Optional[bytes]:
+    if record.get("body_b64"):
+        return base64.b64decode(record["body_b64"])
+    if record.get("body") is not None:
+        return record["body"].encode("utf-8")
+    return None
+
+
+def read_corpus(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a JSONL file, or from every *.jsonl segment in a directory."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".jsonl"))
+    else:
+        files = [path]
+    for name in files:
+        with open(name, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+# ---------------------------------------------------------------- capture
+
+
+def make_capture_app(upstream: str, out_path: str) -> web.Application:
+    """Reverse proxy that forwards to `upstream` and logs each exchange."""
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    out = open(out_path, "a", encoding="utf-8")
+
+    async def on_startup(app: web.Application) -> None:
+        app["client"] = aiohttp.ClientSession(
+            auto_decompress=False,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            connector=aiohttp.TCPConnector(limit=256, keepalive_timeout=30),
+        )
+
+    async def on_cleanup(app: web.Application) -> None:
+        await app["client"].close()
+        out.close()
+
+    async def proxy(request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in SKIP_HEADERS - {"cookie"}}
+        start = time.perf_counter()
+        ts = time.time()
+        async with request.app["client"].request(
+            request.method, upstream + request.path_qs, headers=headers, data=body or None, allow_redirects=False,
+        ) as resp:
+            payload = await resp.read()
+            duration = (time.perf_counter() - start) * 1000.0
+            record = {
+                "ts": round(ts, 6),
+                "method": request.method,
+                "path": request.path_qs,
+                "headers": {k: v for k, v in request.headers.items() if k.lower() not in SKIP_HEADERS},
+                **encode_body(body),
+                "session": session_of(request.headers.get("Cookie", "")),
+                "status": resp.status,
+                "duration_ms": round(duration, 2),
+                "response_size": len(payload),
+            }
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+            out.flush()
+            reply = web.Response(body=payload, status=resp.status)
+            for k, v in resp.headers.items():
+                if k.lower() not in ("content-length", "transfer-encoding", "connection"):
+                    reply.headers.add(k, v)
+            return reply
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_route("*", "/{tail:.*}", proxy)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+# ----------------------------------------------------------------- replay
+
+
+class ReplaySession:
+    """Replay-side stand-in for one original browser session."""
+
+    def __init__(self, connector: aiohttp.BaseConnector, timeout: float):
+        self.csrf: Optional[str] = None
+        self.lock = asyncio.Lock()
+        self.client = aiohttp.ClientSession(
+            connector=connector,
+            connector_owner=False,
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+
+    def rewrite(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Return headers/body for `record` with this session's CSRF token."""
+        headers = {k: v for k, v in record.get("headers", {}).items() if k.lower() not in SKIP_HEADERS}
+        body = decode_body(record)
+        if self.csrf:
+            if any(k.lower() == "x-csrf-token" for k in headers):
+                headers = {k: (self.csrf if k.lower() == "x-csrf-token" else v) for k, v in headers.items()}
+            ctype = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+            if body and ctype.startswith("application/x-www-form-urlencoded"):
+                fields = parse_qsl(body.decode("utf-8", "replace"), keep_blank_values=True)
+                if any(k == "_csrf_token" for k, _ in fields):
+                    fields = [(k, self.csrf if k == "_csrf_token" else v) for k, v in fields]
+                    body = urlencode(fields).encode("utf-8")
+        return {"headers": headers, "data": body}
+
+    def learn(self, html: Optional[str]) -> None:
+        match = CSRF_RE.search(html or "")
+        if match:
+            self.csrf = match.group(1) or match.group(2)
+
+
+async def replay(records: List[Dict[str, Any]], base_url: str, speed: float, concurrency: int,
+                 timeout: float) -> List[Dict[str, Any]]:
+    """Re-issue `records` preserving relative timing (scaled by `speed`)."""
+    records = sorted(records, key=lambda r: r.get("ts", 0))
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    sessions: Dict[str, ReplaySession] = {}
+    gate = asyncio.Semaphore(concurrency)
+    results: List[Dict[str, Any]] = []
+
+    async def issue(record: Dict[str, Any], scheduled: float) -> None:
+        key = record.get("session") or f"anon-{id(record)}"
+        if key not in sessions:
+            sessions[key] = ReplaySession(connector, timeout)
+        sess = sessions[key]
+        # Requests within one session go out in order, as the browser sent them.
+        # Take the session lock first so requests queued behind a busy session
+        # do not hold concurrency slots other sessions could use.
+        async with sess.lock:
+            async with gate:
+                req = sess.rewrite(record)
+                res = await loadgen.fetch(
+                    sess.client, base_url + record["path"], record["method"],
+                    started=scheduled, label=record["path"].split("?")[0],
+                    want_body=True, allow_redirects=False, **req,
+                )
+                sess.learn(res.pop("body", None))
+        res["original_status"] = record.get("status")
+        res["original_ms"] = record.get("duration_ms")
+        results.append(res)
+
+    tasks = []
+    start = time.perf_counter()
+    t0 = records[0].get("ts", 0) if records else 0
+    try:
+        for record in records:
+            offset = (record.get("ts", t0) - t0) / speed if speed > 0 else 0.0
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(issue(record, scheduled if speed > 0 else time.perf_counter())))
+        await asyncio.gather(*tasks)
+    finally:
+        for sess in sessions.values():
+            await sess.client.close()
+        await connector.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Capture and replay HTTP traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cap = sub.add_parser("capture", help="run a recording reverse proxy")
+    cap.add_argument("--listen", type=int, default=8080)
+    cap.add_argument("--upstream", default="http://127.0.0.1:8000")
+    cap.add_argument("--file", default=DEFAULT_CORPUS)
+
+    rep = sub.add_parser("replay", help="replay a captured corpus")
+    rep.add_argument("--file", default=DEFAULT_CORPUS, help="corpus file or directory of segments")
+    rep.add_argument("--base-url", default="http://127.0.0.1:8000")
+    rep.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N x faster, 0 = max speed")
+    rep.add_argument("--concurrency", type=int, default=100)
+    rep.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.command == "capture":
+        print(f"Recording {args.upstream} via http://127.0.0.1:{args.listen} -> {args.file}")
+        web.run_app(make_capture_app(args.upstream.rstrip("/"), args.file), port=args.listen, print=None)
+        return
+
+    records = list(read_corpus(args.file))
+    skipped = sum(1 for r in records if r.get("replayable") is False)
+    records = [r for r in records if r.get("replayable") is not False]
+    if skipped:
+        print(f"Skipping {skipped} non-replayable request(s) (incomplete captured body)")
+    if not records:
+        raise SystemExit(f"No requests in {args.file}")
+    span = records[-1].get("ts", 0) - records[0].get("ts", 0)
+    print(f"Replaying {len(records)} requests ({span:.1f}s captured) at speed {args.speed or 'max'}...")
+    start = time.perf_counter()
+    results = asyncio.run(replay(records, args.base_url.rstrip("/"), args.speed, args.concurrency, args.timeout))
+    elapsed = time.perf_counter() - start
+
+    loadgen.print_summary(loadgen.summarize(results, elapsed), "Replay latency by path (ms)")
+    mismatched = sum(1 for r in results if r.get("original_status") not in (None, r.get("status")))
+    print(f"\n{len(results)} requests in {elapsed:.1f}s; {mismatched} returned a different status than captured")
+
+
+if __name__ == "__main__":
+    main()
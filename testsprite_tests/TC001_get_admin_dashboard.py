@@ -1,17 +1,5 @@
-import requests
-
-BASE_URL = "http://localhost:8000"
-TIMEOUT = 30
-
-def test_get_admin_dashboard():
-    url = f"{BASE_URL}/admin"
-    headers = {
-        "Accept": "application/json",
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=TIMEOUT)
-    except requests.RequestException as e:
-        assert False, f"Request to {url} failed: {e}"
+def test_get_admin_dashboard(client):
+    response = client.get("/admin", headers={"Accept": "application/json"})
 
     assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
 
@@ -39,5 +27,3 @@ def test_get_admin_dashboard():
     # Basic validation that at least these keys exist in the dashboard response
     missing_keys = [key for key in expected_keys if key not in data]
     assert not missing_keys, f"Response JSON missing expected keys: {missing_keys}"
-
-test_get_admin_dashboard()
\ No newline at end of file
@@ -1,12 +1,4 @@
-import requests
-
-BASE_URL = "http://localhost:8000"
-TIMEOUT = 30
-HEADERS = {
-    "Content-Type": "application/json"
-}
-
-def test_create_new_product():
+def test_create_new_product(client):
     product_data = {
         "name": "Test Product TC003",
         "price": 99.99,
@@ -16,12 +8,7 @@ def test_create_new_product():
     created_product_id = None
     try:
         # Create new product
-        response = requests.post(
-            f"{BASE_URL}/admin/products",
-            json=product_data,
-            headers=HEADERS,
-            timeout=TIMEOUT
-        )
+        response = client.post("/admin/products", json=product_data)
         # Assert status code 201 Created
         assert response.status_code == 201, f"Expected status code 201, got {response.status_code}"
         resp_json = response.json()
@@ -34,11 +21,7 @@ def test_create_new_product():
         assert resp_json.get("category") == product_data["category"], "Product category in response does not match"
 
         # Get the product by id to verify it is saved properly
-        get_response = requests.get(
-            f"{BASE_URL}/admin/products/{created_product_id}",
-            headers=HEADERS,
-            timeout=TIMEOUT
-        )
+        get_response = client.get(f"/admin/products/{created_product_id}")
         assert get_response.status_code == 200, f"Expected status code 200 when retrieving product, got {get_response.status_code}"
         get_json = get_response.json()
         # Confirm the retrieved product details match
@@ -51,14 +34,5 @@ def test_create_new_product():
     finally:
         # Cleanup: delete the created product if created
         if created_product_id:
-            try:
-                delete_response = requests.delete(
-                    f"{BASE_URL}/admin/products/{created_product_id}",
-                    headers=HEADERS,
-                    timeout=TIMEOUT
-                )
-                assert delete_response.status_code == 200, f"Expected status code 200 on delete, got {delete_response.status_code}"
-            except Exception:
-                pass
-
-test_create_new_product()
\ No newline at end of file
+            delete_response = client.delete(f"/admin/products/{created_product_id}")
+            assert delete_response.status_code == 200, f"Expected status code 200 on delete, got {delete_response.status_code}"
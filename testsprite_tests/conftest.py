@@ -0,0 +1,170 @@
+"""Shared fixtures for the testsprite TC suite.
+
+Every TC test talks to the running app through one pooled, keep-alive
+`requests.Session` per worker (`client`), logged in as admin when
+TESTSPRITE_ADMIN_PHONE / TESTSPRITE_ADMIN_PASSWORD are set. Tests that
+need an existing product or order get one from the `product` / `order`
+fixtures, which delete it afterwards.
+
+Each request also has a latency budget. Every response the client
+receives during a test is timed (time to response headers) and checked
+against the budget for its own path. A test with any request over budget
+fails, even when its assertions pass. Budgets come from LATENCY_BUDGETS_MS
+(longest matching path prefix), can be overridden for every request in a
+test with `@pytest.mark.budget(ms)`, and scale with
+TESTSPRITE_BUDGET_SCALE (e.g. 2 on a slow CI box, 0 to disable).
+
+Usage:
+    pip install -r testsprite_tests/requirements.txt
+    pytest testsprite_tests
+    pytest testsprite_tests -n auto          # parallel, needs pytest-xdist
+    BASE_URL=http://127.0.0.1:8000 TESTSPRITE_BUDGET_SCALE=1.5 pytest testsprite_tests -k products
+"""
+
+import os
+import re
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:8000").rstrip("/")
+TIMEOUT = float(os.environ.get("TESTSPRITE_TIMEOUT", "10"))
+BUDGET_SCALE = float(os.environ.get("TESTSPRITE_BUDGET_SCALE", "1"))
+ADMIN_PHONE = os.environ.get("TESTSPRITE_ADMIN_PHONE")
+ADMIN_PASSWORD = os.environ.get("TESTSPRITE_ADMIN_PASSWORD")
+CSRF_RE = re.compile(r'name="_csrf_token"\s+value="([^"]+)"')
+
+# Slowest acceptable single request, in ms, by path prefix.
+DEFAULT_BUDGET_MS = 2000.0
+LATENCY_BUDGETS_MS = {
+    "/admin": 1000.0,
+    "/admin/products": 1500.0,
+    "/admin/orders": 1500.0,
+}
+
+_timings: List[Tuple[str, str, float]] = []
+
+
+def budget_for(path: str) -> float:
+    matches = [p for p in LATENCY_BUDGETS_MS if path == p or path.startswith(p.rstrip("/") + "/")]
+    return LATENCY_BUDGETS_MS[max(matches, key=len)] if matches else DEFAULT_BUDGET_MS
+
+
+def _record(response, *args, **kwargs):
+    _timings.append((response.request.method, urlsplit(response.url).path,
+                     response.elapsed.total_seconds() * 1000.0))
+
+
+class Client(requests.Session):
+    """requests.Session bound to BASE_URL with a default timeout."""
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", TIMEOUT)
+        if url.startswith("/"):
+            url = BASE_URL + url
+        return super().request(method, url, *args, **kwargs)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "budget(ms): latency budget for every request in this test")
+
+
+@pytest.fixture(scope="session")
+def client():
+    session = Client()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks["response"].append(_record)
+    if ADMIN_PHONE and ADMIN_PASSWORD:
+        page = session.get("/auth/login")
+        match = CSRF_RE.search(page.text)
+        resp = session.post("/auth/processLogin", data={
+            "phone": ADMIN_PHONE,
+            "password": ADMIN_PASSWORD,
+            "_csrf_token": match.group(1) if match else "",
+        })
+        # processLogin answers a failed login with a (200) redirect back to
+        # /auth/login; only a successful admin login lands on /admin
+        landed = urlsplit(resp.url).path.rstrip("/")
+        assert resp.ok and landed.endswith("/admin"), f"Admin login failed: {resp.status_code}, landed on {landed or '/'}"
+    yield session
+    session.close()
+
+
+def create_product(client, **overrides) -> Dict:
+    product = {
+        "name": "Test Product",
+        "price": 19.99,
+        "description": "Temporary product created by the TC suite",
+        "category": "Test Category",
+    }
+    product.update(overrides)
+    resp = client.post("/admin/products", json=product)
+    assert resp.status_code == 201, f"Product creation failed: {resp.status_code} {resp.text[:200]}"
+    created = resp.json()
+    assert created.get("id") is not None, "Created product ID not found in response"
+    return dict(product, id=created["id"])
+
+
+@pytest.fixture
+def product(client):
+    created = create_product(client)
+    yield created
+    client.delete(f"/admin/products/{created['id']}")
+
+
+@pytest.fixture
+def order(client):
+    resp = client.post("/admin/orders", json={})
+    assert resp.status_code == 201, f"Order creation failed: {resp.status_code} {resp.text[:200]}"
+    order_id = resp.json().get("id")
+    assert order_id is not None, "Created order ID missing in response"
+    yield order_id
+    client.delete(f"/admin/orders/{order_id}")
+
+
+def _slowest(item):
+    if not _timings:
+        return None
+    method, path, slowest = max(_timings, key=lambda t: t[2])
+    item.user_properties.append(("slowest_ms", round(slowest, 1)))
+    item.user_properties.append(("slowest_request", f"{method} {path}"))
+    return method, path, slowest
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    del _timings[:]
+    try:
+        result = yield
+    except BaseException:
+        _slowest(item)
+        raise
+    _slowest(item)
+    marker = item.get_closest_marker("budget")
+    over = []
+    for method, path, ms in _timings:
+        budget = (marker.args[0] if marker else budget_for(path)) * BUDGET_SCALE
+        if budget and ms > budget:
+            over.append(f"{method} {path} took {ms:.0f} ms, over the {budget:.0f} ms budget")
+    if over:
+        pytest.fail("\n".join(over), pytrace=False)
+    return result
+
+
+def pytest_terminal_summary(terminalreporter):
+    rows = []
+    for reports in terminalreporter.stats.values():
+        for rep in reports:
+            props = dict(getattr(rep, "user_properties", ()) or ())
+            if getattr(rep, "when", None) == "call" and "slowest_ms" in props:
+                rows.append((props["slowest_ms"], rep.nodeid, props["slowest_request"]))
+    if rows:
+        terminalreporter.section("slowest request per test")
+        for ms, nodeid, request in sorted(rows, reverse=True):
+            terminalreporter.write_line(f"{ms:9.1f} ms  {request:32}  {nodeid}")